@@ -0,0 +1,90 @@
+"""
+Compares the throughput of per-item and batched transfers through memory object streams.
+
+Usage::
+
+    python benchmarks/memory_streams.py [--items N] [--batch-size N] [--buffer-size N]
+
+Both the asyncio and trio backends are measured (trio is skipped if it is not installed).
+"""
+
+import argparse
+import time
+
+import anyio
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+
+
+async def per_item(items: int, batch_size: int, buffer_size: int) -> float:
+    send, receive = anyio.create_memory_object_stream(buffer_size)
+
+    async def produce(stream: MemoryObjectSendStream[int]) -> None:
+        async with stream:
+            for i in range(items):
+                await stream.send(i)
+
+    async def consume(stream: MemoryObjectReceiveStream[int]) -> None:
+        async with stream:
+            async for _ in stream:
+                pass
+
+    start = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        tg.spawn(produce, send)
+        tg.spawn(consume, receive)
+
+    return time.perf_counter() - start
+
+
+async def batched(items: int, batch_size: int, buffer_size: int) -> float:
+    send, receive = anyio.create_memory_object_stream(buffer_size)
+
+    async def produce(stream: MemoryObjectSendStream[int]) -> None:
+        async with stream:
+            for i in range(0, items, batch_size):
+                await stream.send_many(range(i, min(i + batch_size, items)))
+
+    async def consume(stream: MemoryObjectReceiveStream[int]) -> None:
+        async with stream:
+            while True:
+                try:
+                    await stream.receive_many(batch_size)
+                except anyio.EndOfStream:
+                    break
+
+    start = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        tg.spawn(produce, send)
+        tg.spawn(consume, receive)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=200000, help='number of items to transfer')
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help='number of items per send_many()/receive_many() call')
+    parser.add_argument('--buffer-size', type=int, default=1000,
+                        help='maximum buffer size of the stream')
+    args = parser.parse_args()
+
+    backends = ['asyncio']
+    try:
+        import trio  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        backends.append('trio')
+
+    scenarios = [('per-item', per_item), ('batched', batched)]
+    print(f'{args.items} items, batch size {args.batch_size}, buffer size {args.buffer_size}')
+    for backend in backends:
+        for name, scenario in scenarios:
+            elapsed = anyio.run(scenario, args.items, args.batch_size, args.buffer_size,
+                                backend=backend)
+            print(f'{backend:8} {name:9} {elapsed:8.3f} s {args.items / elapsed:12,.0f} items/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,11 @@ __all__ = ('maybe_async', 'maybe_async_cm', 'run', 'sleep', 'current_time', 'get
            'aclose_forcefully', 'open_signal_receiver', 'connect_tcp', 'connect_unix',
            'create_tcp_listener', 'create_unix_listener', 'create_udp_socket',
            'create_connected_udp_socket', 'getaddrinfo', 'getnameinfo', 'wait_socket_readable',
-           'wait_socket_writable', 'create_memory_object_stream', 'run_process', 'open_process',
+           'wait_socket_writable', 'ConnectionPool', 'ConnectionPoolStatistics',
+           'create_connection_pool', 'CachingResolver', 'DNSResolver', 'ThreadedResolver',
+           'current_default_resolver', 'set_default_resolver', 'create_memory_object_stream',
+           'create_broadcast_memory_object_stream', 'create_priority_memory_object_stream',
+           'create_watch_memory_object_stream', 'run_process', 'open_process',
            'create_lock', 'CapacityLimiterStatistics', 'ConditionStatistics', 'EventStatistics',
            'LockStatistics', 'SemaphoreStatistics', 'create_condition', 'create_event',
            'create_semaphore', 'create_capacity_limiter', 'open_cancel_scope', 'fail_after',
@@ -17,17 +21,23 @@ __all__ = ('maybe_async', 'maybe_async_cm', 'run', 'sleep', 'current_time', 'get
            'TypedAttributeSet', 'TypedAttributeProvider')
 
 from ._core._compat import maybe_async, maybe_async_cm
+from ._core._dns import DNSResolver
 from ._core._eventloop import current_time, get_all_backends, get_cancelled_exc_class, run, sleep
 from ._core._exceptions import (
     BrokenResourceError, BusyResourceError, ClosedResourceError, DelimiterNotFound, EndOfStream,
     ExceptionGroup, IncompleteRead, TypedAttributeLookupError, WouldBlock)
 from ._core._fileio import AsyncFile, open_file
+from ._core._resolvers import (
+    CachingResolver, ThreadedResolver, current_default_resolver, set_default_resolver)
 from ._core._resources import aclose_forcefully
 from ._core._signals import open_signal_receiver
 from ._core._sockets import (
-    connect_tcp, connect_unix, create_connected_udp_socket, create_tcp_listener, create_udp_socket,
+    ConnectionPool, ConnectionPoolStatistics, connect_tcp, connect_unix,
+    create_connected_udp_socket, create_connection_pool, create_tcp_listener, create_udp_socket,
     create_unix_listener, getaddrinfo, getnameinfo, wait_socket_readable, wait_socket_writable)
-from ._core._streams import create_memory_object_stream
+from ._core._streams import (
+    create_broadcast_memory_object_stream, create_memory_object_stream,
+    create_priority_memory_object_stream, create_watch_memory_object_stream)
 from ._core._subprocesses import open_process, run_process
 from ._core._synchronization import (
     ConditionStatistics, LockStatistics, SemaphoreStatistics, create_capacity_limiter,
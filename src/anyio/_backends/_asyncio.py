@@ -3,6 +3,7 @@ import asyncio
 import concurrent.futures
 import math
 import socket
+import ssl
 import sys
 from asyncio.base_events import _run_until_complete_cb  # type: ignore
 from collections import OrderedDict, deque
@@ -28,7 +29,7 @@ from .._core._exceptions import (
     BrokenResourceError, BusyResourceError, ClosedResourceError, EndOfStream)
 from .._core._exceptions import ExceptionGroup as BaseExceptionGroup
 from .._core._exceptions import WouldBlock
-from .._core._sockets import GetAddrInfoReturnType, convert_ipv6_sockaddr
+from .._core._sockets import GetAddrInfoReturnType, convert_ipv6_sockaddr, is_socket_readable
 from .._core._synchronization import ResourceGuard
 from ..abc import IPSockAddrType, UDPPacketType
 from ..lowlevel import RunVar
@@ -744,6 +745,10 @@ def run_async_from_thread(func: Callable[..., Coroutine[Any, Any, T_Retval]], *a
     return f.result()
 
 
+def run_sync_soon_from_thread(func: Callable[..., Any], *args) -> None:
+    threadlocals.loop.call_soon_threadsafe(func, *args)
+
+
 class BlockingPortal(abc.BlockingPortal):
     __slots__ = '_loop'
 
@@ -899,6 +904,13 @@ class StreamProtocol(asyncio.Protocol):
         self.write_future.set_result(None)
 
 
+class TLSStreamProtocol(StreamProtocol):
+    def eof_received(self) -> Optional[bool]:
+        # The TLS layer closes the transport regardless of the return value
+        self.read_event.set()
+        return None
+
+
 class DatagramProtocol(asyncio.DatagramProtocol):
     read_queue: Deque[Tuple[bytes, IPSockAddrType]]
     read_event: asyncio.Event
@@ -944,34 +956,55 @@ class SocketStream(abc.SocketStream):
 
     async def receive(self, max_bytes: int = 65536) -> bytes:
         with self._receive_guard:
-            await checkpoint()
-            if not self._protocol.read_event.is_set() and not self._transport.is_closing():
-                self._transport.resume_reading()
-                await self._protocol.read_event.wait()
-                self._transport.pause_reading()
-
-            try:
-                chunk = self._protocol.read_queue.popleft()
-            except IndexError:
-                if self._closed:
-                    raise ClosedResourceError from None
-                elif self._protocol.exception:
-                    raise self._protocol.exception
-                else:
-                    raise EndOfStream
-
+            chunk = await self._receive_chunk()
             if len(chunk) > max_bytes:
                 # Split the oversized chunk
                 chunk, leftover = chunk[:max_bytes], chunk[max_bytes:]
-                self._protocol.read_queue.appendleft(leftover)
+                self._unread(leftover)
 
-            # If the read queue is empty, clear the flag so that the next call will block until
-            # data is available
-            if not self._protocol.read_queue:
-                self._protocol.read_event.clear()
+        return chunk
+
+    async def receive_into(self, buffer: memoryview) -> int:
+        buffer = memoryview(buffer).cast('B')
+        with self._receive_guard:
+            chunk = await self._receive_chunk()
+            nbytes = min(len(chunk), len(buffer))
+            with memoryview(chunk) as view:
+                buffer[:nbytes] = view[:nbytes]
+
+            if nbytes < len(chunk):
+                self._unread(chunk[nbytes:])
+
+        return nbytes
+
+    async def _receive_chunk(self) -> bytes:
+        await checkpoint()
+        if not self._protocol.read_event.is_set() and not self._transport.is_closing():
+            self._transport.resume_reading()
+            await self._protocol.read_event.wait()
+            self._transport.pause_reading()
+
+        try:
+            chunk = self._protocol.read_queue.popleft()
+        except IndexError:
+            if self._closed:
+                raise ClosedResourceError from None
+            elif self._protocol.exception:
+                raise self._protocol.exception
+            else:
+                raise EndOfStream
+
+        # If the read queue is empty, clear the flag so that the next call will block until
+        # data is available
+        if not self._protocol.read_queue:
+            self._protocol.read_event.clear()
 
         return chunk
 
+    def _unread(self, data: bytes) -> None:
+        self._protocol.read_queue.appendleft(data)
+        self._protocol.read_event.set()
+
     async def send(self, item: bytes) -> None:
         with self._send_guard:
             await checkpoint()
@@ -1000,7 +1033,8 @@ class SocketStream(abc.SocketStream):
             self._closed = True
             try:
                 self._transport.write_eof()
-            except OSError:
+            except (OSError, NotImplementedError):
+                # TLS transports don't support half-closing
                 pass
 
             self._transport.close()
@@ -1008,6 +1042,12 @@ class SocketStream(abc.SocketStream):
             self._transport.abort()
 
 
+def _set_pending_result(future: asyncio.Future) -> None:
+    # The future may have been cancelled before the reader/writer callback was removed
+    if not future.done():
+        future.set_result(None)
+
+
 class UNIXSocketStream(abc.SocketStream):
     _receive_future: Optional[asyncio.Future] = None
     _send_future: Optional[asyncio.Future] = None
@@ -1029,7 +1069,7 @@ class UNIXSocketStream(abc.SocketStream):
             loop.remove_reader(self.__raw_socket)
 
         f = self._receive_future = asyncio.Future()
-        self._loop.add_reader(self.__raw_socket, f.set_result, None)
+        self._loop.add_reader(self.__raw_socket, _set_pending_result, f)
         f.add_done_callback(callback)
         return f
 
@@ -1039,7 +1079,7 @@ class UNIXSocketStream(abc.SocketStream):
             loop.remove_writer(self.__raw_socket)
 
         f = self._send_future = asyncio.Future()
-        self._loop.add_writer(self.__raw_socket, f.set_result, None)
+        self._loop.add_writer(self.__raw_socket, _set_pending_result, f)
         f.add_done_callback(callback)
         return f
 
@@ -1067,6 +1107,26 @@ class UNIXSocketStream(abc.SocketStream):
 
                     return data
 
+    async def receive_into(self, buffer: memoryview) -> int:
+        loop = get_running_loop()
+        await checkpoint()
+        with self._receive_guard:
+            while True:
+                try:
+                    nbytes = self.__raw_socket.recv_into(buffer)
+                except BlockingIOError:
+                    await self._wait_until_readable(loop)
+                except OSError as exc:
+                    if self._closing:
+                        raise ClosedResourceError from None
+                    else:
+                        raise BrokenResourceError from exc
+                else:
+                    if not nbytes:
+                        raise EndOfStream
+
+                    return nbytes
+
     async def send(self, item: bytes) -> None:
         loop = get_running_loop()
         await checkpoint()
@@ -1234,12 +1294,15 @@ class UNIXSocketListener(abc.SocketListener):
             while True:
                 try:
                     client_sock, _ = self.__raw_socket.accept()
+                    client_sock.setblocking(False)
                     return UNIXSocketStream(client_sock)
                 except BlockingIOError:
-                    f: asyncio.Future = asyncio.Future()
-                    self._loop.add_reader(self.__raw_socket, f.set_result, None)
-                    f.add_done_callback(lambda _: self._loop.remove_reader(self.__raw_socket))
-                    await f
+                    event = asyncio.Event()
+                    self._loop.add_reader(self.__raw_socket, event.set)
+                    try:
+                        await event.wait()
+                    finally:
+                        self._loop.remove_reader(self.__raw_socket)
                 except OSError as exc:
                     if self._closed:
                         raise ClosedResourceError from None
@@ -1360,6 +1423,39 @@ async def connect_tcp(host: str, port: int,
     return SocketStream(transport, protocol)
 
 
+async def start_tls(stream: abc.AnyByteStream, ssl_context: ssl.SSLContext, server_side: bool,
+                    hostname: Optional[str]) -> Optional[Tuple[SocketStream, ssl.SSLObject]]:
+    # Only plain TCP streams can be upgraded, and only if no data has been buffered yet, as the
+    # data would otherwise be lost in the switch
+    if type(stream) is not SocketStream or stream._protocol.read_queue:
+        return None
+
+    loop = get_running_loop()
+    if not hasattr(loop, 'start_tls'):
+        # Python 3.6
+        return None
+
+    protocol = TLSStreamProtocol()
+    protocol.connection_made(stream._transport)
+    with stream._receive_guard, stream._send_guard:
+        try:
+            transport = await loop.start_tls(stream._transport, protocol, ssl_context,
+                                             server_side=server_side, server_hostname=hostname)
+        except ssl.SSLError:
+            raise
+        except OSError as exc:
+            raise BrokenResourceError from exc
+
+    if transport is None:
+        raise BrokenResourceError('The event loop did not return a TLS transport')
+
+    # The write buffer limits are left at their defaults, as the SSL transport doesn't pause and
+    # resume the protocol reliably with zero limits
+    transport.pause_reading()
+    native_stream = SocketStream(transport, protocol)
+    return native_stream, transport.get_extra_info('ssl_object')
+
+
 async def connect_unix(path: str) -> UNIXSocketStream:
     await checkpoint()
     loop = get_running_loop()
@@ -1471,6 +1567,15 @@ async def wait_socket_writable(sock: socket.SocketType) -> None:
         raise ClosedResourceError
 
 
+def is_socket_stream_readable(stream: abc.SocketStream) -> bool:
+    if isinstance(stream, SocketStream):
+        # Data or EOF may have been received before reading was paused
+        if stream._protocol.read_event.is_set() or stream._transport.is_closing():
+            return True
+
+    return is_socket_readable(stream.extra(abc.SocketAttribute.raw_socket))
+
+
 #
 # Synchronization
 #
@@ -1494,6 +1599,26 @@ class Event(abc.Event):
         return EventStatistics(len(self._event._waiters))
 
 
+class Waiter:
+    """
+    A lightweight, single use wakeup primitive for exactly one waiting task.
+
+    Unlike :class:`Event`, waiting on this does not involve a checkpoint.
+    """
+
+    __slots__ = '_future'
+
+    def __init__(self):
+        self._future = get_running_loop().create_future()
+
+    def set(self) -> None:
+        if not self._future.done():
+            self._future.set_result(None)
+
+    async def wait(self) -> None:
+        await self._future
+
+
 class CapacityLimiter(abc.CapacityLimiter):
     _total_tokens: float = 0
 
@@ -1,5 +1,6 @@
 import array
 import socket
+import ssl
 from concurrent.futures import Future
 from dataclasses import dataclass
 from functools import partial
@@ -15,11 +16,11 @@ from trio.to_thread import run_sync
 
 from .. import CapacityLimiterStatistics, EventStatistics, TaskInfo, abc
 from .._core._compat import DeprecatedAsyncContextManager, DeprecatedAwaitable, T
-from .._core._eventloop import claim_worker_thread
+from .._core._eventloop import claim_worker_thread, threadlocals
 from .._core._exceptions import (
     BrokenResourceError, BusyResourceError, ClosedResourceError, EndOfStream)
 from .._core._exceptions import ExceptionGroup as BaseExceptionGroup
-from .._core._sockets import convert_ipv6_sockaddr
+from .._core._sockets import convert_ipv6_sockaddr, is_socket_readable
 from .._core._synchronization import ResourceGuard
 from ..abc import IPSockAddrType, UDPPacketType
 
@@ -148,14 +149,20 @@ async def run_sync_in_worker_thread(
         limiter: Optional[trio.CapacityLimiter] = None) -> T_Retval:
     def wrapper():
         with claim_worker_thread('trio'):
+            threadlocals.trio_token = token
             return func(*args)
 
+    token = trio_lowlevel.current_trio_token()
     return await run_sync(wrapper, cancellable=cancellable, limiter=limiter)
 
 run_async_from_thread = trio.from_thread.run
 run_sync_from_thread = trio.from_thread.run_sync
 
 
+def run_sync_soon_from_thread(func: Callable[..., Any], *args) -> None:
+    threadlocals.trio_token.run_sync_soon(func, *args)
+
+
 class BlockingPortal(abc.BlockingPortal):
     def __init__(self):
         super().__init__()
@@ -310,6 +317,18 @@ class SocketStream(_TrioSocketMixin, abc.SocketStream):
             else:
                 raise EndOfStream
 
+    async def receive_into(self, buffer: memoryview) -> int:
+        with self._receive_guard:
+            try:
+                nbytes = await self._trio_socket.recv_into(buffer)
+            except BaseException as exc:
+                self._convert_socket_error(exc)
+
+            if nbytes:
+                return nbytes
+            else:
+                raise EndOfStream
+
     async def send(self, item: bytes) -> None:
         with self._send_guard:
             view = memoryview(item)
@@ -472,6 +491,13 @@ async def connect_tcp(host: str, port: int,
     return SocketStream(trio_socket)
 
 
+async def start_tls(stream: abc.AnyByteStream, ssl_context: ssl.SSLContext, server_side: bool,
+                    hostname: Optional[str]) -> None:
+    # Trio's own TLS implementation (trio.SSLStream) is built on memory BIOs just like TLSStream,
+    # so there is nothing to gain from switching to it
+    return None
+
+
 async def connect_unix(path: str) -> UNIXSocketStream:
     trio_socket = trio.socket.socket(socket.AF_UNIX)
     try:
@@ -526,6 +552,10 @@ async def wait_socket_writable(sock):
         raise BusyResourceError('writing to') from None
 
 
+def is_socket_stream_readable(stream: abc.SocketStream) -> bool:
+    return is_socket_readable(stream.extra(abc.SocketAttribute.raw_socket))
+
+
 #
 # Synchronization
 #
@@ -548,6 +578,36 @@ class Event(abc.Event):
         return DeprecatedAwaitable(self.set)
 
 
+class Waiter:
+    """
+    A lightweight, single use wakeup primitive for exactly one waiting task.
+
+    Unlike :class:`Event`, waiting on this does not involve a checkpoint.
+    """
+
+    __slots__ = '_task', '_is_set'
+
+    def __init__(self):
+        self._task: Optional[trio_lowlevel.Task] = None
+        self._is_set = False
+
+    def set(self) -> None:
+        if not self._is_set:
+            self._is_set = True
+            if self._task is not None:
+                trio_lowlevel.reschedule(self._task)
+                self._task = None
+
+    async def wait(self) -> None:
+        if not self._is_set:
+            self._task = trio_lowlevel.current_task()
+            await trio_lowlevel.wait_task_rescheduled(self._abort)
+
+    def _abort(self, raise_cancel) -> 'trio_lowlevel.Abort':
+        self._task = None
+        return trio_lowlevel.Abort.SUCCEEDED
+
+
 class CapacityLimiter(abc.CapacityLimiter):
     def __init__(self, *args, original: Optional[trio.CapacityLimiter] = None, **kwargs):
         self.__original = original or trio.CapacityLimiter(*args, **kwargs)
@@ -0,0 +1,380 @@
+import random
+import socket
+import struct
+from dataclasses import dataclass, field
+from os import PathLike
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union, cast
+
+from ..abc import Resolver
+from ..abc._sockets import GetAddrInfoReturnType
+from ._eventloop import get_asynclib
+from ._exceptions import EndOfStream, IncompleteRead
+from ._tasks import create_task_group, move_on_after
+
+_TYPE_A = 1
+_TYPE_CNAME = 5
+_TYPE_AAAA = 28
+_CLASS_IN = 1
+_RCODE_NOERROR = 0
+_RCODE_NXDOMAIN = 3
+_MAX_CNAME_CHAIN = 16
+
+_header = struct.Struct('!HHHHHH')
+_record_header = struct.Struct('!HHIH')
+_random = random.SystemRandom()
+
+
+class _MalformedResponse(Exception):
+    pass
+
+
+def _encode_name(name: str) -> bytes:
+    encoded = bytearray()
+    for label in name.rstrip('.').split('.'):
+        label_bytes = label.encode('ascii')
+        if not label_bytes or len(label_bytes) > 63:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+
+        encoded.append(len(label_bytes))
+        encoded += label_bytes
+
+    encoded.append(0)
+    if len(encoded) > 255:
+        raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+
+    return bytes(encoded)
+
+
+def _decode_name(data: bytes, offset: int) -> Tuple[bytes, int]:
+    # Names are kept as raw bytes, as labels in responses are not guaranteed to be ASCII
+    labels: List[bytes] = []
+    end_offset: Optional[int] = None
+    for _ in range(128):
+        length = data[offset]
+        if length & 0xc0 == 0xc0:
+            # Compression pointer: the rest of the name is found elsewhere in the message
+            if end_offset is None:
+                end_offset = offset + 2
+
+            offset = (length & 0x3f) << 8 | data[offset + 1]
+        elif length:
+            labels.append(data[offset + 1:offset + 1 + length])
+            offset += 1 + length
+        else:
+            return b'.'.join(labels).lower(), offset + 1 if end_offset is None else end_offset
+
+    raise _MalformedResponse('too many labels or compression pointers')
+
+
+def _encode_query(query_id: int, name: str, qtype: int) -> bytes:
+    # Flags: standard query with recursion desired
+    return _header.pack(query_id, 0x0100, 1, 0, 0, 0) + _encode_name(name) + \
+        struct.pack('!HH', qtype, _CLASS_IN)
+
+
+def _parse_response(data: bytes, query_id: int, name: str,
+                    qtype: int) -> Tuple[int, bool, List[Tuple[bytes, int, bytes]]]:
+    """
+    Parse a response to a query made with :func:`_encode_query`.
+
+    :return: a tuple of (rcode, truncated, answer records as (name, type, rdata))
+    :raises _MalformedResponse: if the message is not a valid response to the query
+
+    """
+    try:
+        response_id, flags, qdcount, ancount, _, _ = _header.unpack_from(data)
+        if response_id != query_id or not flags & 0x8000 or qdcount != 1:
+            raise _MalformedResponse('not a response to this query')
+
+        question, offset = _decode_name(data, _header.size)
+        if question != name.rstrip('.').lower().encode('ascii') or \
+                struct.unpack_from('!HH', data, offset) != (qtype, _CLASS_IN):
+            raise _MalformedResponse('the question does not match the query')
+
+        offset += 4
+        answers = []
+        for _ in range(ancount):
+            owner, offset = _decode_name(data, offset)
+            rtype, rclass, _ttl, rdlength = _record_header.unpack_from(data, offset)
+            offset += _record_header.size
+            if offset + rdlength > len(data):
+                raise _MalformedResponse('truncated resource record')
+
+            if rclass == _CLASS_IN:
+                if rtype == _TYPE_CNAME:
+                    rdata = _decode_name(data, offset)[0]
+                else:
+                    rdata = data[offset:offset + rdlength]
+
+                answers.append((owner, rtype, rdata))
+
+            offset += rdlength
+    except (IndexError, struct.error) as exc:
+        raise _MalformedResponse('truncated message') from exc
+
+    return flags & 0x000f, bool(flags & 0x0200), answers
+
+
+def _read_resolv_conf(path: Union[str, 'PathLike[str]']) -> Dict[str, List[str]]:
+    options: Dict[str, List[str]] = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                fields = line.split('#', 1)[0].split(';', 1)[0].split()
+                if len(fields) >= 2:
+                    if fields[0] == 'options':
+                        options.setdefault('options', []).extend(fields[1:])
+                    elif fields[0] == 'nameserver':
+                        options.setdefault('nameserver', []).append(fields[1])
+                    elif fields[0] in ('search', 'domain'):
+                        # The last "search" or "domain" line wins
+                        options['search'] = fields[1:]
+    except OSError:
+        pass
+
+    return options
+
+
+def _read_hosts(path: Union[str, 'PathLike[str]']) -> Dict[str, List[str]]:
+    hosts: Dict[str, List[str]] = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                fields = line.split('#', 1)[0].split()
+                if len(fields) >= 2:
+                    for name in fields[1:]:
+                        addresses = hosts.setdefault(name.rstrip('.').lower(), [])
+                        if fields[0] not in addresses:
+                            addresses.append(fields[0])
+    except OSError:
+        pass
+
+    return hosts
+
+
+@dataclass(eq=False)
+class DNSResolver(Resolver):
+    """
+    Resolves host names by sending DNS queries directly to the name servers, using UDP sockets
+    (and TCP for truncated responses) instead of worker threads.
+
+    Any settings not explicitly given are read from ``resolv_conf``, with the same defaults as the
+    C library's resolver. The hosts file is consulted before making any queries. Both files are
+    read when the resolver is created.
+
+    Only ``A`` and ``AAAA`` queries are made, and features of the system resolver like NSS modules
+    or the address sorting rules of :rfc:`6724` are not supported. IP addresses and ``None`` as the
+    host are handled by :func:`socket.getaddrinfo` directly, as they never require a lookup.
+
+    :param nameservers: IP addresses of the name servers to query, in order of preference
+    :param port: the port the name servers listen on
+    :param search: domains to append to host names with fewer than ``ndots`` dots
+    :param timeout: time (in seconds) to wait for a response from each name server
+    :param attempts: number of times to try every name server before giving up
+    :param ndots: number of dots a host name must have to be first tried as an absolute name
+    :param resolv_conf: path to the resolver configuration file
+    :param hosts_file: path to the hosts file, or ``None`` to skip the hosts file
+
+    .. versionadded:: 3.0
+    """
+
+    nameservers: Optional[Sequence[str]] = None
+    port: int = 53
+    search: Optional[Sequence[str]] = None
+    timeout: Optional[float] = None
+    attempts: Optional[int] = None
+    ndots: Optional[int] = None
+    resolv_conf: Union[str, 'PathLike[str]'] = '/etc/resolv.conf'
+    hosts_file: Union[str, 'PathLike[str]', None] = '/etc/hosts'
+    _hosts: Dict[str, List[str]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if None in (self.nameservers, self.search, self.timeout, self.attempts, self.ndots):
+            config = _read_resolv_conf(self.resolv_conf)
+            options = dict(option.partition(':')[::2] for option in config.get('options', []))
+            if self.nameservers is None:
+                self.nameservers = config.get('nameserver', ['127.0.0.1'])
+            if self.search is None:
+                self.search = config.get('search', [])
+            if self.timeout is None:
+                self.timeout = float(options.get('timeout') or 5)
+            if self.attempts is None:
+                self.attempts = int(options.get('attempts') or 2)
+            if self.ndots is None:
+                self.ndots = int(options.get('ndots') or 1)
+
+        if not self.nameservers:
+            raise ValueError('at least one name server is required')
+
+        self._hosts = _read_hosts(self.hosts_file) if self.hosts_file is not None else {}
+
+    async def getaddrinfo(self, host: Optional[bytes], port: Union[str, int, None], *,
+                          family: int = 0, type: int = 0, proto: int = 0,
+                          flags: int = 0) -> GetAddrInfoReturnType:
+        # Numeric addresses never block, so the standard library can handle them
+        try:
+            return cast(GetAddrInfoReturnType,
+                        socket.getaddrinfo(host, port, family, type, proto,
+                                           flags | socket.AI_NUMERICHOST))
+        except socket.gaierror as exc:
+            if host is None or flags & socket.AI_NUMERICHOST or exc.errno != socket.EAI_NONAME:
+                raise
+
+        if family not in (socket.AF_UNSPEC, socket.AF_INET, socket.AF_INET6):
+            raise socket.gaierror(socket.EAI_FAMILY, 'ai_family not supported')
+
+        name = host.decode('ascii').rstrip('.').lower()
+        families = [socket.AF_INET6, socket.AF_INET] if family == socket.AF_UNSPEC else [family]
+        addresses = [address for address in self._hosts.get(name, [])
+                     if (socket.AF_INET6 if ':' in address else socket.AF_INET) in families]
+        canonname = name
+        if not addresses and (name == 'localhost' or name.endswith('.localhost')):
+            # Names in the .localhost domain always resolve to loopback addresses (RFC 6761)
+            addresses = [address for fam, address in [(socket.AF_INET6, '::1'),
+                                                      (socket.AF_INET, '127.0.0.1')]
+                         if fam in families]
+        elif not addresses:
+            canonname, addresses = await self._lookup(host.decode('ascii'), families)
+
+        result: GetAddrInfoReturnType = []
+        for address in addresses:
+            result += cast(GetAddrInfoReturnType, socket.getaddrinfo(
+                address, port, family, type, proto,
+                flags & socket.AI_NUMERICSERV | socket.AI_NUMERICHOST))
+
+        if result and flags & socket.AI_CANONNAME:
+            result[0] = result[0][:3] + (canonname,) + result[0][4:]
+
+        return result
+
+    async def _lookup(self, name: str, families: Sequence[int]) -> Tuple[str, List[str]]:
+        if name.endswith('.'):
+            candidates = [name]
+        else:
+            assert self.search is not None
+            assert self.ndots is not None
+            searched = [f'{name}.{domain}' for domain in self.search]
+            if name.count('.') >= self.ndots:
+                candidates = [name] + searched
+            else:
+                candidates = searched + [name]
+
+        temporary_failure = False
+        for candidate in candidates:
+            answers: Dict[int, Tuple[str, List[str]]] = {}
+            failures: Set[int] = set()
+
+            async def query(fam: int) -> None:
+                try:
+                    answers[fam] = await self._query(
+                        candidate, _TYPE_AAAA if fam == socket.AF_INET6 else _TYPE_A)
+                except socket.gaierror as exc:
+                    if exc.errno == socket.EAI_AGAIN:
+                        failures.add(fam)
+
+            async with create_task_group() as tg:
+                for fam in families:
+                    tg.spawn(query, fam)
+
+            addresses: List[str] = []
+            canonname = candidate.rstrip('.').lower()
+            for fam in families:
+                if fam in answers:
+                    canonname, fam_addresses = answers[fam]
+                    addresses += fam_addresses
+
+            if addresses:
+                return canonname, addresses
+
+            temporary_failure = temporary_failure or bool(failures)
+
+        if temporary_failure:
+            raise socket.gaierror(socket.EAI_AGAIN, 'Temporary failure in name resolution')
+        else:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+
+    async def _query(self, name: str, qtype: int) -> Tuple[str, List[str]]:
+        """
+        Query the name servers for records of the given type.
+
+        :return: a tuple of (canonical name, addresses)
+        :raises socket.gaierror: with ``EAI_NONAME`` if the name does not exist, or
+            ``EAI_AGAIN`` if none of the name servers gave a usable response
+
+        """
+        assert self.nameservers is not None
+        assert self.attempts is not None
+        for _ in range(self.attempts):
+            for nameserver in self.nameservers:
+                response = await self._exchange(nameserver, name, qtype)
+                if response is None:
+                    continue
+
+                rcode, answers = response
+                if rcode == _RCODE_NXDOMAIN:
+                    raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+                elif rcode == _RCODE_NOERROR:
+                    return self._collect_addresses(name, qtype, answers)
+
+        raise socket.gaierror(socket.EAI_AGAIN, 'Temporary failure in name resolution')
+
+    async def _exchange(self, nameserver: str, name: str,
+                        qtype: int) -> Optional[Tuple[int, List[Tuple[bytes, int, bytes]]]]:
+        query_id = _random.getrandbits(16)
+        query = _encode_query(query_id, name, qtype)
+        response = None
+        with move_on_after(self.timeout):
+            try:
+                family, *_, sockaddr = socket.getaddrinfo(
+                    nameserver, self.port, type=socket.SOCK_DGRAM, flags=socket.AI_NUMERICHOST)[0]
+                udp = await get_asynclib().create_udp_socket(family, None, sockaddr, False)
+                async with udp:
+                    await udp.send(query)
+                    while True:
+                        # Ignore anything that is not a response to this query, as it may be
+                        # a late response to an earlier one or a spoofing attempt
+                        try:
+                            rcode, truncated, answers = _parse_response(
+                                await udp.receive(), query_id, name, qtype)
+                        except _MalformedResponse:
+                            continue
+
+                        if truncated:
+                            response = await self._exchange_tcp(nameserver, query, query_id,
+                                                                name, qtype)
+                        else:
+                            response = rcode, answers
+
+                        break
+            except OSError:
+                pass
+
+        return response
+
+    async def _exchange_tcp(self, nameserver: str, query: bytes, query_id: int, name: str,
+                            qtype: int) -> Optional[Tuple[int, List[Tuple[bytes, int, bytes]]]]:
+        from ..streams.buffered import BufferedByteReceiveStream
+
+        try:
+            async with await get_asynclib().connect_tcp(nameserver, self.port) as stream:
+                await stream.send(struct.pack('!H', len(query)) + query)
+                buffered = BufferedByteReceiveStream(stream)
+                length = struct.unpack('!H', await buffered.receive_exactly(2))[0]
+                rcode, _, answers = _parse_response(await buffered.receive_exactly(length),
+                                                    query_id, name, qtype)
+                return rcode, answers
+        except (OSError, EndOfStream, IncompleteRead, _MalformedResponse):
+            return None
+
+    def _collect_addresses(self, name: str, qtype: int,
+                           answers: List[Tuple[bytes, int, bytes]]) -> Tuple[str, List[str]]:
+        # Follow the CNAME chain from the queried name to the canonical name
+        cnames = {owner: rdata for owner, rtype, rdata in answers if rtype == _TYPE_CNAME}
+        owners = [name.rstrip('.').lower().encode('ascii')]
+        while owners[-1] in cnames and len(owners) <= _MAX_CNAME_CHAIN:
+            owners.append(cnames[owners[-1]])
+
+        fam, size = (socket.AF_INET6, 16) if qtype == _TYPE_AAAA else (socket.AF_INET, 4)
+        addresses = [socket.inet_ntop(fam, rdata) for owner, rtype, rdata in answers
+                     if rtype == qtype and len(rdata) == size and owner in owners]
+        return owners[-1].decode('ascii', 'replace'), addresses
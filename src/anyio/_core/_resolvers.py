@@ -0,0 +1,154 @@
+import socket
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple, Union, cast
+
+from ..abc import CapacityLimiter, Event, Resolver
+from ..abc._sockets import GetAddrInfoReturnType
+from ..lowlevel import RunVar, checkpoint
+from ._eventloop import get_asynclib
+from ._synchronization import create_capacity_limiter, create_event
+from ._threads import run_sync_in_worker_thread
+
+_default_resolver: RunVar[Optional[Resolver]] = RunVar('_default_resolver', None)
+
+_CacheKey = Tuple[Optional[bytes], Union[str, int, None], int, int, int, int]
+
+
+def current_default_resolver() -> Optional[Resolver]:
+    """
+    Return the resolver used by :func:`~anyio.getaddrinfo` in the current event loop.
+
+    :return: the resolver, or ``None`` if the backend's own host name resolution is used
+
+    .. versionadded:: 3.0
+
+    """
+    return _default_resolver.get()
+
+
+def set_default_resolver(resolver: Optional[Resolver]) -> None:
+    """
+    Set the resolver used by :func:`~anyio.getaddrinfo` (and thus by :func:`~anyio.connect_tcp`
+    and others) in the current event loop.
+
+    :param resolver: the resolver to use, or ``None`` to go back to the backend's own host name
+        resolution
+
+    .. versionadded:: 3.0
+
+    """
+    _default_resolver.set(resolver)
+
+
+@dataclass(eq=False)
+class ThreadedResolver(Resolver):
+    """
+    Resolves host names by calling :func:`socket.getaddrinfo` in worker threads.
+
+    Unlike the backends' own host name resolution, the worker threads are limited by a capacity
+    limiter of their own, so a large number of lookups cannot starve other users of worker threads
+    (like file I/O).
+
+    :param max_threads: maximum number of lookups to run concurrently
+
+    .. versionadded:: 3.0
+    """
+
+    max_threads: int = 10
+    _limiter: Optional[CapacityLimiter] = field(init=False, default=None)
+
+    async def getaddrinfo(self, host: Optional[bytes], port: Union[str, int, None], *,
+                          family: int = 0, type: int = 0, proto: int = 0,
+                          flags: int = 0) -> GetAddrInfoReturnType:
+        if self._limiter is None:
+            self._limiter = create_capacity_limiter(self.max_threads)
+
+        result = await run_sync_in_worker_thread(socket.getaddrinfo, host, port, family, type,
+                                                 proto, flags, cancellable=True,
+                                                 limiter=self._limiter)
+        return cast(GetAddrInfoReturnType, result)
+
+
+@dataclass(eq=False)
+class CachingResolver(Resolver):
+    """
+    Caches the results of another resolver.
+
+    Successful lookups are cached for ``ttl`` seconds, and failed ones (those that raised
+    :exc:`socket.gaierror`) for ``negative_ttl`` seconds. If several tasks look up the same name
+    at the same time, only one lookup is made, and the other tasks wait for its result.
+
+    .. note:: As the underlying resolver does not report the time-to-live values of the DNS
+        records, the same ``ttl`` is used for all cached results.
+
+    :param resolver: the resolver whose results to cache (defaults to a new
+        :class:`ThreadedResolver`)
+    :param ttl: the time (in seconds) to cache the results of successful lookups
+    :param negative_ttl: the time (in seconds) to cache failed lookups
+    :param max_entries: maximum number of results to keep in the cache (the least recently used
+        ones are discarded first)
+
+    .. versionadded:: 3.0
+    """
+
+    resolver: Resolver = field(default_factory=ThreadedResolver)
+    ttl: float = 60
+    negative_ttl: float = 5
+    max_entries: int = 1024
+    _cache: 'OrderedDict[_CacheKey, Tuple[float, Union[GetAddrInfoReturnType, socket.gaierror]]]' \
+        = field(init=False, default_factory=OrderedDict)
+    _lookups: Dict[_CacheKey, Event] = field(init=False, default_factory=dict)
+
+    async def getaddrinfo(self, host: Optional[bytes], port: Union[str, int, None], *,
+                          family: int = 0, type: int = 0, proto: int = 0,
+                          flags: int = 0) -> GetAddrInfoReturnType:
+        key = host, port, family, type, proto, flags
+        while True:
+            entry = self._cache.get(key)
+            if entry is not None:
+                expires, result = entry
+                if expires > get_asynclib().current_time():
+                    self._cache.move_to_end(key)
+                    await checkpoint()
+                    if isinstance(result, socket.gaierror):
+                        raise socket.gaierror(*result.args)
+
+                    return list(result)
+
+                del self._cache[key]
+
+            # Wait for an ongoing lookup of the same name to finish, if there is one.
+            # If it fails without a cacheable result, do the lookup here instead.
+            event = self._lookups.get(key)
+            if event is None:
+                break
+
+            await event.wait()
+
+        event = self._lookups[key] = create_event()
+        try:
+            try:
+                result = await self.resolver.getaddrinfo(host, port, family=family, type=type,
+                                                         proto=proto, flags=flags)
+            except socket.gaierror as exc:
+                self._store(key, exc, self.negative_ttl)
+                raise
+
+            self._store(key, result, self.ttl)
+            return list(result)
+        finally:
+            del self._lookups[key]
+            event.set()
+
+    def _store(self, key: _CacheKey, result: Union[GetAddrInfoReturnType, socket.gaierror],
+               ttl: float) -> None:
+        if ttl > 0:
+            self._cache[key] = get_asynclib().current_time() + ttl, result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        """Discard all cached results."""
+        self._cache.clear()
@@ -1,20 +1,31 @@
+import select
 import socket
 import ssl
 import sys
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from functools import partial
 from ipaddress import IPv6Address, ip_address
 from os import PathLike, chmod
 from pathlib import Path
 from socket import AddressFamily, SocketKind
-from typing import Awaitable, List, Optional, Tuple, Union, cast, overload
+from types import TracebackType
+from typing import (
+    AsyncContextManager, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple,
+    Type, Union, cast, overload)
 
 from ..abc import (
-    ConnectedUDPSocket, Event, IPAddressType, IPSockAddrType, SocketListener, SocketStream,
-    UDPSocket, UNIXSocketStream)
+    AnyByteStream, AsyncResource, ConnectedUDPSocket, Event, IPAddressType, IPSockAddrType,
+    SocketListener, SocketStream, UDPSocket, UNIXSocketStream)
+from ..abc._sockets import GetAddrInfoReturnType
+from ..lowlevel import RunVar
 from ..streams.stapled import MultiListener
-from ..streams.tls import TLSStream
+from ..streams.tls import TLSSessionCache, TLSStream
 from ._eventloop import get_asynclib
+from ._exceptions import ClosedResourceError
+from ._resolvers import current_default_resolver
 from ._resources import aclose_forcefully
-from ._synchronization import create_event
+from ._synchronization import create_event, create_semaphore
 from ._tasks import create_task_group, move_on_after
 from ._threads import run_sync_in_worker_thread
 
@@ -25,7 +36,14 @@ else:
 
 IPPROTO_IPV6 = getattr(socket, 'IPPROTO_IPV6', 41)  # https://bugs.python.org/issue29515
 
-GetAddrInfoReturnType = List[Tuple[AddressFamily, SocketKind, int, str, Tuple[str, int]]]
+# Happy Eyeballs v2 parameters (RFC 8305, section 8)
+_RESOLUTION_DELAY = 0.05
+_DEFAULT_ATTEMPT_DELAY = 0.25
+_MIN_ATTEMPT_DELAY = 0.1
+_MAX_ATTEMPT_DELAY = 2.0
+
+_smoothed_connect_time: RunVar[Optional[float]] = RunVar('_smoothed_connect_time', None)
+
 AnyIPAddressFamily = Literal[AddressFamily.AF_UNSPEC, AddressFamily.AF_INET,
                              AddressFamily.AF_INET6]
 IPAddressFamily = Literal[AddressFamily.AF_INET, AddressFamily.AF_INET6]
@@ -36,7 +54,8 @@ IPAddressFamily = Literal[AddressFamily.AF_INET, AddressFamily.AF_INET6]
 async def connect_tcp(
     remote_host: IPAddressType, remote_port: int, *, local_host: Optional[IPAddressType] = ...,
     ssl_context: Optional[ssl.SSLContext] = ..., tls_standard_compatible: bool = ...,
-    tls_hostname: str, happy_eyeballs_delay: float = ...
+    tls_hostname: str, tls_session_cache: Optional[TLSSessionCache] = ...,
+    tls_native: bool = ..., happy_eyeballs_delay: Optional[float] = ...
 ) -> TLSStream:
     ...
 
@@ -46,7 +65,8 @@ async def connect_tcp(
 async def connect_tcp(
     remote_host: IPAddressType, remote_port: int, *, local_host: Optional[IPAddressType] = ...,
     ssl_context: ssl.SSLContext, tls_standard_compatible: bool = ...,
-    tls_hostname: Optional[str] = ..., happy_eyeballs_delay: float = ...
+    tls_hostname: Optional[str] = ..., tls_session_cache: Optional[TLSSessionCache] = ...,
+    tls_native: bool = ..., happy_eyeballs_delay: Optional[float] = ...
 ) -> TLSStream:
     ...
 
@@ -57,7 +77,8 @@ async def connect_tcp(
     remote_host: IPAddressType, remote_port: int, *, local_host: Optional[IPAddressType] = ...,
     tls: Literal[True], ssl_context: Optional[ssl.SSLContext] = ...,
     tls_standard_compatible: bool = ..., tls_hostname: Optional[str] = ...,
-    happy_eyeballs_delay: float = ...
+    tls_session_cache: Optional[TLSSessionCache] = ..., tls_native: bool = ...,
+    happy_eyeballs_delay: Optional[float] = ...
 ) -> TLSStream:
     ...
 
@@ -68,7 +89,8 @@ async def connect_tcp(
     remote_host: IPAddressType, remote_port: int, *, local_host: Optional[IPAddressType] = ...,
     tls: Literal[False], ssl_context: Optional[ssl.SSLContext] = ...,
     tls_standard_compatible: bool = ..., tls_hostname: Optional[str] = ...,
-    happy_eyeballs_delay: float = ...
+    tls_session_cache: Optional[TLSSessionCache] = ..., tls_native: bool = ...,
+    happy_eyeballs_delay: Optional[float] = ...
 ) -> SocketStream:
     ...
 
@@ -77,23 +99,25 @@ async def connect_tcp(
 @overload
 async def connect_tcp(
     remote_host: IPAddressType, remote_port: int, *, local_host: Optional[IPAddressType] = ...,
-    happy_eyeballs_delay: float = ...
+    happy_eyeballs_delay: Optional[float] = ...
 ) -> SocketStream:
     ...
 
 
 async def connect_tcp(
     remote_host, remote_port, *, local_host=None, tls=False, ssl_context=None,
-    tls_standard_compatible=True, tls_hostname=None, happy_eyeballs_delay=0.25
+    tls_standard_compatible=True, tls_hostname=None, tls_session_cache=None, tls_native=False,
+    happy_eyeballs_delay=None
 ):
     """
     Connect to a host using the TCP protocol.
 
-    This function implements the stateless version of the Happy Eyeballs algorithm (RFC 6555).
-    If ``address`` is a host name that resolves to multiple IP addresses, each one is tried until
-    one connection attempt succeeds. If the first attempt does not connected within 250
-    milliseconds, a second attempt is started using the next address in the list, and so on.
-    On IPv6 enabled systems, an IPv6 address (if available) is tried first.
+    This function implements the Happy Eyeballs version 2 algorithm (:rfc:`8305`). If
+    ``remote_host`` is a host name, its IPv6 and IPv4 addresses are looked up in parallel, and
+    connection attempts are started as soon as the first addresses are known. The addresses are
+    tried in turns by address family, starting with IPv6, until one connection attempt succeeds.
+    If an attempt has not succeeded or failed within the connection attempt delay, the next one is
+    started without cancelling the earlier ones, and so on.
 
     When the connection has been established, a TLS handshake will be done if either
     ``ssl_context`` or ``tls_hostname`` is not ``None``, or if ``tls`` is ``True``.
@@ -103,7 +127,8 @@ async def connect_tcp(
     :param local_host: the interface address or name to bind the socket to before connecting
     :param tls: ``True`` to do a TLS handshake with the connected stream and return a
         :class:`~anyio.streams.tls.TLSStream` instead
-    :param ssl_context: the SSL context object to use (if omitted, a default context is created)
+    :param ssl_context: the SSL context object to use (if omitted, the cached default context
+        from :func:`~anyio.streams.tls.get_default_ssl_context` is used)
     :param tls_standard_compatible: If ``True``, performs the TLS shutdown handshake before closing
         the stream and requires that the server does this as well. Otherwise,
         :exc:`~ssl.SSLEOFError` may be raised during reads from the stream.
@@ -111,22 +136,36 @@ async def connect_tcp(
         See :meth:`~ssl.SSLContext.wrap_socket` for details.
     :param tls_hostname: host name to check the server certificate against (defaults to the value
         of ``remote_host``)
+    :param tls_session_cache: a cache for resuming earlier TLS sessions with the same host (see
+        :class:`~anyio.streams.tls.TLSSessionCache`)
+    :param tls_native: use the event loop's own TLS implementation if possible (requires
+        ``tls_standard_compatible=False``; see :ref:`NativeTLS`)
     :param happy_eyeballs_delay: delay (in seconds) before starting the next connection attempt
+        (if omitted, the delay is derived from the recently observed connection setup times,
+        between 100 milliseconds and 2 seconds, starting with 250 milliseconds)
     :return: a socket stream object if no TLS handshake was done, otherwise a TLS stream
     :raises OSError: if the connection attempt fails
 
+    .. versionchanged:: 3.0
+        Implements Happy Eyeballs version 2 instead of version 1, and the connection attempt
+        delay adapts to the network by default.
+
     """
     # Placed here due to https://github.com/python/mypy/issues/7057
     connected_stream: Optional[SocketStream] = None
+    last_family: Optional[int] = None
+    pending_resolutions = 0
 
     async def try_connect(remote_host: str, event: Event):
         nonlocal connected_stream
+        start_time = asynclib.current_time()
         try:
             stream = await asynclib.connect_tcp(remote_host, remote_port, local_address)
         except OSError as exc:
             oserrors.append(exc)
             return
         else:
+            _record_connect_time(asynclib.current_time() - start_time)
             if connected_stream is None:
                 connected_stream = stream
                 tg.cancel_scope.cancel()
@@ -134,6 +173,42 @@ async def connect_tcp(
                 await stream.aclose()
         finally:
             event.set()
+            wakeup.set()
+
+    async def resolve(family: socket.AddressFamily) -> None:
+        nonlocal pending_resolutions
+        try:
+            gai_res = await getaddrinfo(target_host, remote_port, family=family,
+                                        type=socket.SOCK_STREAM)
+        except OSError as exc:
+            gai_errors.append(exc)
+            gai_res = []
+
+        if family == socket.AF_INET and ipv6_resolved is not None:
+            # If the A records arrive first, give the AAAA lookup a moment to catch up so that
+            # IPv6 still gets preferred (Resolution Delay)
+            with move_on_after(_RESOLUTION_DELAY):
+                await ipv6_resolved.wait()
+        elif family == socket.AF_INET6 and ipv6_resolved is not None:
+            ipv6_resolved.set()
+
+        for af, *_, sa in gai_res:
+            if sa[0] not in seen_addresses:
+                seen_addresses.add(sa[0])
+                pending_addrs[af].append(sa[0])
+
+        pending_resolutions -= 1
+        wakeup.set()
+
+    def next_address() -> Optional[str]:
+        nonlocal last_family
+        # Alternate between the address families, starting with IPv6
+        for af in sorted(pending_addrs, key=lambda af: af == last_family):
+            if pending_addrs[af]:
+                last_family = af
+                return pending_addrs[af].popleft()
+
+        return None
 
     asynclib = get_asynclib()
     local_address: Optional[IPSockAddrType] = None
@@ -143,41 +218,62 @@ async def connect_tcp(
         family, *_, local_address = gai_res[0]
 
     target_host = str(remote_host)
+    pending_addrs: Dict[int, Deque[str]] = {socket.AF_INET6: deque(), socket.AF_INET: deque()}
+    seen_addresses: Set[str] = set()
+    gai_errors: List[OSError] = []
+    oserrors: List[OSError] = []
+    attempts: List[Event] = []
+    ipv6_resolved: Optional[Event] = None
     try:
         addr_obj = ip_address(remote_host)
     except ValueError:
-        # getaddrinfo() will raise an exception if name resolution fails
-        gai_res = await getaddrinfo(target_host, remote_port, family=family,
-                                    type=socket.SOCK_STREAM)
-
-        # Organize the list so that the first address is an IPv6 address (if available) and the
-        # second one is an IPv4 addresses. The rest can be in whatever order.
-        v6_found = v4_found = False
-        target_addrs: List[Tuple[socket.AddressFamily, str]] = []
-        for af, *rest, sa in gai_res:
-            if af == socket.AF_INET6 and not v6_found:
-                v6_found = True
-                target_addrs.insert(0, (af, sa[0]))
-            elif af == socket.AF_INET and not v4_found and v6_found:
-                v4_found = True
-                target_addrs.insert(1, (af, sa[0]))
-            else:
-                target_addrs.append((af, sa[0]))
+        if family == socket.AF_UNSPEC:
+            families = [socket.AF_INET6, socket.AF_INET]
+            ipv6_resolved = create_event()
+        else:
+            families = [family]
     else:
+        families = []
         if isinstance(addr_obj, IPv6Address):
-            target_addrs = [(socket.AF_INET6, addr_obj.compressed)]
+            pending_addrs[socket.AF_INET6].append(addr_obj.compressed)
         else:
-            target_addrs = [(socket.AF_INET, addr_obj.compressed)]
+            pending_addrs[socket.AF_INET].append(addr_obj.compressed)
+
+    if happy_eyeballs_delay is None:
+        happy_eyeballs_delay = _connection_attempt_delay()
 
-    oserrors: List[OSError] = []
     async with create_task_group() as tg:
-        for i, (af, addr) in enumerate(target_addrs):
+        # Resolve the IPv6 and IPv4 addresses in parallel, and start connecting as soon as the
+        # first addresses are available
+        for af in families:
+            pending_resolutions += 1
+            tg.spawn(resolve, af)
+
+        while True:
+            wakeup = create_event()
+            addr = next_address()
+            if addr is None:
+                if not pending_resolutions and all(event.is_set() for event in attempts):
+                    break
+
+                # Wait for more addresses, or for a connection attempt to finish
+                await wakeup.wait()
+                continue
+
             event = create_event()
+            attempts.append(event)
             tg.spawn(try_connect, addr, event)
             with move_on_after(happy_eyeballs_delay):
                 await event.wait()
 
     if connected_stream is None:
+        if not oserrors:
+            # Name resolution failed for every address family
+            if gai_errors:
+                raise gai_errors[0]
+
+            raise OSError(f'No addresses found for {target_host}')
+
         cause = oserrors[0] if len(oserrors) == 1 else asynclib.ExceptionGroup(oserrors)
         raise OSError('All connection attempts failed') from cause
 
@@ -186,7 +282,9 @@ async def connect_tcp(
             return await TLSStream.wrap(connected_stream, server_side=False,
                                         hostname=tls_hostname or remote_host,
                                         ssl_context=ssl_context,
-                                        standard_compatible=tls_standard_compatible)
+                                        standard_compatible=tls_standard_compatible,
+                                        session_cache=tls_session_cache,
+                                        native=tls_native)
         except BaseException:
             await aclose_forcefully(connected_stream)
             raise
@@ -392,6 +490,7 @@ async def getaddrinfo(host: Union[bytearray, bytes, str], port: Union[str, int,
     :return: list of tuples containing (family, type, proto, canonname, sockaddr)
 
     .. seealso:: :func:`socket.getaddrinfo`
+    .. seealso:: :func:`set_default_resolver` for customizing how host names are resolved
 
     """
     # Handle unicode hostnames
@@ -404,8 +503,13 @@ async def getaddrinfo(host: Union[bytearray, bytes, str], port: Union[str, int,
     else:
         encoded_host = host
 
-    gai_res = await get_asynclib().getaddrinfo(encoded_host, port, family=family, type=type,
-                                               proto=proto, flags=flags)
+    resolver = current_default_resolver()
+    if resolver is not None:
+        gai_res = await resolver.getaddrinfo(encoded_host, port, family=family, type=type,
+                                             proto=proto, flags=flags)
+    else:
+        gai_res = await get_asynclib().getaddrinfo(encoded_host, port, family=family, type=type,
+                                                   proto=proto, flags=flags)
     return [(family, type, proto, canonname, convert_ipv6_sockaddr(sockaddr))
             for family, type, proto, canonname, sockaddr in gai_res]
 
@@ -464,6 +568,265 @@ def wait_socket_writable(sock: socket.socket) -> Awaitable[None]:
     return get_asynclib().wait_socket_writable(sock)
 
 
+@dataclass(frozen=True)
+class ConnectionPoolStatistics:
+    """
+    :ivar int connections_in_use: number of connections currently handed out by the pool
+    :ivar int connections_idle: number of open connections waiting to be reused
+    :ivar int connections_created: total number of connections opened by the pool
+    :ivar int connections_reused: total number of times an idle connection was handed out again
+
+    .. versionadded:: 3.0
+    """
+
+    connections_in_use: int
+    connections_idle: int
+    connections_created: int
+    connections_reused: int
+
+
+class _PoolEntry:
+    def __init__(self, max_connections: int):
+        self.semaphore = create_semaphore(max_connections)
+        self.idle: List[AnyByteStream] = []
+        self.users = 0
+
+
+class ConnectionPool(AsyncResource):
+    """
+    Keeps connections made with :func:`connect_tcp` and :func:`connect_unix` open for reuse.
+
+    Connections are handed out as asynchronous context managers. When the ``async with`` block
+    exits normally, the connection is returned to the pool. If the block raises an exception, or
+    if :meth:`discard` was called for the connection, it is closed instead, as it may have been
+    left in an unknown state.
+
+    Connections to the same host, port and TLS settings are interchangeable. Idle connections are
+    checked for incoming data or EOF before being handed out again, and are closed if any is found,
+    as that usually means the peer has closed the connection.
+
+    Idle connections are closed lazily: connections that have been idle for longer than the idle
+    timeout are only closed when a connection is next acquired from or returned to the pool.
+
+    Use :func:`create_connection_pool` to create a connection pool.
+
+    .. versionadded:: 3.0
+    """
+
+    def __init__(self, max_connections_per_key: int, idle_timeout: float):
+        if max_connections_per_key < 1:
+            raise ValueError('max_connections_per_key must be at least 1')
+
+        self.max_connections_per_key = max_connections_per_key
+        self.idle_timeout = idle_timeout
+        self._entries: Dict[Hashable, _PoolEntry] = {}
+        self._in_use: Dict[int, Tuple[Hashable, AnyByteStream]] = {}
+        # Idle connections of all keys, from the least to the most recently returned one
+        self._idle: 'OrderedDict[int, Tuple[Hashable, AnyByteStream, float]]' = OrderedDict()
+        self._discarded: Set[int] = set()
+        self._connections_created = 0
+        self._connections_reused = 0
+        self._closed = False
+
+    def connect_tcp(
+        self, remote_host: IPAddressType, remote_port: int, *,
+        local_host: Optional[IPAddressType] = None, tls: bool = False,
+        ssl_context: Optional[ssl.SSLContext] = None, tls_standard_compatible: bool = True,
+        tls_hostname: Optional[str] = None, tls_session_cache: Optional[TLSSessionCache] = None,
+        tls_native: bool = False, happy_eyeballs_delay: Optional[float] = None
+    ) -> AsyncContextManager[AnyByteStream]:
+        """
+        Get a connection to the given host and port, reusing an idle one if available.
+
+        The arguments are the same as with :func:`connect_tcp`. All of them except
+        ``tls_session_cache`` and ``happy_eyeballs_delay`` must match for an idle connection to
+        be reused.
+
+        :return: an asynchronous context manager yielding a socket stream, or a TLS stream if TLS
+            was requested
+
+        """
+        use_tls = bool(tls or tls_hostname or ssl_context)
+        key = ('tcp', str(remote_host), remote_port,
+               str(local_host) if local_host is not None else None, use_tls, ssl_context,
+               tls_standard_compatible, tls_hostname, tls_native)
+        connect = partial(connect_tcp, remote_host, remote_port, local_host=local_host,
+                          tls=tls, ssl_context=ssl_context,
+                          tls_standard_compatible=tls_standard_compatible,
+                          tls_hostname=tls_hostname, tls_session_cache=tls_session_cache,
+                          tls_native=tls_native, happy_eyeballs_delay=happy_eyeballs_delay)
+        return _PooledConnection(self, key, connect)
+
+    def connect_unix(self, path: Union[str, PathLike]) -> AsyncContextManager[AnyByteStream]:
+        """
+        Get a connection to the given UNIX socket, reusing an idle one if available.
+
+        :param path: path to the socket
+        :return: an asynchronous context manager yielding a socket stream
+
+        """
+        path = str(Path(path))
+        return _PooledConnection(self, ('unix', path), partial(connect_unix, path))
+
+    def discard(self, stream: AnyByteStream) -> None:
+        """
+        Mark a connection handed out by this pool as not reusable.
+
+        The connection will be closed instead of being returned to the pool.
+
+        :param stream: a stream handed out by this pool
+
+        """
+        if id(stream) not in self._in_use:
+            raise ValueError('this stream is not in use from this pool')
+
+        self._discarded.add(id(stream))
+
+    def statistics(self) -> ConnectionPoolStatistics:
+        """Return statistics about the current state of this pool."""
+        return ConnectionPoolStatistics(
+            len(self._in_use), len(self._idle), self._connections_created,
+            self._connections_reused)
+
+    async def aclose(self) -> None:
+        """
+        Close all idle connections.
+
+        Connections still in use are closed when they are returned to the pool, and no new
+        connections can be made.
+
+        """
+        self._closed = True
+        idle = [stream for key, stream, last_used in self._idle.values()]
+        self._idle.clear()
+        for key, entry in list(self._entries.items()):
+            entry.idle.clear()
+            if not entry.users:
+                del self._entries[key]
+
+        for stream in idle:
+            await aclose_forcefully(stream)
+
+    async def _acquire(self, key: Hashable,
+                       connect: Callable[[], Awaitable[AnyByteStream]]) -> AnyByteStream:
+        if self._closed:
+            raise ClosedResourceError
+
+        await self._close_expired()
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _PoolEntry(self.max_connections_per_key)
+
+        entry.users += 1
+        try:
+            await entry.semaphore.acquire()
+            try:
+                stream = None
+                while entry.idle:
+                    # Take the most recently used connection first, so that the connections
+                    # left idle the longest are the ones that expire
+                    candidate = entry.idle.pop()
+                    del self._idle[id(candidate)]
+                    if _is_reusable(candidate):
+                        stream = candidate
+                        self._connections_reused += 1
+                        break
+
+                    await aclose_forcefully(candidate)
+
+                if stream is None:
+                    stream = await connect()
+                    self._connections_created += 1
+            except BaseException:
+                entry.semaphore.release()
+                raise
+        except BaseException:
+            self._release_entry(key, entry)
+            raise
+
+        self._in_use[id(stream)] = key, stream
+        return stream
+
+    async def _release(self, stream: AnyByteStream, reuse: bool) -> None:
+        key = self._in_use.pop(id(stream))[0]
+        entry = self._entries[key]
+        try:
+            if reuse and not self._closed and id(stream) not in self._discarded:
+                entry.idle.append(stream)
+                self._idle[id(stream)] = key, stream, get_asynclib().current_time()
+            else:
+                await aclose_forcefully(stream)
+        finally:
+            self._discarded.discard(id(stream))
+            entry.semaphore.release()
+            self._release_entry(key, entry)
+
+        await self._close_expired()
+
+    def _release_entry(self, key: Hashable, entry: _PoolEntry) -> None:
+        entry.users -= 1
+        if not entry.users and not entry.idle:
+            del self._entries[key]
+
+    async def _close_expired(self) -> None:
+        # The idle connections are ordered by the time they were returned, so only the expired
+        # ones need to be looked at
+        deadline = get_asynclib().current_time() - self.idle_timeout
+        expired = []
+        while self._idle:
+            key, stream, last_used = next(iter(self._idle.values()))
+            if last_used > deadline:
+                break
+
+            del self._idle[id(stream)]
+            entry = self._entries[key]
+            entry.idle.remove(stream)
+            if not entry.users and not entry.idle:
+                del self._entries[key]
+
+            expired.append(stream)
+
+        for stream in expired:
+            await aclose_forcefully(stream)
+
+
+class _PooledConnection:
+    def __init__(self, pool: ConnectionPool, key: Hashable,
+                 connect: Callable[[], Awaitable[AnyByteStream]]):
+        self._pool = pool
+        self._key = key
+        self._connect = connect
+        self._stream: Optional[AnyByteStream] = None
+
+    async def __aenter__(self) -> AnyByteStream:
+        self._stream = await self._pool._acquire(self._key, self._connect)
+        return self._stream
+
+    async def __aexit__(self, exc_type: Optional[Type[BaseException]],
+                        exc_val: Optional[BaseException],
+                        exc_tb: Optional[TracebackType]) -> None:
+        assert self._stream is not None
+        await self._pool._release(self._stream, exc_type is None)
+
+
+def create_connection_pool(*, max_connections_per_key: int = 10,
+                           idle_timeout: float = 60) -> ConnectionPool:
+    """
+    Create a pool for reusing TCP and UNIX socket connections.
+
+    :param max_connections_per_key: maximum number of simultaneous connections (both in use and
+        idle) to the same destination with the same settings; further attempts to get a connection
+        wait until one is returned to the pool
+    :param idle_timeout: time (in seconds) after which idle connections are closed (the next time
+        the pool is used)
+    :return: a connection pool
+
+    .. versionadded:: 3.0
+
+    """
+    return ConnectionPool(max_connections_per_key, idle_timeout)
+
+
 #
 # Private API
 #
@@ -489,3 +852,52 @@ def convert_ipv6_sockaddr(sockaddr):
             return sockaddr[:2]
     else:
         return sockaddr
+
+
+def is_socket_readable(sock: socket.SocketType) -> bool:
+    """
+    Check, without blocking, if the socket has data or an EOF waiting to be read, or has failed.
+
+    Unlike :func:`select.select`, this works with file descriptors of any value.
+
+    :param sock: the socket to check
+    :return: ``True`` if reading from the socket would not block, or the socket has been closed
+
+    """
+    fd = sock.fileno()
+    if fd < 0:
+        return True
+
+    if hasattr(select, 'poll'):
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        return bool(poller.poll(0))
+
+    # On Windows, select() limits the number of sockets rather than the descriptor values
+    return bool(select.select([sock], [], [], 0)[0])
+
+
+def _is_reusable(stream: AnyByteStream) -> bool:
+    """Return ``False`` if an idle connection has received data, EOF or an error."""
+    while isinstance(stream, TLSStream):
+        stream = stream.transport_stream
+
+    return not get_asynclib().is_socket_stream_readable(stream)
+
+
+def _record_connect_time(duration: float) -> None:
+    # Keep a smoothed average of the connection setup times like TCP does for round trip times
+    # (RFC 6298)
+    smoothed = _smoothed_connect_time.get()
+    if smoothed is None:
+        _smoothed_connect_time.set(duration)
+    else:
+        _smoothed_connect_time.set(smoothed + (duration - smoothed) / 8)
+
+
+def _connection_attempt_delay() -> float:
+    smoothed = _smoothed_connect_time.get()
+    if smoothed is None:
+        return _DEFAULT_ATTEMPT_DELAY
+
+    return min(max(smoothed * 2, _MIN_ATTEMPT_DELAY), _MAX_ATTEMPT_DELAY)
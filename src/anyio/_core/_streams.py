@@ -1,40 +1,220 @@
 import math
-from typing import Any, Tuple, Type, TypeVar, overload
+from typing import Any, Callable, Optional, Tuple, Type, TypeVar, overload
 
+from ..streams.broadcast import (
+    BroadcastObjectReceiveStream, BroadcastObjectSendStream, BroadcastObjectStreamState,
+    SlowSubscriberPolicy)
 from ..streams.memory import (
-    MemoryObjectReceiveStream, MemoryObjectSendStream, MemoryObjectStreamState)
+    MemoryObjectReceiveStream, MemoryObjectSendStream, MemoryObjectStreamState, OverflowPolicy,
+    PriorityBuffer)
+from ..streams.watch import WatchObjectReceiveStream, WatchObjectSendStream, WatchObjectStreamState
 
 T_Item = TypeVar('T_Item')
 
 
 @overload
 def create_memory_object_stream(
-    max_buffer_size: float, item_type: Type[T_Item]
+    max_buffer_size: float, item_type: Type[T_Item], *,
+    item_size: Optional[Callable[[T_Item], int]] = ..., max_buffer_bytes: float = ...,
+    overflow_policy: OverflowPolicy = ...
 ) -> Tuple[MemoryObjectSendStream[T_Item], MemoryObjectReceiveStream[T_Item]]:
     ...
 
 
 @overload
 def create_memory_object_stream(
-    max_buffer_size: float = 0
+    max_buffer_size: float = 0, *, item_size: Optional[Callable[[Any], int]] = ...,
+    max_buffer_bytes: float = ..., overflow_policy: OverflowPolicy = ...
 ) -> Tuple[MemoryObjectSendStream[Any], MemoryObjectReceiveStream[Any]]:
     ...
 
 
-def create_memory_object_stream(max_buffer_size=0, item_type=None):
+def create_memory_object_stream(max_buffer_size=0, item_type=None, *, item_size=None,
+                                max_buffer_bytes=math.inf, overflow_policy='block'):
     """
     Create a memory object stream.
 
+    If ``max_buffer_bytes`` is given, ``send()`` also starts blocking when the combined size of the
+    buffered items (as computed by ``item_size``) would exceed this limit. A single item is
+    always let into an otherwise empty buffer, even if it alone exceeds the limit.
+
+    The overflow policy determines what happens when an item is sent while the buffer is full and
+    no task is waiting to receive:
+
+    * ``block``: ``send()`` blocks and ``send_nowait()`` raises :exc:`~anyio.WouldBlock`
+    * ``drop_newest``: the item being sent is discarded
+    * ``drop_oldest``: the oldest buffered items are discarded to make room for the new one
+
+    Discarded items are counted in the ``items_dropped`` field of the stream statistics.
+
+    :param max_buffer_size: number of items held in the buffer until ``send()`` starts blocking
+    :param item_type: type of item, for marking the streams with the right generic type for
+        static typing (not used at run time)
+    :param item_size: a callable that returns the size of the given item in bytes (must always
+        return the same value for the same item; defaults to :func:`len` if ``max_buffer_bytes``
+        is given)
+    :param max_buffer_bytes: maximum combined size of the items in the buffer until ``send()``
+        starts blocking
+    :param overflow_policy: one of ``block``, ``drop_newest`` or ``drop_oldest``
+    :return: a tuple of (send stream, receive stream)
+
+    .. versionchanged:: 3.0
+       Added the ``item_size``, ``max_buffer_bytes`` and ``overflow_policy`` parameters.
+    """
+    if max_buffer_size != math.inf and not isinstance(max_buffer_size, int):
+        raise ValueError('max_buffer_size must be either an integer or math.inf')
+    if max_buffer_size < 0:
+        raise ValueError('max_buffer_size cannot be negative')
+    if max_buffer_bytes < 0:
+        raise ValueError('max_buffer_bytes cannot be negative')
+    if overflow_policy not in ('block', 'drop_newest', 'drop_oldest'):
+        raise ValueError("overflow_policy must be one of 'block', 'drop_newest' or 'drop_oldest'")
+
+    if item_size is None and max_buffer_bytes != math.inf:
+        item_size = len
+
+    state: MemoryObjectStreamState = MemoryObjectStreamState(max_buffer_size, item_size,
+                                                             max_buffer_bytes, overflow_policy)
+    return MemoryObjectSendStream(state), MemoryObjectReceiveStream(state)
+
+
+@overload
+def create_priority_memory_object_stream(
+    max_buffer_size: float, item_type: Type[T_Item], *, priority: Callable[[T_Item], Any],
+    overflow_policy: OverflowPolicy = ...
+) -> Tuple[MemoryObjectSendStream[T_Item], MemoryObjectReceiveStream[T_Item]]:
+    ...
+
+
+@overload
+def create_priority_memory_object_stream(
+    max_buffer_size: float = 0, *, priority: Callable[[Any], Any],
+    overflow_policy: OverflowPolicy = ...
+) -> Tuple[MemoryObjectSendStream[Any], MemoryObjectReceiveStream[Any]]:
+    ...
+
+
+def create_priority_memory_object_stream(max_buffer_size=0, item_type=None, *, priority,
+                                         overflow_policy='block'):
+    """
+    Create a memory object stream that delivers buffered items in priority order.
+
+    This works like :func:`create_memory_object_stream`, except that the receivers always get the
+    buffered item with the lowest value returned by ``priority``. Items of equal priority are
+    delivered in the order they were sent.
+
+    With the ``drop_oldest`` overflow policy, the buffered items with the highest priority values
+    (that is, the ones that would be delivered last) are discarded instead of the oldest ones. If
+    the item being sent would be delivered after all of them, it is discarded instead.
+
+    .. note:: Only buffered items are subject to prioritization. Items from tasks blocked in
+       ``send()`` enter the buffer in the order those tasks started waiting.
+
     :param max_buffer_size: number of items held in the buffer until ``send()`` starts blocking
     :param item_type: type of item, for marking the streams with the right generic type for
         static typing (not used at run time)
+    :param priority: a callable that takes an item and returns its priority (lower values are
+        delivered first)
+    :param overflow_policy: one of ``block``, ``drop_newest`` or ``drop_oldest`` (see
+        :func:`create_memory_object_stream`)
     :return: a tuple of (send stream, receive stream)
 
+    .. versionadded:: 3.0
     """
     if max_buffer_size != math.inf and not isinstance(max_buffer_size, int):
         raise ValueError('max_buffer_size must be either an integer or math.inf')
     if max_buffer_size < 0:
         raise ValueError('max_buffer_size cannot be negative')
 
-    state: MemoryObjectStreamState = MemoryObjectStreamState(max_buffer_size)
+    if overflow_policy not in ('block', 'drop_newest', 'drop_oldest'):
+        raise ValueError("overflow_policy must be one of 'block', 'drop_newest' or 'drop_oldest'")
+
+    state: MemoryObjectStreamState = MemoryObjectStreamState(max_buffer_size,
+                                                             overflow_policy=overflow_policy)
+    state.buffer = PriorityBuffer(priority)  # type: ignore[assignment]
     return MemoryObjectSendStream(state), MemoryObjectReceiveStream(state)
+
+
+@overload
+def create_broadcast_memory_object_stream(
+    max_buffer_size: float, item_type: Type[T_Item], *,
+    slow_subscriber_policy: SlowSubscriberPolicy = ...
+) -> Tuple[BroadcastObjectSendStream[T_Item], BroadcastObjectReceiveStream[T_Item]]:
+    ...
+
+
+@overload
+def create_broadcast_memory_object_stream(
+    max_buffer_size: float = 1, *, slow_subscriber_policy: SlowSubscriberPolicy = ...
+) -> Tuple[BroadcastObjectSendStream[Any], BroadcastObjectReceiveStream[Any]]:
+    ...
+
+
+def create_broadcast_memory_object_stream(max_buffer_size=1, item_type=None, *,
+                                          slow_subscriber_policy='block'):
+    """
+    Create a broadcast memory object stream.
+
+    Unlike with :func:`create_memory_object_stream`, every item sent is delivered to every
+    subscriber (receive stream). New subscribers are created by cloning an existing receive stream.
+    The items are stored only once, regardless of the number of subscribers.
+
+    The slow subscriber policy determines what happens when the buffer is full because one or more
+    subscribers have not yet received the oldest item in it:
+
+    * ``block``: ``send()`` blocks until the slowest subscribers catch up
+    * ``drop``: the oldest item is discarded; the slowest subscribers silently skip it
+    * ``disconnect``: the slowest subscribers are disconnected and will raise
+      :exc:`~anyio.BrokenResourceError` on their next receive attempt
+
+    :param max_buffer_size: number of items held in the buffer until the slow subscriber policy
+        kicks in
+    :param item_type: type of item, for marking the streams with the right generic type for
+        static typing (not used at run time)
+    :param slow_subscriber_policy: one of ``block``, ``drop`` or ``disconnect``
+    :return: a tuple of (send stream, receive stream)
+
+    .. versionadded:: 3.0
+    """
+    if max_buffer_size != math.inf and not isinstance(max_buffer_size, int):
+        raise ValueError('max_buffer_size must be either an integer or math.inf')
+    if max_buffer_size < 1:
+        raise ValueError('max_buffer_size must be at least 1')
+    if slow_subscriber_policy not in ('block', 'drop', 'disconnect'):
+        raise ValueError("slow_subscriber_policy must be one of 'block', 'drop' or 'disconnect'")
+
+    state: BroadcastObjectStreamState = BroadcastObjectStreamState(max_buffer_size,
+                                                                   slow_subscriber_policy)
+    return BroadcastObjectSendStream(state), BroadcastObjectReceiveStream(state)
+
+
+@overload
+def create_watch_memory_object_stream(
+    item_type: Type[T_Item]
+) -> Tuple[WatchObjectSendStream[T_Item], WatchObjectReceiveStream[T_Item]]:
+    ...
+
+
+@overload
+def create_watch_memory_object_stream() -> Tuple[WatchObjectSendStream[Any],
+                                                 WatchObjectReceiveStream[Any]]:
+    ...
+
+
+def create_watch_memory_object_stream(item_type=None):
+    """
+    Create a watch memory object stream.
+
+    A watch stream only holds the most recently sent value. Sending never blocks, and replaces any
+    previous value. A receiver gets the latest value, but only if it is newer than the one it last
+    received, so slow receivers skip the intermediate values instead of processing stale ones.
+    Every receiver (the original receive stream and its clones) sees every new value.
+
+    :param item_type: type of item, for marking the streams with the right generic type for
+        static typing (not used at run time)
+    :return: a tuple of (send stream, receive stream)
+
+    .. versionadded:: 3.0
+    """
+    state: WatchObjectStreamState = WatchObjectStreamState()
+    return WatchObjectSendStream(state), WatchObjectReceiveStream(state)
@@ -6,11 +6,11 @@ __all__ = ('AsyncResource', 'IPAddressType', 'IPSockAddrType', 'SocketAttribute'
            'AnyUnreliableByteSendStream', 'AnyUnreliableByteStream', 'AnyByteReceiveStream',
            'AnyByteSendStream', 'AnyByteStream', 'Listener', 'Process', 'Event',
            'Condition', 'Lock', 'Semaphore', 'CapacityLimiter', 'CancelScope', 'TaskGroup',
-           'TaskStatus', 'TestRunner', 'BlockingPortal')
+           'TaskStatus', 'TestRunner', 'BlockingPortal', 'Resolver')
 
 from ._resources import AsyncResource
 from ._sockets import (
-    ConnectedUDPSocket, IPAddressType, IPSockAddrType, SocketAttribute, SocketListener,
+    ConnectedUDPSocket, IPAddressType, IPSockAddrType, Resolver, SocketAttribute, SocketListener,
     SocketStream, UDPPacketType, UDPSocket, UNIXSocketStream)
 from ._streams import (
     AnyByteReceiveStream, AnyByteSendStream, AnyByteStream, AnyUnreliableByteReceiveStream,
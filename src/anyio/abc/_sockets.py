@@ -1,7 +1,7 @@
-from abc import abstractmethod
+from abc import ABCMeta, abstractmethod
 from io import IOBase
 from ipaddress import IPv4Address, IPv6Address
-from socket import AddressFamily, SocketType
+from socket import AddressFamily, SocketKind, SocketType
 from typing import (
     Any, AsyncContextManager, Callable, Collection, List, Optional, Tuple, TypeVar, Union)
 
@@ -13,6 +13,7 @@ IPAddressType = Union[str, IPv4Address, IPv6Address]
 IPSockAddrType = Tuple[str, int]
 SockAddrType = Union[IPSockAddrType, str]
 UDPPacketType = Tuple[bytes, IPSockAddrType]
+GetAddrInfoReturnType = List[Tuple[AddressFamily, SocketKind, int, str, Tuple[str, int]]]
 T_Retval = TypeVar('T_Retval')
 
 
@@ -148,3 +149,29 @@ class ConnectedUDPSocket(UnreliableObjectStream[bytes], _SocketProvider):
 
     Supports all relevant extra attributes from :class:`~SocketAttribute`.
     """
+
+
+class Resolver(metaclass=ABCMeta):
+    """
+    Resolves host names into socket addresses.
+
+    A resolver can be installed with :func:`~anyio.set_default_resolver` to be used by
+    :func:`~anyio.getaddrinfo` and everything built on it, like :func:`~anyio.connect_tcp`.
+
+    .. versionadded:: 3.0
+    """
+
+    @abstractmethod
+    async def getaddrinfo(self, host: Optional[bytes], port: Union[str, int, None], *,
+                          family: int = 0, type: int = 0, proto: int = 0,
+                          flags: int = 0) -> GetAddrInfoReturnType:
+        """
+        Look up the socket addresses for the given host name and port.
+
+        The arguments and the return value are like those of :func:`socket.getaddrinfo`, except
+        that the host name has already been encoded with IDNA. The host is ``None`` when looking
+        up the wildcard addresses to bind to.
+
+        :raises socket.gaierror: if the host name could not be resolved
+
+        """
@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Any, Callable, Generic, Optional, TypeVar, Union
+from typing import Any, AsyncIterator, Callable, Generic, List, Optional, TypeVar, Union
 
 from .._core._exceptions import EndOfStream
 from .._core._typedattr import TypedAttributeProvider
@@ -78,6 +78,49 @@ class ObjectReceiveStream(UnreliableObjectReceiveStream[T_Item]):
     which they were sent, and that no messages are missed.
     """
 
+    async def batched(self, max_items: int, max_delay: float) -> AsyncIterator[List[T_Item]]:
+        """
+        Iterate over the items of this stream in batches.
+
+        A batch is yielded when it contains ``max_items`` items, or when ``max_delay`` seconds
+        have passed since its first item was received, whichever comes first. Batches are never
+        empty. The iteration ends when the stream has been closed from the sending end, after
+        yielding any remaining items.
+
+        .. note:: Waiting for the rest of a batch is done by cancelling :meth:`receive` when the
+            delay runs out, so this should only be used on streams where cancelling
+            :meth:`receive` does not lose items (like memory object streams).
+
+        :param max_items: maximum number of items in a batch
+        :param max_delay: maximum time (in seconds) to wait for a batch to fill up
+        :return: an asynchronous iterator yielding lists of items
+
+        .. versionadded:: 3.0
+        """
+        from .._core._tasks import move_on_after
+
+        if max_items < 1:
+            raise ValueError('max_items must be at least 1')
+
+        while True:
+            try:
+                batch = [await self.receive()]
+            except EndOfStream:
+                return
+
+            end_of_stream = False
+            with move_on_after(max_delay):
+                while len(batch) < max_items:
+                    try:
+                        batch.append(await self.receive())
+                    except EndOfStream:
+                        end_of_stream = True
+                        break
+
+            yield batch
+            if end_of_stream:
+                return
+
 
 class ObjectSendStream(UnreliableObjectSendStream[T_Item]):
     """
@@ -129,6 +172,26 @@ class ByteReceiveStream(AsyncResource, TypedAttributeProvider):
         :raises ~anyio.EndOfStream: if this stream has been closed from the other end
         """
 
+    async def receive_into(self, buffer: memoryview) -> int:
+        """
+        Receive bytes from the peer directly into the given buffer.
+
+        This works like :meth:`receive`, except that at most ``len(buffer)`` bytes are written
+        into the given (non-empty) buffer instead of being returned as a new :class:`bytes`
+        object. Implementations that can receive data directly into a buffer override this to
+        avoid the intermediate copy.
+
+        :param buffer: a writable, non-empty buffer to receive the bytes into
+        :return: the number of bytes written into the buffer (at least 1)
+        :raises ~anyio.EndOfStream: if this stream has been closed from the other end
+
+        .. versionadded:: 3.0
+        """
+        buffer = memoryview(buffer).cast('B')
+        data = await self.receive(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
 
 class ByteSendStream(AsyncResource, TypedAttributeProvider):
     """An interface for sending bytes to a single peer."""
@@ -0,0 +1,317 @@
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Generic, List, Optional, TypeVar
+
+from .. import BrokenResourceError, ClosedResourceError, EndOfStream, WouldBlock
+from .._core._eventloop import get_asynclib
+from ..abc import ObjectReceiveStream, ObjectSendStream
+from ..lowlevel import checkpoint
+from .memory import MemoryObjectStreamStatistics
+
+if sys.version_info >= (3, 8):
+    from typing import Literal
+else:
+    from typing_extensions import Literal
+
+T_Item = TypeVar('T_Item')
+SlowSubscriberPolicy = Literal['block', 'drop', 'disconnect']
+
+
+@dataclass
+class BroadcastObjectStreamState(Generic[T_Item]):
+    """
+    Shared state of a broadcast memory object stream.
+
+    Sent items are stored only once, in a ring buffer indexed by a running sequence number. Each
+    subscriber keeps its own cursor (the sequence number of the next item it will receive), and an
+    item is discarded as soon as every subscriber has moved past it.
+    """
+
+    max_buffer_size: float = field()
+    slow_subscriber_policy: SlowSubscriberPolicy = field(default='block')
+    ring: List[Any] = field(init=False, default_factory=list)
+    head: int = field(init=False, default=0)
+    size: int = field(init=False, default=0)
+    offset: int = field(init=False, default=0)
+    cursor_counts: Dict[int, int] = field(init=False, default_factory=dict)
+    open_send_channels: int = field(init=False, default=0)
+    open_receive_channels: int = field(init=False, default=0)
+    waiting_receivers: 'OrderedDict[Any, None]' = field(init=False, default_factory=OrderedDict)
+    waiting_senders: 'OrderedDict[Any, T_Item]' = field(init=False, default_factory=OrderedDict)
+
+    @property
+    def tail(self) -> int:
+        """The sequence number the next sent item will get."""
+        return self.offset + self.size
+
+    def get(self, seq: int) -> T_Item:
+        return self.ring[(self.head + seq - self.offset) % len(self.ring)]
+
+    def append(self, item: T_Item) -> None:
+        if self.size == len(self.ring):
+            # Grow the ring, moving the items to the start of the new one
+            items = [self.get(seq) for seq in range(self.offset, self.tail)]
+            self.ring = items + [None] * max(self.size, 16)
+            self.head = 0
+
+        self.ring[(self.head + self.size) % len(self.ring)] = item
+        self.size += 1
+        if self.waiting_receivers:
+            receive_waiters = list(self.waiting_receivers)
+            self.waiting_receivers.clear()
+            for waiter in receive_waiters:
+                waiter.set()
+
+    def popleft(self) -> None:
+        self.ring[self.head] = None
+        self.head = (self.head + 1) % len(self.ring)
+        self.size -= 1
+        self.offset += 1
+
+    def add_subscriber(self, cursor: int) -> None:
+        self.cursor_counts[cursor] = self.cursor_counts.get(cursor, 0) + 1
+        self.open_receive_channels += 1
+
+    def remove_subscriber(self, cursor: int) -> None:
+        self._release_cursor(cursor)
+        self.open_receive_channels -= 1
+        if self.open_receive_channels == 0:
+            self._wake_senders()
+        else:
+            self.trim()
+
+    def move_cursor(self, old: int, new: int) -> None:
+        self._release_cursor(old)
+        self.cursor_counts[new] = self.cursor_counts.get(new, 0) + 1
+        if old == self.offset:
+            self.trim()
+
+    def make_room(self) -> None:
+        """
+        Discard the oldest item to make room for a new one, as per the slow subscriber policy.
+        """
+        lagging = self.cursor_counts.pop(self.offset, 0)
+        if self.slow_subscriber_policy == 'disconnect':
+            # The lagging subscribers notice they've been disconnected as their cursors are now
+            # behind the offset
+            self.open_receive_channels -= lagging
+            if self.open_receive_channels == 0:
+                self._wake_senders()
+        else:
+            # The lagging subscribers skip over the discarded item
+            self.popleft()
+            if lagging:
+                self.cursor_counts[self.offset] = self.cursor_counts.get(self.offset, 0) + lagging
+
+        self.trim()
+
+    def trim(self) -> None:
+        # Discard items at the head of the buffer that every subscriber has moved past
+        while self.size and self.offset not in self.cursor_counts:
+            self.popleft()
+
+        # Let blocked senders fill the freed up space
+        while (self.waiting_senders and self.size < self.max_buffer_size
+               and self.open_receive_channels):
+            send_waiter, item = self.waiting_senders.popitem(last=False)
+            self.append(item)
+            send_waiter.set()
+
+    def statistics(self) -> MemoryObjectStreamStatistics:
+        return MemoryObjectStreamStatistics(
+            self.size, self.max_buffer_size, self.open_send_channels,
+            self.open_receive_channels, len(self.waiting_senders), len(self.waiting_receivers))
+
+    def _release_cursor(self, cursor: int) -> None:
+        count = self.cursor_counts[cursor] - 1
+        if count:
+            self.cursor_counts[cursor] = count
+        else:
+            del self.cursor_counts[cursor]
+
+    def _wake_senders(self) -> None:
+        for waiter in list(self.waiting_senders):
+            waiter.set()
+
+
+@dataclass(eq=False)
+class BroadcastObjectReceiveStream(Generic[T_Item], ObjectReceiveStream[T_Item]):
+    """
+    A subscriber of a broadcast memory object stream.
+
+    Every subscriber receives every item sent after the subscriber was created, unless it falls
+    too far behind on a stream using the ``drop`` or ``disconnect`` slow subscriber policy.
+    """
+
+    _state: BroadcastObjectStreamState[T_Item]
+    _cursor: Optional[int] = None
+    _closed: bool = field(init=False, default=False)
+
+    def __post_init__(self):
+        if self._cursor is None:
+            self._cursor = self._state.tail
+
+        self._state.add_subscriber(self._cursor)
+
+    def _effective_cursor(self) -> int:
+        assert self._cursor is not None
+        if self._cursor < self._state.offset:
+            # This subscriber was too slow and the items it was due to receive were discarded
+            if self._state.slow_subscriber_policy == 'disconnect':
+                raise BrokenResourceError
+
+            self._cursor = self._state.offset
+
+        return self._cursor
+
+    def receive_nowait(self) -> T_Item:
+        """
+        Receive the next item if it can be done without waiting.
+
+        :return: the received item
+        :raises ~anyio.ClosedResourceError: if this receive stream has been closed
+        :raises ~anyio.BrokenResourceError: if this subscriber was disconnected for falling too
+            far behind
+        :raises ~anyio.EndOfStream: if there are no more items for this subscriber and the stream
+            has been closed from the sending end
+        :raises ~anyio.WouldBlock: if there are no items available for this subscriber
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        cursor = self._effective_cursor()
+        if cursor < self._state.tail:
+            item = self._state.get(cursor)
+            self._cursor = cursor + 1
+            self._state.move_cursor(cursor, cursor + 1)
+            return item
+        elif not self._state.open_send_channels:
+            raise EndOfStream
+
+        raise WouldBlock
+
+    async def receive(self) -> T_Item:
+        await checkpoint()
+        while True:
+            try:
+                return self.receive_nowait()
+            except WouldBlock:
+                receive_waiter = get_asynclib().Waiter()
+                self._state.waiting_receivers[receive_waiter] = None
+                try:
+                    await receive_waiter.wait()
+                finally:
+                    self._state.waiting_receivers.pop(receive_waiter, None)
+
+    def clone(self) -> 'BroadcastObjectReceiveStream':
+        """
+        Create a clone of this receive stream.
+
+        The clone is a new subscriber which starts from the same position in the stream as this
+        one. Each clone can be closed separately.
+
+        :return: the cloned stream
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        return BroadcastObjectReceiveStream(_state=self._state, _cursor=self._effective_cursor())
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            assert self._cursor is not None
+            if (self._cursor >= self._state.offset
+                    or self._state.slow_subscriber_policy != 'disconnect'):
+                self._state.remove_subscriber(max(self._cursor, self._state.offset))
+
+    def statistics(self) -> MemoryObjectStreamStatistics:
+        """Return statistics about the current state of this stream."""
+        return self._state.statistics()
+
+
+@dataclass(eq=False)
+class BroadcastObjectSendStream(Generic[T_Item], ObjectSendStream[T_Item]):
+    """The sending end of a broadcast memory object stream."""
+
+    _state: BroadcastObjectStreamState[T_Item]
+    _closed: bool = field(init=False, default=False)
+
+    def __post_init__(self):
+        self._state.open_send_channels += 1
+
+    def send_nowait(self, item: T_Item) -> None:
+        """
+        Send an item to all subscribers immediately if it can be done without waiting.
+
+        :param item: the item to send
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if there are no subscribers left
+        :raises ~anyio.WouldBlock: if the buffer is full and the slow subscriber policy is
+            ``block``
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+        if not self._state.open_receive_channels:
+            raise BrokenResourceError
+
+        if self._state.size >= self._state.max_buffer_size:
+            if self._state.slow_subscriber_policy == 'block':
+                raise WouldBlock
+
+            self._state.make_room()
+            if not self._state.open_receive_channels:
+                raise BrokenResourceError
+
+        self._state.append(item)
+
+    async def send(self, item: T_Item) -> None:
+        await checkpoint()
+        try:
+            self.send_nowait(item)
+        except WouldBlock:
+            # Wait until the slowest subscribers have made room in the buffer
+            send_waiter = get_asynclib().Waiter()
+            self._state.waiting_senders[send_waiter] = item
+            try:
+                await send_waiter.wait()
+            except BaseException:
+                self._state.waiting_senders.pop(send_waiter, None)
+                raise
+
+            if send_waiter in self._state.waiting_senders:
+                del self._state.waiting_senders[send_waiter]
+                raise BrokenResourceError
+
+    def clone(self) -> 'BroadcastObjectSendStream':
+        """
+        Create a clone of this send stream.
+
+        Each clone can be closed separately. Only when all clones have been closed will the
+        sending end of the stream be considered closed by the subscribers.
+
+        :return: the cloned stream
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        return BroadcastObjectSendStream(_state=self._state)
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._state.open_send_channels -= 1
+            if self._state.open_send_channels == 0:
+                receive_waiters = list(self._state.waiting_receivers)
+                self._state.waiting_receivers.clear()
+                for waiter in receive_waiters:
+                    waiter.set()
+
+    def statistics(self) -> MemoryObjectStreamStatistics:
+        """Return statistics about the current state of this stream."""
+        return self._state.statistics()
@@ -1,7 +1,22 @@
+import re
 from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Iterable, Optional, Pattern, Tuple
 
-from .. import ClosedResourceError, DelimiterNotFound, EndOfStream, IncompleteRead
-from ..abc import AnyByteReceiveStream, ByteReceiveStream
+from .. import (
+    ClosedResourceError, DelimiterNotFound, EndOfStream, IncompleteRead, create_lock,
+    open_cancel_scope, sleep)
+from ..abc import (
+    AnyByteReceiveStream, AnyByteSendStream, ByteReceiveStream, ByteSendStream, CancelScope,
+    TaskGroup)
+from ..lowlevel import checkpoint
+
+
+@lru_cache(maxsize=32)
+def _delimiter_pattern(delimiters: Tuple[bytes, ...]) -> Pattern[bytes]:
+    # Try the longer delimiters first so they win over their own prefixes
+    alternatives = sorted(set(delimiters), key=len, reverse=True)
+    return re.compile(b'|'.join(re.escape(delimiter) for delimiter in alternatives))
 
 
 @dataclass
@@ -13,6 +28,9 @@ class BufferedByteReceiveStream(ByteReceiveStream):
 
     receive_stream: AnyByteReceiveStream
     _buffer: bytearray = field(init=False, default_factory=bytearray)
+    _offset: int = field(init=False, default=0)
+    _scanned: int = field(init=False, default=0)
+    _scan_key: object = field(init=False, default=None)
     _closed: bool = field(init=False, default=False)
 
     async def aclose(self) -> None:
@@ -22,7 +40,7 @@ class BufferedByteReceiveStream(ByteReceiveStream):
     @property
     def buffer(self) -> bytes:
         """The bytes currently in the buffer."""
-        return bytes(self._buffer)
+        return bytes(self._buffer[self._offset:])
 
     @property
     def extra_attributes(self):
@@ -32,10 +50,8 @@ class BufferedByteReceiveStream(ByteReceiveStream):
         if self._closed:
             raise ClosedResourceError
 
-        if self._buffer:
-            chunk = bytes(self._buffer[:max_bytes])
-            del self._buffer[:max_bytes]
-            return chunk
+        if self._offset < len(self._buffer):
+            return self._consume(max_bytes)
         elif isinstance(self.receive_stream, ByteReceiveStream):
             return await self.receive_stream.receive(max_bytes)
         else:
@@ -49,6 +65,30 @@ class BufferedByteReceiveStream(ByteReceiveStream):
             else:
                 return chunk
 
+    async def receive_into(self, buffer: memoryview) -> int:
+        if self._closed:
+            raise ClosedResourceError
+
+        buffer = memoryview(buffer).cast('B')
+        if self._offset < len(self._buffer):
+            # Copy the bytes straight from the buffer
+            start = self._offset
+            end = min(start + len(buffer), len(self._buffer))
+            with memoryview(self._buffer) as view:
+                buffer[:end - start] = view[start:end]
+
+            self._advance(end)
+            return end - start
+        elif isinstance(self.receive_stream, ByteReceiveStream):
+            return await self.receive_stream.receive_into(buffer)
+        else:
+            # With a bytes-oriented object stream, save any surplus bytes in the buffer
+            chunk = await self.receive_stream.receive()
+            nbytes = min(len(chunk), len(buffer))
+            buffer[:nbytes] = chunk[:nbytes]
+            self._buffer.extend(chunk[nbytes:])
+            return nbytes
+
     async def receive_exactly(self, nbytes: int) -> bytes:
         """
         Read exactly the given amount of bytes from the stream.
@@ -60,11 +100,9 @@ class BufferedByteReceiveStream(ByteReceiveStream):
 
         """
         while True:
-            remaining = nbytes - len(self._buffer)
+            remaining = nbytes - len(self._buffer) + self._offset
             if remaining <= 0:
-                retval = self._buffer[:nbytes]
-                del self._buffer[:nbytes]
-                return bytes(retval)
+                return self._consume(nbytes)
 
             try:
                 if isinstance(self.receive_stream, ByteReceiveStream):
@@ -90,26 +128,252 @@ class BufferedByteReceiveStream(ByteReceiveStream):
             bytes read up to the maximum allowed
 
         """
-        delimiter_size = len(delimiter)
-        offset = 0
+        def find(position: int) -> Optional[Tuple[int, int]]:
+            index = self._buffer.find(delimiter, position)
+            return (index, index + len(delimiter)) if index >= 0 else None
+
+        start, end = await self._scan(find, delimiter, len(delimiter), max_bytes)
+        return self._consume_until(start, end)
+
+    async def receive_until_any(self, delimiters: Iterable[bytes],
+                                max_bytes: int) -> Tuple[bytes, bytes]:
+        """
+        Read from the stream until any of the delimiters is found or max_bytes have been read.
+
+        If several delimiters match at the same position, the longest one wins.
+
+        :param delimiters: the markers to look for in the stream
+        :param max_bytes: maximum number of bytes that will be read before raising
+            :exc:`~anyio.DelimiterNotFound`
+        :return: a tuple of (the bytes read (not including the delimiter), the delimiter found)
+        :raises ValueError: if no delimiters were given, or any of them is empty
+        :raises ~anyio.IncompleteRead: if the stream was closed before any of the delimiters
+            was found
+        :raises ~anyio.DelimiterNotFound: if none of the delimiters is found within the
+            bytes read up to the maximum allowed
+
+        .. versionadded:: 3.0
+
+        """
+        delimiters = tuple(delimiters)
+        if not delimiters or not all(delimiters):
+            raise ValueError('at least one delimiter is required, and none of them can be empty')
+
+        pattern = _delimiter_pattern(delimiters)
+
+        def find(position: int) -> Optional[Tuple[int, int]]:
+            match = pattern.search(self._buffer, position)
+            return match.span() if match else None
+
+        start, end = await self._scan(find, delimiters, max(len(d) for d in delimiters),
+                                      max_bytes)
+        delimiter = bytes(self._buffer[start:end])
+        return self._consume_until(start, end), delimiter
+
+    async def lines(self, delimiter: bytes = b'\n',
+                    max_bytes: int = 65536) -> AsyncIterator[bytes]:
+        """
+        Iterate over the lines in the stream.
+
+        The lines are yielded without the delimiter. If the stream ends with an unterminated line,
+        it is yielded as the last line.
+
+        :param delimiter: the line separator
+        :param max_bytes: maximum length of a line (excluding the delimiter)
+        :raises ~anyio.DelimiterNotFound: if a line is longer than ``max_bytes``
+
+        .. versionadded:: 3.0
+
+        """
+        while True:
+            try:
+                yield await self.receive_until(delimiter, max_bytes)
+            except IncompleteRead:
+                if self._offset < len(self._buffer):
+                    yield self._consume(len(self._buffer) - self._offset)
+
+                return
+
+    async def _scan(self, find: Callable[[int], Optional[Tuple[int, int]]], key: object,
+                    max_delimiter_size: int, max_bytes: int) -> Tuple[int, int]:
+        # The number of bytes after the read offset that are known not to contain the delimiter
+        # is remembered, so a scan that is interrupted (by cancellation, for example) and then
+        # retried with the same delimiter(s) picks up where the previous one left off
+        if self._scan_key != key:
+            self._scan_key = key
+            self._scanned = 0
+
         while True:
-            # Check if the delimiter can be found in the current buffer
-            index = self._buffer.find(delimiter, offset)
-            if index >= 0:
-                found = self._buffer[:index]
-                del self._buffer[:index + len(delimiter):]
-                return bytes(found)
+            # Check if the delimiter can be found in the unscanned part of the buffer
+            match = find(self._offset + self._scanned)
+            if match is not None:
+                return match
 
             # Check if the buffer is already at or over the limit
-            if len(self._buffer) >= max_bytes:
+            available = len(self._buffer) - self._offset
+            if available >= max_bytes:
                 raise DelimiterNotFound(max_bytes)
 
+            # A delimiter may straddle the boundary between the old and the new data
+            self._scanned = max(available - max_delimiter_size + 1, 0)
+
             # Read more data into the buffer from the socket
             try:
                 data = await self.receive_stream.receive()
             except EndOfStream as exc:
                 raise IncompleteRead from exc
 
-            # Move the offset forward and add the new data to the buffer
-            offset = max(len(self._buffer) - delimiter_size + 1, 0)
             self._buffer.extend(data)
+
+    def _consume_until(self, start: int, end: int) -> bytes:
+        # Return the bytes before the delimiter and skip over the delimiter itself
+        with memoryview(self._buffer) as view:
+            data = bytes(view[self._offset:start])
+
+        self._advance(end)
+        return data
+
+    def _consume(self, nbytes: int) -> bytes:
+        start = self._offset
+        end = min(start + nbytes, len(self._buffer))
+        with memoryview(self._buffer) as view:
+            data = bytes(view[start:end])
+
+        self._advance(end)
+        return data
+
+    def _advance(self, end: int) -> None:
+        self._scanned = 0
+        # Move the read offset forward. The consumed bytes are only removed from the buffer once
+        # they make up over half of it, so that the remaining bytes are moved at most once per
+        # their own length in total.
+        if end == len(self._buffer):
+            del self._buffer[:]
+            self._offset = 0
+        elif end > len(self._buffer) // 2:
+            del self._buffer[:end]
+            self._offset = 0
+        else:
+            self._offset = end
+
+
+@dataclass(eq=False)
+class BufferedByteSendStream(ByteSendStream):
+    """
+    Wraps any bytes-based send stream and coalesces small writes into larger ones.
+
+    The bytes passed to :meth:`send` are collected in a buffer, which is sent to the wrapped stream
+    as a single item once it holds at least ``max_buffer_size`` bytes, when :meth:`flush` is
+    called, or when the stream is closed. If ``flush_delay`` is given, the buffer is also flushed
+    by a background task (spawned in ``task_group``) at most ``flush_delay`` seconds after the
+    first bytes were buffered. Any error from such a background flush is raised from the next
+    call to :meth:`send`, :meth:`flush` or :meth:`aclose`.
+
+    :param send_stream: the stream to send the coalesced bytes to
+    :param max_buffer_size: the number of buffered bytes that triggers a flush
+    :param flush_delay: maximum time (in seconds) bytes are held in the buffer before being sent
+    :param task_group: the task group to run the delayed flushes in (required if ``flush_delay``
+        is given)
+
+    .. versionadded:: 3.0
+    """
+
+    send_stream: AnyByteSendStream
+    max_buffer_size: int = 65536
+    flush_delay: Optional[float] = None
+    task_group: Optional[TaskGroup] = None
+    _buffer: bytearray = field(init=False, default_factory=bytearray)
+    _flush_generation: int = field(init=False, default=0)
+    _flush_scheduled: bool = field(init=False, default=False)
+    _flush_timer: Optional[CancelScope] = field(init=False, default=None)
+    _flush_error: Optional[BaseException] = field(init=False, default=None)
+    _closed: bool = field(init=False, default=False)
+
+    def __post_init__(self):
+        if self.max_buffer_size < 1:
+            raise ValueError('max_buffer_size must be at least 1')
+        if self.flush_delay is not None and self.task_group is None:
+            raise ValueError('task_group is required when flush_delay is given')
+
+        self._lock = create_lock()
+
+    @property
+    def buffer(self) -> bytes:
+        """The bytes currently in the buffer."""
+        return bytes(self._buffer)
+
+    @property
+    def extra_attributes(self):
+        return self.send_stream.extra_attributes
+
+    async def send(self, item: bytes) -> None:
+        self._check_state()
+        if len(self._buffer) + len(item) < self.max_buffer_size:
+            self._buffer.extend(item)
+            if self.flush_delay is not None and not self._flush_scheduled:
+                self._flush_scheduled = True
+                assert self.task_group is not None
+                self.task_group.spawn(self._flush_after_delay, self._flush_generation)
+
+            await checkpoint()
+        elif self._buffer:
+            self._buffer.extend(item)
+            await self._flush()
+        else:
+            # The item is large enough to be sent on its own
+            async with self._lock:
+                await self.send_stream.send(item)
+
+    async def flush(self) -> None:
+        """Send any buffered bytes to the wrapped stream."""
+        self._check_state()
+        await self._flush()
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            try:
+                if self._flush_error is None:
+                    await self._flush()
+            finally:
+                self._closed = True
+                await self.send_stream.aclose()
+
+            self._check_flush_error()
+
+    def _check_state(self) -> None:
+        if self._closed:
+            raise ClosedResourceError
+
+        self._check_flush_error()
+
+    def _check_flush_error(self) -> None:
+        if self._flush_error is not None:
+            exc, self._flush_error = self._flush_error, None
+            raise exc
+
+    async def _flush(self) -> None:
+        # Cancel any pending delayed flush (or invalidate it, if it has not started yet)
+        self._flush_generation += 1
+        self._flush_scheduled = False
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        async with self._lock:
+            if self._buffer:
+                data = bytes(self._buffer)
+                del self._buffer[:]
+                await self.send_stream.send(data)
+
+    async def _flush_after_delay(self, generation: int) -> None:
+        assert self.flush_delay is not None
+        if generation != self._flush_generation:
+            return
+
+        with open_cancel_scope() as self._flush_timer:
+            await sleep(self.flush_delay)
+            self._flush_timer = None
+            try:
+                await self._flush()
+            except Exception as exc:
+                self._flush_error = exc
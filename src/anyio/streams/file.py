@@ -76,6 +76,20 @@ class FileReadStream(_BaseFileStream, ByteReceiveStream):
         else:
             raise EndOfStream
 
+    async def receive_into(self, buffer: memoryview) -> int:
+        try:
+            nbytes = await run_sync_in_worker_thread(
+                self._file.readinto, buffer)  # type: ignore[attr-defined]
+        except ValueError:
+            raise ClosedResourceError from None
+        except OSError as exc:
+            raise BrokenResourceError from exc
+
+        if nbytes:
+            return nbytes
+        else:
+            raise EndOfStream
+
     async def seek(self, position: int, whence: int = SEEK_SET) -> int:
         """
         Seek the file to the given position.
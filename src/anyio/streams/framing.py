@@ -0,0 +1,267 @@
+import json
+import pickle
+import re
+import struct
+from dataclasses import InitVar, dataclass, field
+from typing import Any, Callable, Optional
+
+from .. import BrokenResourceError, EndOfStream, IncompleteRead
+from ..abc import (
+    AnyByteReceiveStream, AnyByteSendStream, AnyByteStream, ObjectReceiveStream, ObjectSendStream,
+    ObjectStream)
+from .buffered import BufferedByteReceiveStream
+
+
+@dataclass(frozen=True)
+class Codec:
+    """
+    Converts objects to bytes and back for framed object streams.
+
+    :param encode: a callable that converts an object to bytes
+    :param decode: a callable that converts bytes back to an object
+
+    .. versionadded:: 3.0
+    """
+
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes], Any]
+
+
+#: Messages smaller than this are sent together with their length prefix in a single call
+_COALESCE_LIMIT = 65536
+
+
+def _identity(data: bytes) -> bytes:
+    return data
+
+
+#: Passes bytes through as is
+raw_codec = Codec(_identity, _identity)
+#: Serializes objects with :mod:`pickle` (only use this with trusted peers!)
+pickle_codec = Codec(pickle.dumps, pickle.loads)
+#: Serializes objects as UTF-8 encoded JSON
+json_codec = Codec(lambda obj: json.dumps(obj, separators=(',', ':')).encode('utf-8'),
+                   json.loads)
+
+
+def _header_struct(length_prefix: str) -> Optional[struct.Struct]:
+    if length_prefix == 'varint':
+        return None
+
+    # An optional byte order character followed by a single unsigned integer type
+    if not re.fullmatch(r'[@=<>!]?[BHILQ]', length_prefix):
+        raise ValueError(f'length_prefix must be either "varint" or a struct format for a single '
+                         f'unsigned integer, not {length_prefix!r}')
+
+    return struct.Struct(length_prefix)
+
+
+def _encode_varint(value: int) -> bytes:
+    encoded = bytearray()
+    while value > 0x7f:
+        encoded.append(value & 0x7f | 0x80)
+        value >>= 7
+
+    encoded.append(value)
+    return bytes(encoded)
+
+
+@dataclass
+class FramedObjectReceiveStream(ObjectReceiveStream[Any]):
+    """
+    Stream wrapper that receives length prefixed messages from a byte stream and decodes them
+    into objects.
+
+    Each message is preceded by its length, either as a fixed width integer (as specified by a
+    :mod:`struct` format like the default ``!I``, a 32-bit unsigned integer in network byte order)
+    or as a variable width ``varint`` (unsigned LEB128, as used by Protocol Buffers).
+
+    :param transport_stream: any bytes-based receive stream (a
+        :class:`~anyio.streams.buffered.BufferedByteReceiveStream` is used as is, any other
+        stream gets wrapped in one)
+    :param codec: the codec used to decode the messages (defaults to :data:`raw_codec`)
+    :param length_prefix: ``varint`` or a :mod:`struct` format for an unsigned integer
+    :param max_message_size: maximum allowed size of a message, in bytes (as a safeguard against
+        misbehaving peers)
+
+    .. versionadded:: 3.0
+    """
+
+    transport_stream: AnyByteReceiveStream
+    codec: Codec = raw_codec
+    length_prefix: InitVar[str] = '!I'
+    max_message_size: int = 16 * 1024 * 1024
+    _buffered_stream: BufferedByteReceiveStream = field(init=False)
+    _header: Optional[struct.Struct] = field(init=False)
+    # The length prefix decoded so far, kept here so that a cancellation while waiting for the
+    # rest of the frame does not lose the bytes already consumed
+    _length: Optional[int] = field(init=False, default=None)
+    _varint_value: int = field(init=False, default=0)
+    _varint_shift: int = field(init=False, default=0)
+
+    def __post_init__(self, length_prefix):
+        self._header = _header_struct(length_prefix)
+        if isinstance(self.transport_stream, BufferedByteReceiveStream):
+            self._buffered_stream = self.transport_stream
+        else:
+            self._buffered_stream = BufferedByteReceiveStream(self.transport_stream)
+
+    async def receive(self) -> Any:
+        if self._length is None:
+            if self._header is not None:
+                self._length = await self._receive_header()
+            else:
+                self._length = await self._receive_varint()
+
+        length = self._length
+        if length > self.max_message_size:
+            raise BrokenResourceError(
+                f'Incoming message ({length} bytes) exceeds the maximum message size '
+                f'({self.max_message_size} bytes)')
+
+        # receive_exactly() leaves the bytes in the buffer if it is cancelled
+        data = await self._buffered_stream.receive_exactly(length)
+        self._length = None
+        return self.codec.decode(data)
+
+    async def _receive_header(self) -> int:
+        assert self._header is not None
+        try:
+            prefix = await self._buffered_stream.receive_exactly(self._header.size)
+        except IncompleteRead:
+            if self._buffered_stream.buffer:
+                raise
+
+            # The stream ended cleanly between two messages
+            raise EndOfStream from None
+
+        return self._header.unpack(prefix)[0]
+
+    async def _receive_varint(self) -> int:
+        while True:
+            try:
+                byte = (await self._buffered_stream.receive_exactly(1))[0]
+            except IncompleteRead:
+                if self._varint_shift:
+                    # The stream ended partway through the prefix
+                    raise
+
+                raise EndOfStream from None
+
+            self._varint_value |= (byte & 0x7f) << self._varint_shift
+            self._varint_shift += 7
+            # Give up on a runaway length prefix before it consumes more of the stream
+            if not byte & 0x80 or self._varint_value > self.max_message_size:
+                value = self._varint_value
+                self._varint_value = self._varint_shift = 0
+                return value
+
+    async def aclose(self) -> None:
+        await self._buffered_stream.aclose()
+
+    @property
+    def extra_attributes(self):
+        return self.transport_stream.extra_attributes
+
+
+@dataclass
+class FramedObjectSendStream(ObjectSendStream[Any]):
+    """
+    Stream wrapper that encodes objects into bytes and sends them to a byte stream as length
+    prefixed messages.
+
+    :param transport_stream: any bytes-based send stream
+    :param codec: the codec used to encode the messages (defaults to :data:`raw_codec`)
+    :param length_prefix: ``varint`` or a :mod:`struct` format for an unsigned integer
+    :param max_message_size: maximum allowed size of a message, in bytes
+
+    .. versionadded:: 3.0
+    """
+
+    transport_stream: AnyByteSendStream
+    codec: Codec = raw_codec
+    length_prefix: InitVar[str] = '!I'
+    max_message_size: int = 16 * 1024 * 1024
+    _header: Optional[struct.Struct] = field(init=False)
+
+    def __post_init__(self, length_prefix):
+        self._header = _header_struct(length_prefix)
+
+    async def send(self, item: Any) -> None:
+        """
+        Encode the given object and send it as a single message.
+
+        :param item: the object to send
+        :raises ValueError: if the encoded message exceeds the maximum message size
+
+        """
+        data = self.codec.encode(item)
+        if len(data) > self.max_message_size:
+            raise ValueError(f'The message ({len(data)} bytes) exceeds the maximum message size '
+                             f'({self.max_message_size} bytes)')
+
+        if self._header is not None:
+            header = self._header.pack(len(data))
+        else:
+            header = _encode_varint(len(data))
+
+        if len(data) < _COALESCE_LIMIT:
+            # Copying a small message is cheaper than an extra call to the transport stream
+            await self.transport_stream.send(header + data)
+        else:
+            await self.transport_stream.send(header)
+            await self.transport_stream.send(data)
+
+    async def aclose(self) -> None:
+        await self.transport_stream.aclose()
+
+    @property
+    def extra_attributes(self):
+        return self.transport_stream.extra_attributes
+
+
+@dataclass
+class FramedObjectStream(ObjectStream[Any]):
+    """
+    A bidirectional stream that sends and receives length prefixed messages over a byte stream.
+
+    Extra attributes will be provided from both streams, with the receive stream providing the
+    values in case of a conflict.
+
+    :param transport_stream: any bytes-based stream
+    :param codec: the codec used to encode and decode the messages (defaults to
+        :data:`raw_codec`)
+    :param length_prefix: ``varint`` or a :mod:`struct` format for an unsigned integer
+    :param max_message_size: maximum allowed size of a message, in bytes
+
+    .. versionadded:: 3.0
+    """
+
+    transport_stream: AnyByteStream
+    codec: Codec = raw_codec
+    length_prefix: InitVar[str] = '!I'
+    max_message_size: int = 16 * 1024 * 1024
+    _receive_stream: FramedObjectReceiveStream = field(init=False)
+    _send_stream: FramedObjectSendStream = field(init=False)
+
+    def __post_init__(self, length_prefix):
+        self._receive_stream = FramedObjectReceiveStream(
+            self.transport_stream, self.codec, length_prefix, self.max_message_size)
+        self._send_stream = FramedObjectSendStream(
+            self.transport_stream, self.codec, length_prefix, self.max_message_size)
+
+    async def receive(self) -> Any:
+        return await self._receive_stream.receive()
+
+    async def send(self, item: Any) -> None:
+        await self._send_stream.send(item)
+
+    async def send_eof(self) -> None:
+        await self.transport_stream.send_eof()
+
+    async def aclose(self) -> None:
+        await self.transport_stream.aclose()
+
+    @property
+    def extra_attributes(self):
+        return {**self._send_stream.extra_attributes, **self._receive_stream.extra_attributes}
@@ -1,40 +1,276 @@
+import math
+import sys
 from collections import OrderedDict, deque
 from dataclasses import dataclass, field
-from typing import Deque, Generic, List, NamedTuple, TypeVar
+from heapq import heapify, heappop, heappush
+from itertools import count
+from threading import Lock
+from typing import (
+    Any, Callable, Deque, Generic, Iterable, List, NamedTuple, Optional, Tuple, TypeVar)
 
 from .. import (
     BrokenResourceError, ClosedResourceError, EndOfStream, WouldBlock, get_cancelled_exc_class)
 from .._core._compat import DeprecatedAwaitable
-from .._core._synchronization import create_event
-from ..abc import Event, ObjectReceiveStream, ObjectSendStream
+from .._core._eventloop import get_asynclib, threadlocals
+from ..abc import ObjectReceiveStream, ObjectSendStream
 from ..lowlevel import checkpoint
 
+if sys.version_info >= (3, 8):
+    from typing import Literal
+else:
+    from typing_extensions import Literal
+
 T_Item = TypeVar('T_Item')
+OverflowPolicy = Literal['block', 'drop_newest', 'drop_oldest']
 
 
 class MemoryObjectStreamStatistics(NamedTuple):
+    """
+    Statistics about a memory object stream.
+
+    Besides the current state of the stream, the statistics include cumulative counters covering
+    the whole lifetime of the stream:
+
+    * ``items_sent`` and ``items_received``: the number of items that have entered and left the
+      stream, respectively
+    * ``max_buffer_used``: the highest number of items the buffer has held at any one time
+    * ``total_send_blocked_time`` and ``max_send_blocked_time``: the total and longest time (in
+      seconds) tasks have spent waiting in :meth:`~MemoryObjectSendStream.send` (or threads in
+      :meth:`~MemoryObjectSendStream.send_from_thread`) for room in the buffer
+    * ``total_receive_wait_time``: the total time (in seconds) tasks have spent waiting in
+      :meth:`~MemoryObjectReceiveStream.receive` (or threads in
+      :meth:`~MemoryObjectReceiveStream.receive_from_thread`) for items to arrive
+    * ``items_dropped``: the number of items discarded due to the overflow policy
+
+    .. versionchanged:: 3.0
+       Added the cumulative counters.
+    """
+
     current_buffer_used: int
     max_buffer_size: float
     open_send_streams: int
     open_receive_streams: int
     tasks_waiting_send: int
     tasks_waiting_receive: int
+    current_buffer_bytes: int = 0
+    max_buffer_bytes: float = math.inf
+    items_sent: int = 0
+    items_received: int = 0
+    max_buffer_used: int = 0
+    total_send_blocked_time: float = 0.0
+    max_send_blocked_time: float = 0.0
+    total_receive_wait_time: float = 0.0
+    items_dropped: int = 0
+
+
+class PriorityBuffer(Generic[T_Item]):
+    """
+    A heap based replacement for the deque used as the buffer of a memory object stream.
+
+    Items are retrieved in the order of the value returned by the priority function (lowest
+    first), and in the order they were added among items of equal priority.
+
+    :param priority: a callable that returns the priority of the given item
+    """
+
+    __slots__ = '_priority', '_heap', '_counter'
+
+    def __init__(self, priority: Callable[[T_Item], Any]):
+        self._priority = priority
+        self._heap: List[Tuple[Any, int, T_Item]] = []
+        self._counter = count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def append(self, item: T_Item) -> None:
+        heappush(self._heap, (self._priority(item), next(self._counter), item))
+
+    def popleft(self) -> T_Item:
+        return heappop(self._heap)[2]
+
+    def precedes_last(self, item: T_Item) -> bool:
+        """Return ``True`` if the given item would be retrieved before the current last item."""
+        return bool(self._heap) and self._priority(item) < max(self._heap)[0]
+
+    def pop_last(self) -> T_Item:
+        """Remove and return the item that would be retrieved last."""
+        index = max(range(len(self._heap)), key=self._heap.__getitem__)
+        item = self._heap.pop(index)[2]
+        heapify(self._heap)
+        return item
+
+
+class _ThreadWaiter:
+    """
+    A wakeup primitive for a worker thread waiting on a memory object stream operation.
+
+    It is set from the event loop thread, and waited on in the worker thread. If the thread had to
+    be queued, the time it spent in the queue is passed to ``record_wait_time`` when it is set.
+    """
+
+    __slots__ = ('_lock', '_is_set', '_waiting_senders', '_record_wait_time', '_queued_at',
+                 'exception')
+
+    def __init__(self, record_wait_time: Callable[[float], None],
+                 waiting_senders: Optional['OrderedDict[Any, Any]'] = None):
+        self._lock = Lock()
+        self._lock.acquire()
+        self._is_set = False
+        self._waiting_senders = waiting_senders
+        self._record_wait_time = record_wait_time
+        self._queued_at: Optional[float] = None
+        self.exception: Optional[BaseException] = None
+
+    def queued(self) -> None:
+        self._queued_at = get_asynclib().current_time()
+
+    def set(self) -> None:
+        if not self._is_set:
+            self._is_set = True
+            # A sender woken up while still in the queue means the receiving end was closed
+            if self._waiting_senders is not None and self in self._waiting_senders:
+                del self._waiting_senders[self]
+                self.exception = BrokenResourceError()
+
+            if self._queued_at is not None:
+                self._record_wait_time(get_asynclib().current_time() - self._queued_at)
+
+            self._lock.release()
+
+    def wait(self) -> None:
+        self._lock.acquire()
+        if self.exception is not None:
+            raise self.exception
 
 
 @dataclass
 class MemoryObjectStreamState(Generic[T_Item]):
     max_buffer_size: float = field()
+    item_size: Optional[Callable[[T_Item], int]] = field(default=None)
+    max_buffer_bytes: float = field(default=math.inf)
+    overflow_policy: OverflowPolicy = field(default='block')
     buffer: Deque[T_Item] = field(init=False, default_factory=deque)
+    current_buffer_bytes: int = field(init=False, default=0)
     open_send_channels: int = field(init=False, default=0)
     open_receive_channels: int = field(init=False, default=0)
-    waiting_receivers: 'OrderedDict[Event, List[T_Item]]' = field(init=False,
-                                                                  default_factory=OrderedDict)
-    waiting_senders: 'OrderedDict[Event, T_Item]' = field(init=False, default_factory=OrderedDict)
+    waiting_receivers: 'OrderedDict[Any, List[T_Item]]' = field(init=False,
+                                                                default_factory=OrderedDict)
+    waiting_senders: 'OrderedDict[Any, T_Item]' = field(init=False, default_factory=OrderedDict)
+    items_sent: int = field(init=False, default=0)
+    items_received: int = field(init=False, default=0)
+    max_buffer_used: int = field(init=False, default=0)
+    total_send_blocked_time: float = field(init=False, default=0.0)
+    max_send_blocked_time: float = field(init=False, default=0.0)
+    total_receive_wait_time: float = field(init=False, default=0.0)
+    items_dropped: int = field(init=False, default=0)
+
+    def fits(self, item: T_Item) -> bool:
+        """Return ``True`` if the item can be added to the buffer without exceeding the limits."""
+        if len(self.buffer) >= self.max_buffer_size:
+            return False
+        elif self.item_size is None or not self.buffer:
+            # A single item is let through even if it alone exceeds the byte limit
+            return True
+
+        return self.current_buffer_bytes + self.item_size(item) <= self.max_buffer_bytes
+
+    def append(self, item: T_Item) -> None:
+        self.buffer.append(item)
+        self.items_sent += 1
+        if self.item_size is not None:
+            self.current_buffer_bytes += self.item_size(item)
+
+    def buffer_item(self, item: T_Item) -> None:
+        """Add an item to the buffer, keeping track of the highest number of buffered items."""
+        self.append(item)
+        if len(self.buffer) > self.max_buffer_used:
+            self.max_buffer_used = len(self.buffer)
+
+    def popleft(self) -> T_Item:
+        item = self.buffer.popleft()
+        self.items_received += 1
+        if self.item_size is not None:
+            self.current_buffer_bytes -= self.item_size(item)
+
+        return item
+
+    def overflow(self, item: T_Item) -> None:
+        """Handle an item that does not fit in the buffer, as per the overflow policy."""
+        if self.overflow_policy == 'block':
+            raise WouldBlock
+
+        if self.overflow_policy == 'drop_oldest' and isinstance(self.buffer, PriorityBuffer):
+            # Discard the items that would be delivered last until the new one fits, or the new
+            # item itself if it would be delivered after all the remaining ones
+            while self.buffer.precedes_last(item):
+                dropped_item = self.buffer.pop_last()
+                self.items_dropped += 1
+                if self.item_size is not None:
+                    self.current_buffer_bytes -= self.item_size(dropped_item)
+
+                if self.fits(item):
+                    self.buffer_item(item)
+                    return
+        elif self.overflow_policy == 'drop_oldest':
+            # Discard the oldest items until the new one fits
+            while self.buffer:
+                dropped_item = self.buffer.popleft()
+                self.items_dropped += 1
+                if self.item_size is not None:
+                    self.current_buffer_bytes -= self.item_size(dropped_item)
+
+                if self.fits(item):
+                    self.buffer_item(item)
+                    return
+
+        self.items_dropped += 1
+
+    def admit_waiting_senders(self) -> None:
+        """Move items from blocked senders to the buffer for as long as they fit in it."""
+        while self.waiting_senders:
+            send_waiter, item = next(iter(self.waiting_senders.items()))
+            if not self.fits(item):
+                break
+
+            del self.waiting_senders[send_waiter]
+            self.buffer_item(item)
+            send_waiter.set()
+
+    def hand_over(self, item: T_Item) -> None:
+        """Pass an item directly to the next waiting receiver."""
+        receive_waiter, container = self.waiting_receivers.popitem(last=False)
+        container.append(item)
+        self.items_sent += 1
+        self.items_received += 1
+        receive_waiter.set()
+
+    def record_send_blocked_time(self, elapsed: float) -> None:
+        self.total_send_blocked_time += elapsed
+        if elapsed > self.max_send_blocked_time:
+            self.max_send_blocked_time = elapsed
+
+    def record_receive_wait_time(self, elapsed: float) -> None:
+        self.total_receive_wait_time += elapsed
+
+    @staticmethod
+    def call_from_thread(func: Callable[..., Any], *args) -> None:
+        # The event loop is looked up on every call, as the stream may be used from worker threads
+        # of different event loops over its lifetime
+        try:
+            asynclib = threadlocals.current_async_module
+        except AttributeError:
+            raise RuntimeError('This function can only be run from an AnyIO worker thread')
+
+        asynclib.run_sync_soon_from_thread(func, *args)
 
     def statistics(self) -> MemoryObjectStreamStatistics:
         return MemoryObjectStreamStatistics(
             len(self.buffer), self.max_buffer_size, self.open_send_channels,
-            self.open_receive_channels, len(self.waiting_senders), len(self.waiting_receivers))
+            self.open_receive_channels, len(self.waiting_senders), len(self.waiting_receivers),
+            self.current_buffer_bytes, self.max_buffer_bytes, self.items_sent,
+            self.items_received, self.max_buffer_used, self.total_send_blocked_time,
+            self.max_send_blocked_time, self.total_receive_wait_time, self.items_dropped)
 
 
 @dataclass
@@ -60,14 +296,46 @@ class MemoryObjectReceiveStream(Generic[T_Item], ObjectReceiveStream[T_Item]):
         if self._closed:
             raise ClosedResourceError
 
-        if self._state.waiting_senders:
-            # Get the item from the next sender
-            send_event, item = self._state.waiting_senders.popitem(last=False)
-            self._state.buffer.append(item)
-            send_event.set()
+        if self._state.waiting_senders and not (self._state.item_size and self._state.buffer):
+            # Get the item from the next sender (unless a byte limit is in place, in which case
+            # the blocked senders are let in as the buffer is drained)
+            send_waiter, item = self._state.waiting_senders.popitem(last=False)
+            self._state.append(item)
+            send_waiter.set()
 
         if self._state.buffer:
-            return self._state.buffer.popleft()
+            item = self._state.popleft()
+            if self._state.item_size is not None:
+                self._state.admit_waiting_senders()
+
+            return item
+        elif not self._state.open_send_channels:
+            raise EndOfStream
+
+        raise WouldBlock
+
+    def receive_many_nowait(self, max_items: int) -> List[T_Item]:
+        """
+        Receive up to ``max_items`` items if it can be done without waiting.
+
+        :param max_items: maximum number of items to receive
+        :return: a list of at least one and at most ``max_items`` items
+        :raises ~anyio.ClosedResourceError: if this receive stream has been closed
+        :raises ~anyio.EndOfStream: if the buffer is empty and this stream has been
+            closed from the sending end
+        :raises ~anyio.WouldBlock: if there are no items in the buffer and no tasks
+            waiting to send
+
+        .. versionadded:: 3.0
+        """
+        if self._closed:
+            raise ClosedResourceError
+        if max_items < 1:
+            raise ValueError('max_items must be at least 1')
+
+        items = self._receive_available(max_items)
+        if items:
+            return items
         elif not self._state.open_send_channels:
             raise EndOfStream
 
@@ -78,25 +346,110 @@ class MemoryObjectReceiveStream(Generic[T_Item], ObjectReceiveStream[T_Item]):
         try:
             return self.receive_nowait()
         except WouldBlock:
-            # Add ourselves in the queue
-            receive_event = create_event()
-            container: List[T_Item] = []
-            self._state.waiting_receivers[receive_event] = container
+            return await self._wait_for_item()
 
-            try:
-                await receive_event.wait()
-            except get_cancelled_exc_class():
-                # Ignore the immediate cancellation if we already received an item, so as not to
-                # lose it
-                if not container:
-                    raise
-            finally:
-                self._state.waiting_receivers.pop(receive_event, None)
-
-            if container:
-                return container[0]
-            else:
-                raise EndOfStream
+    async def receive_many(self, max_items: int) -> List[T_Item]:
+        """
+        Receive up to ``max_items`` items, waiting until at least one is available.
+
+        All the items readily available (up to ``max_items``) are received with a single
+        checkpoint, so this is considerably cheaper than calling :meth:`receive` repeatedly.
+
+        :param max_items: maximum number of items to receive
+        :return: a list of at least one and at most ``max_items`` items
+        :raises ~anyio.ClosedResourceError: if this receive stream has been closed
+        :raises ~anyio.EndOfStream: if the buffer is empty and this stream has been
+            closed from the sending end
+
+        .. versionadded:: 3.0
+        """
+        await checkpoint()
+        try:
+            return self.receive_many_nowait(max_items)
+        except WouldBlock:
+            items = [await self._wait_for_item()]
+            if max_items > 1 and not self._closed:
+                items.extend(self._receive_available(max_items - 1))
+
+            return items
+
+    def _receive_available(self, max_items: int) -> List[T_Item]:
+        items: List[T_Item] = []
+        state = self._state
+        waiting_senders = state.waiting_senders
+        while len(items) < max_items:
+            if waiting_senders and not (state.item_size and state.buffer):
+                # Get the item from the next sender
+                send_waiter, item = waiting_senders.popitem(last=False)
+                state.append(item)
+                send_waiter.set()
+
+            if not state.buffer:
+                break
+
+            items.append(state.popleft())
+
+        if state.item_size is not None:
+            state.admit_waiting_senders()
+
+        return items
+
+    def receive_from_thread(self) -> T_Item:
+        """
+        Receive the next item, blocking the current (worker) thread until one is available.
+
+        This must be called from a worker thread started by AnyIO.
+
+        :return: the received item
+        :raises ~anyio.ClosedResourceError: if this receive stream has been closed
+        :raises ~anyio.EndOfStream: if the buffer is empty and this stream has been
+            closed from the sending end
+
+        .. versionadded:: 3.0
+        """
+        waiter = _ThreadWaiter(self._state.record_receive_wait_time)
+        container: List[T_Item] = []
+        self._state.call_from_thread(self._receive_for_thread, waiter, container)
+        waiter.wait()
+        if container:
+            return container[0]
+        else:
+            raise EndOfStream
+
+    def _receive_for_thread(self, waiter: _ThreadWaiter, container: List[T_Item]) -> None:
+        try:
+            container.append(self.receive_nowait())
+        except WouldBlock:
+            waiter.queued()
+            self._state.waiting_receivers[waiter] = container
+            return
+        except BaseException as exc:
+            waiter.exception = exc
+
+        waiter.set()
+
+    async def _wait_for_item(self) -> T_Item:
+        # Add ourselves in the queue
+        asynclib = get_asynclib()
+        receive_waiter = asynclib.Waiter()
+        container: List[T_Item] = []
+        self._state.waiting_receivers[receive_waiter] = container
+        start = asynclib.current_time()
+        try:
+            await receive_waiter.wait()
+        except get_cancelled_exc_class():
+            # Ignore the immediate cancellation if we already received an item, so as not to
+            # lose it
+            if not container:
+                raise
+        finally:
+            self._state.waiting_receivers.pop(receive_waiter, None)
+            self._state.record_receive_wait_time(asynclib.current_time() - start)
+
+        if container:
+            return container[0]
+        else:
+            raise EndOfStream
 
     def clone(self) -> 'MemoryObjectReceiveStream':
         """
@@ -118,9 +471,9 @@ class MemoryObjectReceiveStream(Generic[T_Item], ObjectReceiveStream[T_Item]):
             self._closed = True
             self._state.open_receive_channels -= 1
             if self._state.open_receive_channels == 0:
-                send_events = list(self._state.waiting_senders.keys())
-                for event in send_events:
-                    event.set()
+                send_waiters = list(self._state.waiting_senders.keys())
+                for waiter in send_waiters:
+                    waiter.set()
 
     def statistics(self) -> MemoryObjectStreamStatistics:
         """
@@ -147,42 +500,137 @@ class MemoryObjectSendStream(Generic[T_Item], ObjectSendStream[T_Item]):
         :raises ~anyio.ClosedResourceError: if this send stream has been closed
         :raises ~anyio.BrokenResourceError: if the stream has been closed from the
             receiving end
-        :raises ~anyio.WouldBlock: if the buffer is full and there are no tasks waiting
-            to receive
+        :raises ~anyio.WouldBlock: if the buffer is full, there are no tasks waiting
+            to receive and the overflow policy is ``block``
+
+        """
+        self._send_nowait(item)
+        return DeprecatedAwaitable(self.send_nowait)
+
+    def send_many_nowait(self, items: Iterable[T_Item]) -> None:
+        """
+        Send all the given items immediately if it can be done without waiting.
+
+        Either all the items are sent, or none of them are.
+
+        :param items: the items to send
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if the stream has been closed from the
+            receiving end
+        :raises ~anyio.WouldBlock: if there is not enough room in the buffer, or tasks waiting
+            to receive, to accommodate all the items (only with the ``block`` overflow policy)
 
+        .. versionadded:: 3.0
         """
         if self._closed:
             raise ClosedResourceError
         if not self._state.open_receive_channels:
             raise BrokenResourceError
 
-        if self._state.waiting_receivers:
-            receive_event, container = self._state.waiting_receivers.popitem(last=False)
-            container.append(item)
-            receive_event.set()
-        elif len(self._state.buffer) < self._state.max_buffer_size:
-            self._state.buffer.append(item)
-        else:
-            raise WouldBlock
+        items = list(items)
+        buffered_items = items[len(self._state.waiting_receivers):]
+        if buffered_items and self._state.overflow_policy == 'block':
+            if len(self._state.buffer) + len(buffered_items) > self._state.max_buffer_size:
+                raise WouldBlock
 
-        return DeprecatedAwaitable(self.send_nowait)
+            item_size = self._state.item_size
+            if item_size is not None and (self._state.buffer or len(buffered_items) > 1):
+                total_bytes = self._state.current_buffer_bytes + sum(map(item_size,
+                                                                         buffered_items))
+                if total_bytes > self._state.max_buffer_bytes:
+                    raise WouldBlock
+
+        for item in items:
+            self._send_nowait(item)
 
     async def send(self, item: T_Item) -> None:
         await checkpoint()
         try:
-            self.send_nowait(item)
+            self._send_nowait(item)
         except WouldBlock:
-            # Wait until there's someone on the receiving end
-            send_event = create_event()
-            self._state.waiting_senders[send_event] = item
+            await self._wait_to_send(item)
+
+    async def send_many(self, items: Iterable[T_Item]) -> None:
+        """
+        Send the given items in order, waiting for room in the buffer as necessary.
+
+        All the items that fit in the buffer (or can be handed to waiting receivers) are sent with
+        a single checkpoint, so this is considerably cheaper than calling :meth:`send` repeatedly.
+
+        .. note:: If the operation is cancelled, some of the items may have already been sent.
+
+        :param items: the items to send
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if the stream has been closed from the
+            receiving end
+
+        .. versionadded:: 3.0
+        """
+        await checkpoint()
+        for item in items:
             try:
-                await send_event.wait()
-            except BaseException:
-                self._state.waiting_senders.pop(send_event, None)  # type: ignore[arg-type]
-                raise
+                self._send_nowait(item)
+            except WouldBlock:
+                await self._wait_to_send(item)
+
+    def send_from_thread(self, item: T_Item) -> None:
+        """
+        Send an item, blocking the current (worker) thread until it has been accepted.
+
+        This must be called from a worker thread started by AnyIO.
+
+        :param item: the item to send
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if the stream has been closed from the
+            receiving end
 
-            if self._state.waiting_senders.pop(send_event, None):  # type: ignore[arg-type]
-                raise BrokenResourceError
+        .. versionadded:: 3.0
+        """
+        waiter = _ThreadWaiter(self._state.record_send_blocked_time, self._state.waiting_senders)
+        self._state.call_from_thread(self._send_for_thread, item, waiter)
+        waiter.wait()
+
+    def _send_for_thread(self, item: T_Item, waiter: _ThreadWaiter) -> None:
+        try:
+            self._send_nowait(item)
+        except WouldBlock:
+            waiter.queued()
+            self._state.waiting_senders[waiter] = item
+            return
+        except BaseException as exc:
+            waiter.exception = exc
+
+        waiter.set()
+
+    def _send_nowait(self, item: T_Item) -> None:
+        if self._closed:
+            raise ClosedResourceError
+        if not self._state.open_receive_channels:
+            raise BrokenResourceError
+
+        if self._state.waiting_receivers:
+            self._state.hand_over(item)
+        elif self._state.fits(item):
+            self._state.buffer_item(item)
+        else:
+            self._state.overflow(item)
+
+    async def _wait_to_send(self, item: T_Item) -> None:
+        # Wait until there's someone on the receiving end
+        asynclib = get_asynclib()
+        send_waiter = asynclib.Waiter()
+        self._state.waiting_senders[send_waiter] = item
+        start = asynclib.current_time()
+        try:
+            await send_waiter.wait()
+        except BaseException:
+            self._state.waiting_senders.pop(send_waiter, None)
+            raise
+        finally:
+            self._state.record_send_blocked_time(asynclib.current_time() - start)
+
+        if self._state.waiting_senders.pop(send_waiter, None):
+            raise BrokenResourceError
 
     def clone(self) -> 'MemoryObjectSendStream':
         """
@@ -204,10 +652,10 @@ class MemoryObjectSendStream(Generic[T_Item], ObjectSendStream[T_Item]):
             self._closed = True
             self._state.open_send_channels -= 1
             if self._state.open_send_channels == 0:
-                receive_events = list(self._state.waiting_receivers.keys())
+                receive_waiters = list(self._state.waiting_receivers.keys())
                 self._state.waiting_receivers.clear()
-                for event in receive_events:
-                    event.set()
+                for waiter in receive_waiters:
+                    waiter.set()
 
     def statistics(self) -> MemoryObjectStreamStatistics:
         """
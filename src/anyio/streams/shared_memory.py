@@ -0,0 +1,348 @@
+import os
+import platform
+import socket
+import struct
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Type, TypeVar, cast
+
+from .. import (
+    BrokenResourceError, ClosedResourceError, EndOfStream, move_on_after, wait_socket_readable)
+from .._core._synchronization import ResourceGuard
+from ..abc import CancelScope, ObjectReceiveStream, ObjectSendStream
+from ..lowlevel import checkpoint
+
+# Indexes of the 64-bit counters and flags in the header of the shared memory block
+(_HEAD, _TAIL, _CAPACITY, _CREATOR_PID, _RECEIVER_WAITING, _SENDER_WAITING, _SENDER_CLOSED,
+ _RECEIVER_CLOSED) = range(8)
+_HEADER_SIZE = 64
+_LENGTH = struct.Struct('<I')
+
+#: Upper limit for how long to wait for a wakeup from the peer before checking the buffer again.
+#: Even x86 may order a store after a later load, so an end can set its waiting flag while the peer
+#: still sees it unset and skips the wakeup. Polling bounds the resulting delay to this interval.
+_POLL_INTERVAL = 0.1
+
+#: The head and tail counters are published with plain stores and without memory fences, which
+#: Python offers no way to issue. That is only safe on processors that never make stores visible to
+#: other processors out of order (or loads out of order), like x86. Elsewhere, the peer could see a
+#: new counter value before the item data written ahead of it.
+_SUPPORTED_MACHINES = frozenset(['x86_64', 'amd64', 'x86', 'i386', 'i486', 'i586', 'i686'])
+
+T_Endpoint = TypeVar('T_Endpoint', bound='_SharedMemoryEndpoint')
+
+
+def _check_platform() -> None:
+    machine = platform.machine()
+    if machine.lower() not in _SUPPORTED_MACHINES:
+        raise NotImplementedError(f'shared memory object streams require an x86 processor, not '
+                                  f'{machine or "an unknown one"}')
+
+
+class _SharedMemoryEndpoint:
+    _role: str
+    _peer_role: str
+    _action: str
+
+    def __init__(self, shm: Any, owner: bool):
+        self._shm = shm
+        self._owner = owner
+        self._header_buf = shm.buf[:_HEADER_SIZE]
+        self._header = self._header_buf.cast('Q')
+        self._capacity: int = self._header[_CAPACITY]
+        self._data = shm.buf[_HEADER_SIZE:_HEADER_SIZE + self._capacity]
+        self._closed = False
+        self._in_operation = False
+        self._wait_scope: Optional[CancelScope] = None
+        self._guard = ResourceGuard(self._action)
+        self._address = self._socket_path(shm.name, self._role)
+        self._peer_address = self._socket_path(shm.name, self._peer_role)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            self._socket.setblocking(False)
+            self._socket.bind(self._address)
+        except BaseException:
+            self._socket.close()
+            self._release_memory()
+            raise
+
+    @classmethod
+    def create(cls: Type[T_Endpoint], max_buffer_bytes: int) -> T_Endpoint:
+        """
+        Create a new shared memory buffer and attach to it as this endpoint.
+
+        The shared memory block is destroyed when this endpoint is closed.
+
+        :param max_buffer_bytes: size of the ring buffer (each item takes up 4 bytes more than
+            its length)
+        :return: the created endpoint (use its :attr:`name` to attach the other endpoint)
+        :raises NotImplementedError: if not running on an x86 processor
+
+        """
+        from multiprocessing.shared_memory import SharedMemory
+
+        _check_platform()
+        if max_buffer_bytes <= _LENGTH.size:
+            raise ValueError(f'max_buffer_bytes must be greater than {_LENGTH.size}')
+
+        shm = SharedMemory(create=True, size=_HEADER_SIZE + max_buffer_bytes)
+        assert shm.buf is not None
+        header = shm.buf[:_HEADER_SIZE].cast('Q')
+        header[_CAPACITY] = max_buffer_bytes
+        header[_CREATOR_PID] = os.getpid()
+        header.release()
+        try:
+            return cls(shm, True)
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+
+    @classmethod
+    def attach(cls: Type[T_Endpoint], name: str) -> T_Endpoint:
+        """
+        Attach to an existing shared memory buffer as this endpoint.
+
+        :param name: the name of the shared memory block, as given by :attr:`name` of the
+            endpoint that created it
+        :return: the attached endpoint
+        :raises NotImplementedError: if not running on an x86 processor
+
+        """
+        import multiprocessing
+        from multiprocessing.shared_memory import SharedMemory
+
+        _check_platform()
+        if sys.version_info >= (3, 13):
+            shm = SharedMemory(name, track=False)
+        else:
+            shm = SharedMemory(name)
+
+        try:
+            endpoint = cls(shm, False)
+        except BaseException:
+            shm.close()
+            raise
+
+        # Before Python 3.13, attaching registers the block with the resource tracker, which would
+        # then destroy it when this process exits. That is only harmless if the tracker is shared
+        # with the creating process.
+        if (sys.version_info < (3, 13) and endpoint._header[_CREATOR_PID] != os.getpid()
+                and multiprocessing.parent_process() is None):
+            from multiprocessing import resource_tracker
+
+            # The block was registered under its name with the leading slash that the name
+            # property strips
+            resource_tracker.unregister(f'/{shm.name}', 'shared_memory')
+
+        return endpoint
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory block."""
+        return cast(str, self._shm.name)
+
+    @staticmethod
+    def _socket_path(name: str, role: str) -> str:
+        return os.path.join(tempfile.gettempdir(), f'{name.lstrip("/")}.{role}')
+
+    async def _wait_for_peer(self, flag: int, ready: Callable[[], bool]) -> None:
+        if self._closed:
+            raise ClosedResourceError
+
+        # Announce that we're waiting, and check once more so that progress made by the peer
+        # before it could see the flag is not missed
+        self._header[flag] = 1
+        try:
+            if not ready():
+                # aclose() cancels this scope to wake up the wait
+                with move_on_after(_POLL_INTERVAL) as self._wait_scope:
+                    await wait_socket_readable(self._socket)
+
+                if self._closed:
+                    raise ClosedResourceError
+
+                # Drain the wakeup datagrams
+                while True:
+                    try:
+                        self._socket.recv(1)
+                    except OSError:
+                        break
+        finally:
+            self._wait_scope = None
+            self._header[flag] = 0
+
+    def _wake_peer(self) -> None:
+        try:
+            self._socket.sendto(b'\x00', self._peer_address)
+        except OSError:
+            # Either there is a wakeup pending already, or the peer is gone
+            pass
+
+    def _release_memory(self) -> None:
+        self._data.release()
+        self._header.release()
+        self._header_buf.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def _release(self) -> None:
+        self._socket.close()
+        try:
+            os.unlink(self._address)
+        except OSError:
+            pass
+
+        self._release_memory()
+
+    @contextmanager
+    def _operation(self) -> Iterator[None]:
+        # The shared memory views and the socket are released when the stream is closed, but not
+        # while an operation is still using them; in that case, the operation releases them once
+        # it is done
+        self._in_operation = True
+        try:
+            yield
+        finally:
+            self._in_operation = False
+            if self._closed:
+                self._release()
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._header[_SENDER_CLOSED if self._role == 'send' else _RECEIVER_CLOSED] = 1
+            self._wake_peer()
+            if self._wait_scope is not None:
+                self._wait_scope.cancel()
+
+            if not self._in_operation:
+                self._release()
+
+        await checkpoint()
+
+
+class SharedMemoryObjectSendStream(_SharedMemoryEndpoint, ObjectSendStream[bytes]):
+    """
+    Sends bytes objects through a ring buffer in shared memory to a
+    :class:`SharedMemoryObjectReceiveStream`, possibly in another process.
+
+    The item boundaries are preserved. Only a single sender and a single receiver may be attached
+    to the same buffer. Each item is copied into the buffer. Only available on x86 processors, and
+    not on Windows.
+
+    Use :meth:`create` or :meth:`attach` to get an instance of this class.
+
+    .. note:: Requires Python 3.8 or later.
+
+    .. versionadded:: 3.0
+    """
+
+    _role = 'send'
+    _peer_role = 'receive'
+    _action = 'writing to'
+
+    async def send(self, item: bytes) -> None:
+        """
+        Send the given bytes to the receiver.
+
+        Waits until there is enough room in the buffer for the item.
+
+        :param item: the bytes to send
+        :raises ValueError: if the item is too large to ever fit in the buffer
+        :raises ~anyio.ClosedResourceError: if this stream has been closed
+        :raises ~anyio.BrokenResourceError: if the receiving end has been closed
+
+        """
+        with self._guard:
+            await checkpoint()
+            if self._closed:
+                raise ClosedResourceError
+
+            with self._operation():
+                header = self._header
+                size = _LENGTH.size + len(item)
+                if size > self._capacity:
+                    raise ValueError(f'the item ({len(item)} bytes) does not fit in the buffer')
+
+                def has_room() -> bool:
+                    return (self._capacity - (header[_TAIL] - header[_HEAD]) >= size
+                            or bool(header[_RECEIVER_CLOSED]))
+
+                while not has_room():
+                    await self._wait_for_peer(_SENDER_WAITING, has_room)
+
+                if header[_RECEIVER_CLOSED]:
+                    raise BrokenResourceError
+
+                tail = header[_TAIL]
+                self._write(tail, _LENGTH.pack(len(item)))
+                self._write(tail + _LENGTH.size, item)
+                header[_TAIL] = tail + size
+                if header[_RECEIVER_WAITING]:
+                    self._wake_peer()
+
+    def _write(self, position: int, data: bytes) -> None:
+        offset = position % self._capacity
+        length = len(data)
+        first_part = min(length, self._capacity - offset)
+        self._data[offset:offset + first_part] = data[:first_part]
+        if first_part < length:
+            self._data[:length - first_part] = data[first_part:]
+
+
+class SharedMemoryObjectReceiveStream(_SharedMemoryEndpoint, ObjectReceiveStream[bytes]):
+    """
+    Receives bytes objects through a ring buffer in shared memory from a
+    :class:`SharedMemoryObjectSendStream`, possibly in another process.
+
+    Each received item is a new bytes object copied out of the buffer. Only available on x86
+    processors, and not on Windows.
+
+    Use :meth:`create` or :meth:`attach` to get an instance of this class.
+
+    .. note:: Requires Python 3.8 or later.
+
+    .. versionadded:: 3.0
+    """
+
+    _role = 'receive'
+    _peer_role = 'send'
+    _action = 'reading from'
+
+    async def receive(self) -> bytes:
+        with self._guard:
+            await checkpoint()
+            if self._closed:
+                raise ClosedResourceError
+
+            with self._operation():
+                header = self._header
+
+                def has_items() -> bool:
+                    return header[_TAIL] != header[_HEAD] or bool(header[_SENDER_CLOSED])
+
+                while not has_items():
+                    await self._wait_for_peer(_RECEIVER_WAITING, has_items)
+
+                head = header[_HEAD]
+                if header[_TAIL] == head:
+                    raise EndOfStream
+
+                length = _LENGTH.unpack(self._read(head, _LENGTH.size))[0]
+                item = self._read(head + _LENGTH.size, length)
+                header[_HEAD] = head + _LENGTH.size + length
+                if header[_SENDER_WAITING]:
+                    self._wake_peer()
+
+                return item
+
+    def _read(self, position: int, length: int) -> bytes:
+        offset = position % self._capacity
+        first_part = min(length, self._capacity - offset)
+        if first_part == length:
+            return bytes(self._data[offset:offset + length])
+
+        return bytes(self._data[offset:]) + bytes(self._data[:length - first_part])
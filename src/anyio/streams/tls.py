@@ -1,16 +1,27 @@
 import logging
+import os
 import re
 import ssl
-from dataclasses import dataclass
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from functools import wraps
 from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 
 from .. import BrokenResourceError, EndOfStream, aclose_forcefully, get_cancelled_exc_class
+from .._core._eventloop import get_asynclib
+from .._core._synchronization import create_capacity_limiter
+from .._core._threads import run_sync_in_worker_thread
 from .._core._typedattr import TypedAttributeSet, typed_attribute
-from ..abc import AnyByteStream, ByteStream, Listener, TaskGroup
+from ..abc import AnyByteStream, ByteStream, CapacityLimiter, Listener, SocketAttribute, TaskGroup
 
 T_Retval = TypeVar('T_Retval')
 
+#: Maximum amount of plaintext in a single TLS record
+_TLS_RECORD_SIZE = 16384
+#: Amount of encrypted data to accumulate before passing it on to the transport stream
+_TRANSPORT_WRITE_SIZE = 65536
+
 
 class TLSAttribute(TypedAttributeSet):
     """Contains Transport Layer Security related attributes."""
@@ -38,6 +49,116 @@ class TLSAttribute(TypedAttributeSet):
     tls_version: str = typed_attribute()
 
 
+_default_contexts: Dict[ssl.Purpose, ssl.SSLContext] = {}
+_default_contexts_lock = threading.Lock()
+
+
+def get_default_ssl_context(purpose: ssl.Purpose = ssl.Purpose.SERVER_AUTH) -> ssl.SSLContext:
+    """
+    Return the process wide default SSL context for the given purpose.
+
+    The context is created with :func:`ssl.create_default_context` on first use and cached, so the
+    system CA certificates only have to be loaded once. This is the context used by
+    :meth:`TLSStream.wrap` (and thus :func:`~anyio.connect_tcp`) when no explicit context is given.
+
+    .. warning:: The returned context is shared, so do not modify it. If you need different
+        settings, create a context of your own.
+
+    :param purpose: :attr:`ssl.Purpose.SERVER_AUTH` for a context that authenticates servers (used
+        on the client side), or :attr:`ssl.Purpose.CLIENT_AUTH` for the server side
+    :return: the cached context
+
+    .. versionadded:: 3.0
+
+    """
+    try:
+        return _default_contexts[purpose]
+    except KeyError:
+        with _default_contexts_lock:
+            if purpose not in _default_contexts:
+                _default_contexts[purpose] = ssl.create_default_context(purpose)
+
+            return _default_contexts[purpose]
+
+
+def clear_default_ssl_contexts() -> None:
+    """
+    Discard the cached default SSL contexts.
+
+    New contexts are created on the next use. Call this after the system CA certificates have been
+    changed, for example. Connections using the old contexts are not affected.
+
+    .. versionadded:: 3.0
+
+    """
+    with _default_contexts_lock:
+        _default_contexts.clear()
+
+
+@dataclass
+class TLSSessionCache:
+    """
+    Stores TLS sessions from client side connections so they can be resumed by later connections
+    to the same server.
+
+    Resuming a session skips the expensive parts of the handshake, like the key exchange and
+    certificate verification. Sessions are keyed by the host name and port of the server and the
+    SSL context used, as sessions can only be resumed with the context that created them.
+
+    The least recently used sessions are evicted once the cache holds ``max_size`` sessions.
+
+    :param max_size: maximum number of sessions to keep
+
+    .. versionadded:: 3.0
+    """
+
+    max_size: int = 256
+    _sessions: 'OrderedDict[Tuple[str, Optional[int], ssl.SSLContext], ssl.SSLSession]' = \
+        field(init=False, default_factory=OrderedDict)
+
+    def get(self, hostname: str, port: Optional[int],
+            context: ssl.SSLContext) -> Optional[ssl.SSLSession]:
+        """
+        Return the cached session for the given server, if any.
+
+        :param hostname: host name of the server
+        :param port: port of the server
+        :param context: the SSL context the session was created with
+        :return: the session, or ``None`` if no session has been cached
+
+        """
+        key = hostname, port, context
+        session = self._sessions.get(key)
+        if session is not None:
+            self._sessions.move_to_end(key)
+
+        return session
+
+    def put(self, hostname: str, port: Optional[int], context: ssl.SSLContext,
+            session: ssl.SSLSession) -> None:
+        """
+        Store a session for the given server, replacing any existing one.
+
+        :param hostname: host name of the server
+        :param port: port of the server
+        :param context: the SSL context the session was created with
+        :param session: the session to store
+
+        """
+        key = hostname, port, context
+        self._sessions[key] = session
+        self._sessions.move_to_end(key)
+        while len(self._sessions) > self.max_size:
+            self._sessions.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all sessions from the cache."""
+        self._sessions.clear()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
 @dataclass
 class TLSStream(ByteStream):
     """
@@ -54,11 +175,16 @@ class TLSStream(ByteStream):
     _ssl_object: ssl.SSLObject
     _read_bio: ssl.MemoryBIO
     _write_bio: ssl.MemoryBIO
+    _session_cache: Optional[TLSSessionCache] = None
+    _session_key: Optional[Tuple[str, Optional[int], ssl.SSLContext]] = None
 
     @classmethod
     async def wrap(cls, transport_stream: AnyByteStream, *, server_side: Optional[bool] = None,
                    hostname: Optional[str] = None, ssl_context: Optional[ssl.SSLContext] = None,
-                   standard_compatible: bool = True) -> 'TLSStream':
+                   standard_compatible: bool = True,
+                   session_cache: Optional[TLSSessionCache] = None,
+                   handshake_in_thread: bool = False, native: bool = False,
+                   thread_limiter: Optional[CapacityLimiter] = None) -> 'TLSStream':
         """
         Wrap an existing stream with Transport Layer Security.
 
@@ -70,34 +196,80 @@ class TLSStream(ByteStream):
             provided, ``False`` otherwise). Used only to create a default context when an explicit
             context has not been provided.
         :param hostname: host name of the peer (if host name checking is desired)
-        :param ssl_context: the SSLContext object to use (if not provided, a secure default will be
-            created)
+        :param ssl_context: the SSLContext object to use (if not provided, a secure default
+            context for the purpose is used; see :func:`get_default_ssl_context`)
         :param standard_compatible: if ``False``, skip the closing handshake when closing the
             connection, and don't raise an exception if the peer does the same
+        :param session_cache: if given, a cached session for the same host name, port and context
+            is resumed (client side only), and the session of this connection is stored in the
+            cache
+        :param handshake_in_thread: run the CPU intensive parts of the handshake in a worker
+            thread, so they don't hold up other tasks
+        :param native: hand the connection over to the event loop's own TLS implementation if
+            possible (requires ``standard_compatible=False``; see :ref:`NativeTLS`)
+        :param thread_limiter: capacity limiter for the worker threads used when
+            ``handshake_in_thread`` is ``True`` (the default thread limiter is used if omitted)
         :raises ~ssl.SSLError: if the TLS handshake fails
 
+        .. versionchanged:: 3.0
+           Added the ``session_cache``, ``handshake_in_thread``, ``native`` and
+           ``thread_limiter`` parameters.
+
         """
         if server_side is None:
             server_side = not hostname
 
         if not ssl_context:
             purpose = ssl.Purpose.CLIENT_AUTH if server_side else ssl.Purpose.SERVER_AUTH
-            ssl_context = ssl.create_default_context(purpose)
+            ssl_context = get_default_ssl_context(purpose)
+
+        if native:
+            if standard_compatible:
+                raise ValueError('native TLS requires standard_compatible=False')
+
+            if session_cache is None and not handshake_in_thread:
+                result = await get_asynclib().start_tls(transport_stream, ssl_context,
+                                                        server_side, hostname)
+                if result is not None:
+                    return _NativeTLSStream(*result)
+
+        session = session_key = None
+        if session_cache is not None and not server_side and hostname:
+            port = transport_stream.extra(SocketAttribute.remote_port, None)
+            session_key = hostname, port, ssl_context
+            session = session_cache.get(*session_key)
 
         bio_in = ssl.MemoryBIO()
         bio_out = ssl.MemoryBIO()
         ssl_object = ssl_context.wrap_bio(bio_in, bio_out, server_side=server_side,
-                                          server_hostname=hostname)
+                                          server_hostname=hostname, session=session)
         wrapper = cls(transport_stream=transport_stream,
                       standard_compatible=standard_compatible, _ssl_object=ssl_object,
-                      _read_bio=bio_in, _write_bio=bio_out)
-        await wrapper._call_sslobject_method(ssl_object.do_handshake)
+                      _read_bio=bio_in, _write_bio=bio_out, _session_cache=session_cache,
+                      _session_key=session_key)
+        await wrapper._call_sslobject_method(ssl_object.do_handshake,
+                                             in_thread=handshake_in_thread,
+                                             limiter=thread_limiter)
+        wrapper._store_session()
         return wrapper
 
-    async def _call_sslobject_method(self, func: Callable[..., T_Retval], *args) -> T_Retval:
+    def _store_session(self) -> None:
+        # With TLS 1.3, the session ticket arrives after the handshake, so this is called again
+        # when the stream is closed
+        if self._session_cache is not None and self._session_key is not None:
+            session = self._ssl_object.session
+            if session is not None:
+                self._session_cache.put(*self._session_key, session)
+
+    async def _call_sslobject_method(self, func: Callable[..., T_Retval], *args,
+                                     in_thread: bool = False,
+                                     limiter: Optional[CapacityLimiter] = None) -> T_Retval:
         while True:
             try:
-                result = func(*args)
+                if in_thread:
+                    result = await run_sync_in_worker_thread(func, *args, limiter=limiter)
+                else:
+                    result = func(*args)
             except ssl.SSLWantReadError:
                 try:
                     # Flush any pending writes first
@@ -137,6 +309,7 @@ class TLSStream(ByteStream):
         return self.transport_stream, self._read_bio.read()
 
     async def aclose(self) -> None:
+        self._store_session()
         if self.standard_compatible:
             try:
                 await self.unwrap()
@@ -151,10 +324,56 @@ class TLSStream(ByteStream):
         if not data:
             raise EndOfStream
 
+        # Each read only decrypts a single record, so drain any other complete records the
+        # transport stream has already delivered before waiting for more
+        if len(data) < max_bytes and (self._read_bio.pending or self._ssl_object.pending()):
+            chunks = [data]
+            received = len(data)
+            while received < max_bytes:
+                try:
+                    chunk = self._ssl_object.read(max_bytes - received)
+                except (ssl.SSLWantReadError, ssl.SSLWantWriteError):
+                    break
+                except (ssl.SSLEOFError, ssl.SSLSyscallError) as exc:
+                    raise BrokenResourceError from exc
+
+                if not chunk:
+                    # The closing handshake; let the next call report the end of the stream
+                    break
+
+                chunks.append(chunk)
+                received += len(chunk)
+
+            data = b''.join(chunks)
+
+            # Reading may have produced a response to a post-handshake message
+            if self._write_bio.pending:
+                await self.transport_stream.send(self._write_bio.read())
+
         return data
 
     async def send(self, item: bytes) -> None:
-        await self._call_sslobject_method(self._ssl_object.write, item)
+        if len(item) <= _TLS_RECORD_SIZE:
+            await self._call_sslobject_method(self._ssl_object.write, item)
+            return
+
+        # Encrypt large items one full sized record at a time, passing the encrypted data on to the
+        # transport stream in reasonably sized batches instead of all at once
+        with memoryview(item) as view:
+            for start in range(0, len(view), _TLS_RECORD_SIZE):
+                chunk = view[start:start + _TLS_RECORD_SIZE]
+                try:
+                    self._ssl_object.write(chunk)
+                except (ssl.SSLWantReadError, ssl.SSLWantWriteError):
+                    await self._call_sslobject_method(self._ssl_object.write, chunk)
+                except (ssl.SSLEOFError, ssl.SSLSyscallError) as exc:
+                    raise BrokenResourceError from exc
+                else:
+                    if self._write_bio.pending >= _TRANSPORT_WRITE_SIZE:
+                        await self.transport_stream.send(self._write_bio.read())
+
+        if self._write_bio.pending:
+            await self.transport_stream.send(self._write_bio.read())
 
     async def send_eof(self) -> None:
         tls_version = self.extra(TLSAttribute.tls_version)
@@ -184,6 +403,64 @@ class TLSStream(ByteStream):
         }
 
 
+@dataclass(frozen=True)
+class TLSListenerStatistics:
+    """
+    :ivar int handshakes_in_progress: number of TLS handshakes currently in progress
+    :ivar int handshakes_waiting: number of accepted connections waiting for their turn to start
+        the handshake (when the number of concurrent handshakes is limited)
+    :ivar int handshakes_completed: number of successfully completed handshakes
+    :ivar int handshakes_failed: number of handshakes that failed or timed out
+    :ivar float total_handshake_time: total time (in seconds) spent on completed handshakes
+    :ivar float max_handshake_time: the longest time (in seconds) a completed handshake took
+    """
+
+    handshakes_in_progress: int
+    handshakes_waiting: int
+    handshakes_completed: int
+    handshakes_failed: int
+    total_handshake_time: float
+    max_handshake_time: float
+
+
+class _NativeTLSStream(TLSStream):
+    """
+    A TLS stream where the encryption is done by the event loop's own TLS implementation.
+
+    The wrapped stream is the TLS upgraded stream provided by the backend, so all data is simply
+    passed through. As the backend does the encryption, there are no memory BIOs.
+    """
+
+    transport_stream: ByteStream
+
+    def __init__(self, transport_stream: ByteStream, ssl_object: ssl.SSLObject):
+        self.transport_stream = transport_stream
+        self.standard_compatible = False
+        self._ssl_object = ssl_object
+        self._session_cache = None
+        self._session_key = None
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(transport_stream={self.transport_stream!r})'
+
+    def __eq__(self, other: object) -> bool:
+        return self is other
+
+    __hash__ = object.__hash__
+
+    async def receive(self, max_bytes: int = 65536) -> bytes:
+        return await self.transport_stream.receive(max_bytes)
+
+    async def send(self, item: bytes) -> None:
+        await self.transport_stream.send(item)
+
+    async def unwrap(self) -> Tuple[AnyByteStream, bytes]:
+        raise NotImplementedError('unwrap() is not supported with native TLS')
+
+    async def aclose(self) -> None:
+        await self.transport_stream.aclose()
+
+
 @dataclass
 class TLSListener(Listener[TLSStream]):
     """
@@ -198,14 +475,41 @@ class TLSListener(Listener[TLSStream]):
     :param Listener listener: the listener to wrap
     :param ssl_context: the SSL context object
     :param standard_compatible: a flag passed through to :meth:`TLSStream.wrap`
-    :param handshake_timeout: time limit for the TLS handshake
-        (passed to :func:`~anyio.fail_after`)
+    :param handshake_timeout: time limit for the TLS handshake, including any time spent waiting
+        for a free handshake slot (passed to :func:`~anyio.fail_after`)
+    :param max_concurrent_handshakes: maximum number of TLS handshakes to run at the same time
+        (``None`` for no limit); connections accepted while at the limit wait for their turn
+    :param handshake_in_thread: a flag passed through to :meth:`TLSStream.wrap`; the worker
+        threads are limited by a capacity limiter of the listener's own (with
+        ``max_concurrent_handshakes`` tokens, or as many as there are CPUs if there is no limit)
+        so the handshakes can't starve other users of the default thread limiter
+    :param native: a flag passed through to :meth:`TLSStream.wrap`
+
+    .. versionchanged:: 3.0
+       Added the ``max_concurrent_handshakes``, ``handshake_in_thread`` and ``native`` parameters
+       and the :meth:`statistics` method.
     """
 
     listener: Listener
     ssl_context: ssl.SSLContext
     standard_compatible: bool = True
     handshake_timeout: float = 30
+    max_concurrent_handshakes: Optional[int] = None
+    handshake_in_thread: bool = False
+    native: bool = False
+    _handshake_limiter: Optional[CapacityLimiter] = field(init=False, default=None)
+    _thread_limiter: Optional[CapacityLimiter] = field(init=False, default=None)
+    _handshakes_in_progress: int = field(init=False, default=0)
+    _handshakes_completed: int = field(init=False, default=0)
+    _handshakes_failed: int = field(init=False, default=0)
+    _total_handshake_time: float = field(init=False, default=0)
+    _max_handshake_time: float = field(init=False, default=0)
+
+    def __post_init__(self):
+        if self.max_concurrent_handshakes is not None and self.max_concurrent_handshakes < 1:
+            raise ValueError('max_concurrent_handshakes must be at least 1')
+        if self.native and self.standard_compatible:
+            raise ValueError('native TLS requires standard_compatible=False')
 
     @staticmethod
     async def handle_handshake_error(exc: BaseException, stream: AnyByteStream) -> None:
@@ -237,19 +541,70 @@ class TLSListener(Listener[TLSStream]):
                     task_group: Optional[TaskGroup] = None) -> None:
         @wraps(handler)
         async def handler_wrapper(stream: AnyByteStream):
-            from .. import fail_after
             try:
-                with fail_after(self.handshake_timeout):
-                    wrapped_stream = await TLSStream.wrap(
-                        stream, ssl_context=self.ssl_context,
-                        standard_compatible=self.standard_compatible)
+                wrapped_stream = await self._handshake(stream)
             except BaseException as exc:
                 await self.handle_handshake_error(exc, stream)
             else:
                 await handler(wrapped_stream)
 
+        if self.max_concurrent_handshakes is not None and self._handshake_limiter is None:
+            self._handshake_limiter = create_capacity_limiter(self.max_concurrent_handshakes)
+
+        if self.handshake_in_thread and self._thread_limiter is None:
+            self._thread_limiter = create_capacity_limiter(
+                self.max_concurrent_handshakes or os.cpu_count() or 1)
+
         await self.listener.serve(handler_wrapper, task_group)
 
+    async def _handshake(self, stream: AnyByteStream) -> TLSStream:
+        from .. import fail_after
+        try:
+            # The time limit covers the wait for a free handshake slot too
+            with fail_after(self.handshake_timeout):
+                if self._handshake_limiter is not None:
+                    async with self._handshake_limiter:
+                        return await self._wrap(stream)
+                else:
+                    return await self._wrap(stream)
+        except BaseException:
+            self._handshakes_failed += 1
+            raise
+
+    async def _wrap(self, stream: AnyByteStream) -> TLSStream:
+        asynclib = get_asynclib()
+        start = asynclib.current_time()
+        self._handshakes_in_progress += 1
+        try:
+            wrapped_stream = await TLSStream.wrap(
+                stream, ssl_context=self.ssl_context,
+                standard_compatible=self.standard_compatible,
+                handshake_in_thread=self.handshake_in_thread, native=self.native,
+                thread_limiter=self._thread_limiter)
+        finally:
+            self._handshakes_in_progress -= 1
+
+        elapsed = asynclib.current_time() - start
+        self._handshakes_completed += 1
+        self._total_handshake_time += elapsed
+        self._max_handshake_time = max(self._max_handshake_time, elapsed)
+        return wrapped_stream
+
+    def statistics(self) -> TLSListenerStatistics:
+        """
+        Return statistics about the TLS handshakes done by this listener.
+
+        .. versionadded:: 3.0
+
+        """
+        waiting = 0
+        if self._handshake_limiter is not None:
+            waiting = self._handshake_limiter.statistics().tasks_waiting
+
+        return TLSListenerStatistics(
+            self._handshakes_in_progress, waiting, self._handshakes_completed,
+            self._handshakes_failed, self._total_handshake_time, self._max_handshake_time)
+
     async def aclose(self) -> None:
         await self.listener.aclose()
 
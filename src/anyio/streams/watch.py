@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Generic, Optional, TypeVar
+
+from .. import BrokenResourceError, ClosedResourceError, EndOfStream, WouldBlock
+from .._core._eventloop import get_asynclib
+from ..abc import ObjectReceiveStream, ObjectSendStream
+from ..lowlevel import checkpoint
+from .memory import MemoryObjectStreamStatistics
+
+T_Item = TypeVar('T_Item')
+
+
+@dataclass
+class WatchObjectStreamState(Generic[T_Item]):
+    """
+    Shared state of a watch memory object stream.
+
+    Only the most recently sent value is kept, along with a version number that is incremented on
+    every send. Version 0 means that nothing has been sent yet.
+    """
+
+    value: Optional[T_Item] = field(init=False, default=None)
+    version: int = field(init=False, default=0)
+    open_send_channels: int = field(init=False, default=0)
+    open_receive_channels: int = field(init=False, default=0)
+    waiting_receivers: 'OrderedDict[Any, None]' = field(init=False, default_factory=OrderedDict)
+
+    def wake_receivers(self) -> None:
+        receive_waiters = list(self.waiting_receivers)
+        self.waiting_receivers.clear()
+        for waiter in receive_waiters:
+            waiter.set()
+
+    def statistics(self) -> MemoryObjectStreamStatistics:
+        return MemoryObjectStreamStatistics(
+            min(self.version, 1), 1, self.open_send_channels, self.open_receive_channels, 0,
+            len(self.waiting_receivers))
+
+
+@dataclass(eq=False)
+class WatchObjectReceiveStream(Generic[T_Item], ObjectReceiveStream[T_Item]):
+    """
+    A receiver of a watch memory object stream.
+
+    Each receive returns the latest value, provided that it is newer than the one this receiver
+    last received. Intermediate values sent in the meantime are skipped.
+    """
+
+    _state: WatchObjectStreamState[T_Item]
+    _version: int = 0
+    _closed: bool = field(init=False, default=False)
+
+    def __post_init__(self):
+        self._state.open_receive_channels += 1
+
+    @property
+    def version(self) -> int:
+        """The version of the value this receiver last received (0 if none)."""
+        return self._version
+
+    def receive_nowait(self) -> T_Item:
+        """
+        Receive the latest value if it is newer than the one last received by this stream.
+
+        :return: the latest value
+        :raises ~anyio.ClosedResourceError: if this receive stream has been closed
+        :raises ~anyio.EndOfStream: if there is no new value and the stream has been closed from
+            the sending end
+        :raises ~anyio.WouldBlock: if there is no new value
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        if self._version < self._state.version:
+            self._version = self._state.version
+            return self._state.value  # type: ignore[return-value]
+        elif not self._state.open_send_channels:
+            raise EndOfStream
+
+        raise WouldBlock
+
+    async def receive(self) -> T_Item:
+        await checkpoint()
+        while True:
+            try:
+                return self.receive_nowait()
+            except WouldBlock:
+                receive_waiter = get_asynclib().Waiter()
+                self._state.waiting_receivers[receive_waiter] = None
+                try:
+                    await receive_waiter.wait()
+                finally:
+                    self._state.waiting_receivers.pop(receive_waiter, None)
+
+    def clone(self) -> 'WatchObjectReceiveStream':
+        """
+        Create a clone of this receive stream.
+
+        The clone considers the same version as already received as this stream does. Each clone
+        can be closed separately.
+
+        :return: the cloned stream
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        return WatchObjectReceiveStream(_state=self._state, _version=self._version)
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._state.open_receive_channels -= 1
+
+    def statistics(self) -> MemoryObjectStreamStatistics:
+        """Return statistics about the current state of this stream."""
+        return self._state.statistics()
+
+
+@dataclass(eq=False)
+class WatchObjectSendStream(Generic[T_Item], ObjectSendStream[T_Item]):
+    """
+    The sending end of a watch memory object stream.
+
+    Sending never blocks: the new value simply replaces the previous one.
+    """
+
+    _state: WatchObjectStreamState[T_Item]
+    _closed: bool = field(init=False, default=False)
+
+    def __post_init__(self):
+        self._state.open_send_channels += 1
+
+    @property
+    def version(self) -> int:
+        """The version of the latest value (0 if nothing has been sent yet)."""
+        return self._state.version
+
+    def send_nowait(self, item: T_Item) -> None:
+        """
+        Replace the latest value and wake up the receivers waiting for a new one.
+
+        :param item: the new value
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if the stream has been closed from the receiving end
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+        if not self._state.open_receive_channels:
+            raise BrokenResourceError
+
+        self._state.value = item
+        self._state.version += 1
+        if self._state.waiting_receivers:
+            self._state.wake_receivers()
+
+    async def send(self, item: T_Item) -> None:
+        await checkpoint()
+        self.send_nowait(item)
+
+    def clone(self) -> 'WatchObjectSendStream':
+        """
+        Create a clone of this send stream.
+
+        Each clone can be closed separately. Only when all clones have been closed will the
+        sending end of the stream be considered closed by the receivers.
+
+        :return: the cloned stream
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        return WatchObjectSendStream(_state=self._state)
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._state.open_send_channels -= 1
+            if self._state.open_send_channels == 0:
+                self._state.wake_receivers()
+
+    def statistics(self) -> MemoryObjectStreamStatistics:
+        """Return statistics about the current state of this stream."""
+        return self._state.statistics()
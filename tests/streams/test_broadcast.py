@@ -0,0 +1,148 @@
+import pytest
+
+from anyio import (
+    BrokenResourceError, ClosedResourceError, EndOfStream, WouldBlock,
+    create_broadcast_memory_object_stream, create_task_group, fail_after, wait_all_tasks_blocked)
+
+pytestmark = pytest.mark.anyio
+
+
+def test_invalid_max_buffer():
+    pytest.raises(ValueError, create_broadcast_memory_object_stream, 1.0).\
+        match('max_buffer_size must be either an integer or math.inf')
+
+
+def test_zero_max_buffer():
+    pytest.raises(ValueError, create_broadcast_memory_object_stream, 0).\
+        match('max_buffer_size must be at least 1')
+
+
+def test_invalid_policy():
+    pytest.raises(ValueError, create_broadcast_memory_object_stream, 1,
+                  slow_subscriber_policy='foo').match('slow_subscriber_policy must be one of')
+
+
+async def test_every_subscriber_gets_every_item():
+    send, receive1 = create_broadcast_memory_object_stream(10)
+    receive2 = receive1.clone()
+    for i in range(3):
+        send.send_nowait(i)
+
+    assert [receive1.receive_nowait() for _ in range(3)] == [0, 1, 2]
+    assert send.statistics().current_buffer_used == 3
+    assert [receive2.receive_nowait() for _ in range(3)] == [0, 1, 2]
+    assert send.statistics().current_buffer_used == 0
+    pytest.raises(WouldBlock, receive1.receive_nowait)
+
+
+async def test_clone_starts_from_same_position():
+    send, receive1 = create_broadcast_memory_object_stream(10)
+    send.send_nowait('a')
+    send.send_nowait('b')
+    assert receive1.receive_nowait() == 'a'
+    receive2 = receive1.clone()
+    assert receive2.receive_nowait() == 'b'
+    assert receive1.receive_nowait() == 'b'
+
+
+async def test_iterate():
+    async def receiver(receive_stream):
+        async with receive_stream:
+            async for item in receive_stream:
+                received_objects.append(item)
+
+    send, receive = create_broadcast_memory_object_stream(1)
+    received_objects = []
+    async with create_task_group() as tg:
+        for _ in range(3):
+            tg.spawn(receiver, receive.clone())
+
+        await receive.aclose()
+        await wait_all_tasks_blocked()
+        async with send:
+            for i in range(5):
+                await send.send(i)
+
+    assert sorted(received_objects) == [0] * 3 + [1] * 3 + [2] * 3 + [3] * 3 + [4] * 3
+
+
+async def test_block_policy():
+    send, receive1 = create_broadcast_memory_object_stream(2)
+    receive2 = receive1.clone()
+    send.send_nowait('a')
+    send.send_nowait('b')
+    pytest.raises(WouldBlock, send.send_nowait, 'c')
+    with fail_after(1):
+        async with create_task_group() as tg:
+            tg.spawn(send.send, 'c')
+            await wait_all_tasks_blocked()
+            assert send.statistics().tasks_waiting_send == 1
+
+            # Only the slowest subscriber matters
+            assert receive1.receive_nowait() == 'a'
+            assert receive1.receive_nowait() == 'b'
+            await wait_all_tasks_blocked()
+            assert send.statistics().tasks_waiting_send == 1
+            assert receive2.receive_nowait() == 'a'
+
+    assert receive1.receive_nowait() == 'c'
+    assert [receive2.receive_nowait() for _ in range(2)] == ['b', 'c']
+
+
+async def test_drop_policy():
+    send, receive1 = create_broadcast_memory_object_stream(2, slow_subscriber_policy='drop')
+    receive2 = receive1.clone()
+    for i in range(3):
+        send.send_nowait(i)
+        assert receive1.receive_nowait() == i
+
+    send.send_nowait(3)
+    assert send.statistics().current_buffer_used == 2
+    assert receive2.receive_nowait() == 2
+    assert receive2.receive_nowait() == 3
+    assert receive1.receive_nowait() == 3
+
+
+async def test_disconnect_policy():
+    send, receive1 = create_broadcast_memory_object_stream(
+        2, slow_subscriber_policy='disconnect')
+    receive2 = receive1.clone()
+    for i in range(3):
+        send.send_nowait(i)
+        assert receive1.receive_nowait() == i
+
+    assert send.statistics().open_receive_streams == 1
+    pytest.raises(BrokenResourceError, receive2.receive_nowait)
+    await receive2.aclose()
+    assert send.statistics().open_receive_streams == 1
+    await receive1.aclose()
+    pytest.raises(BrokenResourceError, send.send_nowait, 3)
+
+
+async def test_close_send_while_receiving():
+    send, receive = create_broadcast_memory_object_stream(1)
+    with pytest.raises(EndOfStream):
+        async with create_task_group() as tg:
+            tg.spawn(receive.receive)
+            await wait_all_tasks_blocked()
+            await send.aclose()
+
+
+async def test_close_receive_while_sending():
+    send, receive = create_broadcast_memory_object_stream(1)
+    send.send_nowait('hello')
+    with pytest.raises(BrokenResourceError):
+        async with create_task_group() as tg:
+            tg.spawn(send.send, 'world')
+            await wait_all_tasks_blocked()
+            await receive.aclose()
+
+
+async def test_closed():
+    send, receive = create_broadcast_memory_object_stream(1)
+    await send.aclose()
+    await receive.aclose()
+    pytest.raises(ClosedResourceError, send.clone)
+    pytest.raises(ClosedResourceError, receive.clone)
+    pytest.raises(ClosedResourceError, send.send_nowait, None)
+    pytest.raises(ClosedResourceError, receive.receive_nowait)
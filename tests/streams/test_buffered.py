@@ -1,7 +1,9 @@
 import pytest
 
-from anyio import IncompleteRead, create_memory_object_stream
-from anyio.streams.buffered import BufferedByteReceiveStream
+from anyio import (
+    BrokenResourceError, ClosedResourceError, DelimiterNotFound, EndOfStream, IncompleteRead,
+    WouldBlock, create_memory_object_stream, create_task_group, fail_after, move_on_after, sleep)
+from anyio.streams.buffered import BufferedByteReceiveStream, BufferedByteSendStream
 
 pytestmark = pytest.mark.anyio
 
@@ -49,3 +51,157 @@ async def test_receive_until_incomplete():
         assert await buffered_stream.receive_until(b'de', 10)
 
     assert buffered_stream.buffer == b'abcd'
+
+
+async def test_receive_many_small_frames():
+    send_stream, receive_stream = create_memory_object_stream(1)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    frames = [b'%05d' % i for i in range(1000)]
+    await send_stream.send(b''.join(frames))
+    for i, frame in enumerate(frames):
+        assert await buffered_stream.receive_exactly(5) == frame
+        assert buffered_stream.buffer == b''.join(frames[i + 1:])
+
+
+async def test_mixed_receive_calls():
+    send_stream, receive_stream = create_memory_object_stream(2)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    await send_stream.send(b'abc\ndefgh\nij')
+    await send_stream.send(b'kl\nmn')
+    assert await buffered_stream.receive(2) == b'ab'
+    assert await buffered_stream.receive_until(b'\n', 10) == b'c'
+    assert await buffered_stream.receive_exactly(3) == b'def'
+    assert await buffered_stream.receive_until(b'\n', 10) == b'gh'
+    assert await buffered_stream.receive_until(b'\n', 10) == b'ijkl'
+    assert await buffered_stream.receive() == b'mn'
+
+
+async def test_receive_into():
+    send_stream, receive_stream = create_memory_object_stream(2)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    await send_stream.send(b'abcdef')
+    await send_stream.send(b'ghi')
+    assert await buffered_stream.receive_until(b'b', 10) == b'a'
+    buffer = bytearray(3)
+    assert await buffered_stream.receive_into(memoryview(buffer)) == 3
+    assert buffer == b'cde'
+    assert await buffered_stream.receive_into(memoryview(buffer)) == 1
+    assert buffer == b'fde'
+    assert await buffered_stream.receive_into(memoryview(buffer)[:2]) == 2
+    assert buffer == b'ghe'
+    assert buffered_stream.buffer == b'i'
+
+
+async def test_receive_until_any():
+    send_stream, receive_stream = create_memory_object_stream(2)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    await send_stream.send(b'ab\r')
+    await send_stream.send(b'\ncd\nef;gh')
+    delimiters = [b'\n', b'\r\n', b';']
+    assert await buffered_stream.receive_until_any(delimiters, 10) == (b'ab', b'\r\n')
+    assert await buffered_stream.receive_until_any(delimiters, 10) == (b'cd', b'\n')
+    assert await buffered_stream.receive_until_any(delimiters, 10) == (b'ef', b';')
+    assert buffered_stream.buffer == b'gh'
+
+
+async def test_receive_until_any_limit():
+    send_stream, receive_stream = create_memory_object_stream(2)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    await send_stream.send(b'abcdef')
+    with pytest.raises(DelimiterNotFound):
+        await buffered_stream.receive_until_any([b'x', b'y'], 5)
+
+    with pytest.raises(ValueError):
+        await buffered_stream.receive_until_any([b'x', b''], 5)
+
+
+async def test_receive_until_resume_after_cancel():
+    send_stream, receive_stream = create_memory_object_stream(2)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    await send_stream.send(b'abc')
+    with move_on_after(0.1):
+        await buffered_stream.receive_until(b'\n', 10)
+
+    await send_stream.send(b'de\nf')
+    assert await buffered_stream.receive_until(b'\n', 10) == b'abcde'
+    assert buffered_stream.buffer == b'f'
+
+
+async def test_lines():
+    send_stream, receive_stream = create_memory_object_stream(3)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    await send_stream.send(b'foo\nbar')
+    await send_stream.send(b'\n\nbaz\nx')
+    await send_stream.send(b'yz')
+    await send_stream.aclose()
+    assert [line async for line in buffered_stream.lines()] == [b'foo', b'bar', b'', b'baz',
+                                                                b'xyz']
+
+
+class TestBufferedByteSendStream:
+    async def test_coalesce(self):
+        send_stream, receive_stream = create_memory_object_stream(10)
+        buffered_stream = BufferedByteSendStream(send_stream, max_buffer_size=10)
+        await buffered_stream.send(b'abc')
+        await buffered_stream.send(b'def')
+        assert buffered_stream.buffer == b'abcdef'
+        pytest.raises(WouldBlock, receive_stream.receive_nowait)
+        await buffered_stream.send(b'ghij')
+        assert receive_stream.receive_nowait() == b'abcdefghij'
+        assert buffered_stream.buffer == b''
+
+    async def test_large_item(self):
+        send_stream, receive_stream = create_memory_object_stream(10)
+        buffered_stream = BufferedByteSendStream(send_stream, max_buffer_size=4)
+        await buffered_stream.send(b'abcdef')
+        assert receive_stream.receive_nowait() == b'abcdef'
+
+    async def test_flush(self):
+        send_stream, receive_stream = create_memory_object_stream(10)
+        buffered_stream = BufferedByteSendStream(send_stream)
+        await buffered_stream.send(b'abc')
+        await buffered_stream.flush()
+        await buffered_stream.flush()
+        assert receive_stream.receive_nowait() == b'abc'
+        pytest.raises(WouldBlock, receive_stream.receive_nowait)
+
+    async def test_flush_on_close(self):
+        send_stream, receive_stream = create_memory_object_stream(10)
+        async with BufferedByteSendStream(send_stream) as buffered_stream:
+            await buffered_stream.send(b'abc')
+
+        assert receive_stream.receive_nowait() == b'abc'
+        pytest.raises(EndOfStream, receive_stream.receive_nowait)
+        with pytest.raises(ClosedResourceError):
+            await buffered_stream.send(b'abc')
+
+    async def test_flush_delay(self):
+        send_stream, receive_stream = create_memory_object_stream(10)
+        async with create_task_group() as tg:
+            buffered_stream = BufferedByteSendStream(send_stream, flush_delay=0.1,
+                                                     task_group=tg)
+            await buffered_stream.send(b'abc')
+            await buffered_stream.send(b'def')
+            with fail_after(1):
+                assert await receive_stream.receive() == b'abcdef'
+
+            await buffered_stream.send(b'ghi')
+            await buffered_stream.flush()
+            assert receive_stream.receive_nowait() == b'ghi'
+            await buffered_stream.aclose()
+
+    async def test_flush_delay_error(self):
+        send_stream, receive_stream = create_memory_object_stream(10)
+        async with create_task_group() as tg:
+            buffered_stream = BufferedByteSendStream(send_stream, flush_delay=0.1,
+                                                     task_group=tg)
+            await buffered_stream.send(b'abc')
+            await receive_stream.aclose()
+            await sleep(0.2)
+            with pytest.raises(BrokenResourceError):
+                await buffered_stream.send(b'def')
+
+    def test_flush_delay_without_task_group(self):
+        send_stream, receive_stream = create_memory_object_stream(10)
+        pytest.raises(ValueError, BufferedByteSendStream, send_stream, flush_delay=1).\
+            match('task_group is required')
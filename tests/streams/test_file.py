@@ -32,6 +32,16 @@ class TestFileReadStream:
             async with FileReadStream(file) as stream:
                 await self._run_filestream_test(stream)
 
+    async def test_receive_into(self, file_path):
+        buffer = bytearray(4)
+        async with await FileReadStream.from_path(file_path) as stream:
+            assert await stream.receive_into(memoryview(buffer)) == 4
+            assert buffer == b'Hell'
+            assert await stream.receive_into(memoryview(buffer)) == 1
+            assert buffer == b'oell'
+            with pytest.raises(EndOfStream):
+                await stream.receive_into(memoryview(buffer))
+
     async def test_read_after_close(self, file_path):
         async with await FileReadStream.from_path(file_path) as stream:
             pass
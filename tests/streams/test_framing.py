@@ -0,0 +1,128 @@
+import pytest
+
+from anyio import (
+    BrokenResourceError, EndOfStream, IncompleteRead, create_memory_object_stream, move_on_after)
+from anyio.streams.framing import (
+    Codec, FramedObjectReceiveStream, FramedObjectSendStream, FramedObjectStream, json_codec,
+    pickle_codec)
+from anyio.streams.stapled import StapledObjectStream
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize('length_prefix', ['!I', '<H', 'varint'])
+@pytest.mark.parametrize('codec, item', [
+    pytest.param(None, b'hello', id='raw'),
+    pytest.param(pickle_codec, {'a': (1, 2)}, id='pickle'),
+    pytest.param(json_codec, {'a': [1, 2]}, id='json'),
+    pytest.param(Codec(lambda s: s.encode('ascii'), lambda b: b.decode('ascii')), 'hi',
+                 id='callable')
+])
+async def test_send_receive(length_prefix, codec, item):
+    kwargs = {'length_prefix': length_prefix}
+    if codec is not None:
+        kwargs['codec'] = codec
+
+    send_stream, receive_stream = create_memory_object_stream(10)
+    framed_send = FramedObjectSendStream(send_stream, **kwargs)
+    framed_receive = FramedObjectReceiveStream(receive_stream, **kwargs)
+    await framed_send.send(item)
+    await framed_send.send(item)
+    await framed_send.aclose()
+    assert await framed_receive.receive() == item
+    assert await framed_receive.receive() == item
+    with pytest.raises(EndOfStream):
+        await framed_receive.receive()
+
+
+async def test_split_and_merged_frames():
+    send_stream, receive_stream = create_memory_object_stream(10)
+    framed_receive = FramedObjectReceiveStream(receive_stream)
+    await send_stream.send(b'\x00\x00')
+    await send_stream.send(b'\x00\x03abc\x00\x00\x00\x02de')
+    assert await framed_receive.receive() == b'abc'
+    assert await framed_receive.receive() == b'de'
+
+
+async def test_large_varint():
+    send_stream, receive_stream = create_memory_object_stream(10)
+    framed_send = FramedObjectSendStream(send_stream, length_prefix='varint')
+    framed_receive = FramedObjectReceiveStream(receive_stream, length_prefix='varint')
+    item = b'x' * 300
+    await framed_send.send(item)
+    assert receive_stream.statistics().current_buffer_used == 1
+    assert await framed_receive.receive() == item
+
+
+async def test_large_message():
+    send_stream, receive_stream = create_memory_object_stream(10)
+    framed_send = FramedObjectSendStream(send_stream)
+    framed_receive = FramedObjectReceiveStream(receive_stream)
+    item = b'x' * 100000
+    await framed_send.send(item)
+    assert receive_stream.statistics().current_buffer_used == 2
+    assert await framed_receive.receive() == item
+
+
+@pytest.mark.parametrize('length_prefix, chunks', [
+    pytest.param('!I', [b'\x00\x00', b'\x01\x2c', b'x' * 100, b'x' * 200], id='struct'),
+    pytest.param('varint', [b'\xac', b'\x02', b'x' * 100, b'x' * 200], id='varint')
+])
+async def test_cancel_during_receive(length_prefix, chunks):
+    send_stream, receive_stream = create_memory_object_stream(10)
+    framed_receive = FramedObjectReceiveStream(receive_stream, length_prefix=length_prefix)
+    for chunk in chunks:
+        await send_stream.send(chunk)
+        if chunk is not chunks[-1]:
+            with move_on_after(0.01):
+                await framed_receive.receive()
+                pytest.fail('The message should not have been received yet')
+
+    await send_stream.send(b'\x00\x00\x00\x02ab' if length_prefix == '!I' else b'\x02ab')
+    assert await framed_receive.receive() == b'x' * 300
+    assert await framed_receive.receive() == b'ab'
+
+
+async def test_incomplete_message():
+    send_stream, receive_stream = create_memory_object_stream(10)
+    framed_receive = FramedObjectReceiveStream(receive_stream)
+    await send_stream.send(b'\x00\x00\x00\x05abc')
+    await send_stream.aclose()
+    with pytest.raises(IncompleteRead):
+        await framed_receive.receive()
+
+
+async def test_incomplete_varint():
+    send_stream, receive_stream = create_memory_object_stream(10)
+    framed_receive = FramedObjectReceiveStream(receive_stream, length_prefix='varint')
+    await send_stream.send(b'\x80')
+    await send_stream.aclose()
+    with pytest.raises(IncompleteRead):
+        await framed_receive.receive()
+
+
+async def test_max_message_size():
+    send_stream, receive_stream = create_memory_object_stream(10)
+    framed_send = FramedObjectSendStream(send_stream, max_message_size=4)
+    framed_receive = FramedObjectReceiveStream(receive_stream, max_message_size=4)
+    with pytest.raises(ValueError):
+        await framed_send.send(b'abcde')
+
+    await send_stream.send(b'\x00\x00\x00\x05abcde')
+    with pytest.raises(BrokenResourceError):
+        await framed_receive.receive()
+
+
+@pytest.mark.parametrize('length_prefix', ['foo', '!d', '!f', '!?', '!i', '!II'])
+def test_invalid_length_prefix(length_prefix):
+    send_stream, receive_stream = create_memory_object_stream(10)
+    pytest.raises(ValueError, FramedObjectSendStream, send_stream, length_prefix=length_prefix).\
+        match('length_prefix must be either')
+
+
+async def test_bidirectional():
+    send_stream, receive_stream = create_memory_object_stream(10)
+    framed_stream = FramedObjectStream(StapledObjectStream(send_stream, receive_stream),
+                                       codec=json_codec)
+    await framed_stream.send([1, 'a'])
+    assert await framed_stream.receive() == [1, 'a']
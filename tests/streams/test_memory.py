@@ -1,8 +1,11 @@
+import math
+
 import pytest
 
 from anyio import (
     BrokenResourceError, ClosedResourceError, EndOfStream, WouldBlock, create_memory_object_stream,
-    create_task_group, fail_after, open_cancel_scope, wait_all_tasks_blocked)
+    create_priority_memory_object_stream, create_task_group, fail_after, open_cancel_scope, run,
+    run_sync_in_worker_thread, sleep, wait_all_tasks_blocked)
 
 pytestmark = pytest.mark.anyio
 
@@ -313,3 +316,413 @@ async def test_statistics():
         assert stream.statistics().current_buffer_used == 0
         assert stream.statistics().tasks_waiting_send == 0
         assert stream.statistics().tasks_waiting_receive == 0
+
+
+async def test_cumulative_statistics():
+    send, receive = create_memory_object_stream(2)
+    send.send_nowait(1)
+    send.send_nowait(2)
+    assert receive.receive_nowait() == 1
+    statistics = send.statistics()
+    assert statistics.items_sent == 2
+    assert statistics.items_received == 1
+    assert statistics.max_buffer_used == 2
+    assert statistics.total_send_blocked_time == 0
+    assert statistics.total_receive_wait_time == 0
+
+    async def delayed_receive():
+        await sleep(0.1)
+        receive.receive_nowait()
+
+    send.send_nowait(3)
+    async with create_task_group() as tg:
+        tg.spawn(delayed_receive)
+        await send.send(4)
+
+    statistics = send.statistics()
+    assert statistics.items_sent == 4
+    assert statistics.items_received == 2
+    assert statistics.max_buffer_used == 2
+    assert statistics.total_send_blocked_time >= 0.09
+    assert statistics.max_send_blocked_time == statistics.total_send_blocked_time
+
+    receive.receive_many_nowait(2)
+    async with create_task_group() as tg:
+        tg.spawn(receive.receive)
+        await sleep(0.1)
+        await send.send(5)
+
+    statistics = send.statistics()
+    assert statistics.items_sent == 5
+    assert statistics.items_received == 5
+    assert statistics.total_receive_wait_time >= 0.09
+
+
+async def test_send_many_receive_many_nowait():
+    send, receive = create_memory_object_stream(5)
+    send.send_many_nowait(['a', 'b', 'c'])
+    assert receive.receive_many_nowait(2) == ['a', 'b']
+    assert receive.receive_many_nowait(5) == ['c']
+    with pytest.raises(WouldBlock):
+        receive.receive_many_nowait(5)
+
+
+async def test_send_many_nowait_all_or_nothing():
+    send, receive = create_memory_object_stream(2)
+    send.send_nowait('a')
+    with pytest.raises(WouldBlock):
+        send.send_many_nowait(['b', 'c'])
+
+    assert receive.statistics().current_buffer_used == 1
+
+
+async def test_send_many_nowait_to_waiting_receivers():
+    async def receiver():
+        received_objects.append(await receive.receive())
+
+    send, receive = create_memory_object_stream(1)
+    received_objects = []
+    async with create_task_group() as tg:
+        tg.spawn(receiver)
+        tg.spawn(receiver)
+        await wait_all_tasks_blocked()
+        send.send_many_nowait(['a', 'b', 'c'])
+
+    assert sorted(received_objects) == ['a', 'b']
+    assert receive.receive_nowait() == 'c'
+
+
+async def test_send_many_blocks():
+    send, receive = create_memory_object_stream(2)
+    async with create_task_group() as tg:
+        tg.spawn(send.send_many, range(5))
+        await wait_all_tasks_blocked()
+        assert receive.statistics().current_buffer_used == 2
+        assert receive.statistics().tasks_waiting_send == 1
+        assert receive.receive_many_nowait(10) == [0, 1, 2]
+        await wait_all_tasks_blocked()
+        assert await receive.receive_many(10) == [3, 4]
+
+
+async def test_receive_many_waits():
+    send, receive = create_memory_object_stream(5)
+    received_objects = []
+    async with create_task_group() as tg:
+        async def receiver():
+            received_objects.append(await receive.receive_many(5))
+
+        tg.spawn(receiver)
+        await wait_all_tasks_blocked()
+        send.send_nowait('a')
+
+    assert received_objects == [['a']]
+
+
+async def test_receive_many_send_closed():
+    send, receive = create_memory_object_stream(5)
+    await send.send_many(['a', 'b'])
+    await send.aclose()
+    assert await receive.receive_many(5) == ['a', 'b']
+    with pytest.raises(EndOfStream):
+        await receive.receive_many(5)
+
+
+async def test_send_many_receive_closed():
+    send, receive = create_memory_object_stream(1)
+    await receive.aclose()
+    with pytest.raises(BrokenResourceError):
+        await send.send_many(['a'])
+
+    with pytest.raises(BrokenResourceError):
+        send.send_many_nowait(['a'])
+
+
+def test_receive_many_invalid_max_items():
+    send, receive = create_memory_object_stream(1)
+    pytest.raises(ValueError, receive.receive_many_nowait, 0).\
+        match('max_items must be at least 1')
+
+
+async def test_priority_order():
+    send, receive = create_priority_memory_object_stream(5, priority=lambda item: item[0])
+    send.send_many_nowait([(2, 'a'), (1, 'b'), (3, 'c'), (1, 'd')])
+    assert receive.receive_many_nowait(5) == [(1, 'b'), (1, 'd'), (2, 'a'), (3, 'c')]
+
+
+async def test_priority_blocked_sender():
+    send, receive = create_priority_memory_object_stream(2, priority=lambda item: item)
+    send.send_nowait(5)
+    send.send_nowait(3)
+    with fail_after(1):
+        async with create_task_group() as tg:
+            tg.spawn(send.send, 1)
+            await wait_all_tasks_blocked()
+            assert receive.statistics().tasks_waiting_send == 1
+            assert receive.receive_nowait() == 1
+
+    assert receive.receive_nowait() == 3
+    assert receive.receive_nowait() == 5
+
+
+async def test_priority_clone_close():
+    send1, receive1 = create_priority_memory_object_stream(2, priority=lambda item: item)
+    send2 = send1.clone()
+    await send1.aclose()
+    send2.send_nowait(2)
+    send2.send_nowait(1)
+    await send2.aclose()
+    assert await receive1.receive() == 1
+    assert await receive1.receive() == 2
+    with pytest.raises(EndOfStream):
+        await receive1.receive()
+
+
+async def test_priority_drop_oldest():
+    send, receive = create_priority_memory_object_stream(3, priority=lambda item: item[0],
+                                                         overflow_policy='drop_oldest')
+    send.send_many_nowait([(2, 'a'), (5, 'b'), (1, 'c')])
+    send.send_nowait((3, 'd'))  # evicts (5, 'b')
+    send.send_nowait((3, 'e'))  # would be delivered last, so it is discarded itself
+    send.send_nowait((0, 'f'))  # evicts (3, 'd')
+    assert receive.receive_many_nowait(5) == [(0, 'f'), (1, 'c'), (2, 'a')]
+    assert receive.statistics().items_dropped == 3
+
+
+def test_priority_invalid_overflow_policy():
+    pytest.raises(ValueError, create_priority_memory_object_stream, 1, priority=lambda item: item,
+                  overflow_policy='foo').match('overflow_policy must be one of')
+
+
+def test_negative_max_buffer_bytes():
+    pytest.raises(ValueError, create_memory_object_stream, 1, max_buffer_bytes=-1).\
+        match('max_buffer_bytes cannot be negative')
+
+
+async def test_max_buffer_bytes():
+    send, receive = create_memory_object_stream(math.inf, max_buffer_bytes=10)
+    send.send_nowait(b'12345')
+    send.send_nowait(b'1234')
+    pytest.raises(WouldBlock, send.send_nowait, b'12')
+    send.send_nowait(b'1')
+    statistics = send.statistics()
+    assert statistics.current_buffer_used == 3
+    assert statistics.current_buffer_bytes == 10
+    assert statistics.max_buffer_bytes == 10
+
+    assert receive.receive_nowait() == b'12345'
+    assert receive.statistics().current_buffer_bytes == 5
+
+
+async def test_max_buffer_bytes_oversized_item():
+    send, receive = create_memory_object_stream(math.inf, max_buffer_bytes=10)
+    send.send_nowait(b'x' * 20)
+    pytest.raises(WouldBlock, send.send_nowait, b'x')
+    assert receive.receive_nowait() == b'x' * 20
+    assert receive.statistics().current_buffer_bytes == 0
+
+
+async def test_max_buffer_bytes_blocked_senders():
+    send, receive = create_memory_object_stream(math.inf, item_size=lambda item: item[1],
+                                                max_buffer_bytes=10)
+    send.send_nowait(('a', 8))
+    with fail_after(1):
+        async with create_task_group() as tg:
+            tg.spawn(send.send, ('b', 4))
+            await wait_all_tasks_blocked()
+            tg.spawn(send.send, ('c', 4))
+            await wait_all_tasks_blocked()
+            assert receive.statistics().tasks_waiting_send == 2
+
+            # Both blocked senders fit in the buffer once the first item is gone
+            assert receive.receive_nowait() == ('a', 8)
+            assert receive.statistics().tasks_waiting_send == 0
+            assert receive.statistics().current_buffer_bytes == 8
+
+    assert receive.receive_many_nowait(5) == [('b', 4), ('c', 4)]
+
+
+async def test_max_buffer_bytes_send_many_nowait():
+    send, receive = create_memory_object_stream(math.inf, max_buffer_bytes=10)
+    send.send_many_nowait([b'12345', b'12345'])
+    pytest.raises(WouldBlock, send.send_many_nowait, [b'1'])
+    assert receive.receive_many_nowait(5) == [b'12345', b'12345']
+    pytest.raises(WouldBlock, send.send_many_nowait, [b'12345', b'123456'])
+    assert receive.statistics().current_buffer_used == 0
+
+
+async def test_send_from_thread():
+    def send_items():
+        for i in range(3):
+            send.send_from_thread(i)
+
+    send, receive = create_memory_object_stream(1)
+    received_objects = []
+    async with create_task_group() as tg:
+        tg.spawn(run_sync_in_worker_thread, send_items)
+        for _ in range(3):
+            received_objects.append(await receive.receive())
+
+    assert received_objects == [0, 1, 2]
+
+
+async def test_receive_from_thread():
+    def receive_items():
+        return [item for item in iter(receive.receive_from_thread, 'anyio')]
+
+    send, receive = create_memory_object_stream()
+    async with create_task_group() as tg:
+        tg.spawn(send.send_many, ['hello', 'world', 'anyio'])
+        received_objects = await run_sync_in_worker_thread(receive_items)
+
+    assert received_objects == ['hello', 'world']
+
+
+async def test_receive_from_thread_end_of_stream():
+    send, receive = create_memory_object_stream()
+    async with create_task_group() as tg:
+        tg.spawn(run_sync_in_worker_thread, send.send_from_thread, 'hello')
+        assert await run_sync_in_worker_thread(receive.receive_from_thread) == 'hello'
+        await send.aclose()
+
+    with pytest.raises(EndOfStream):
+        await run_sync_in_worker_thread(receive.receive_from_thread)
+
+
+async def test_send_from_thread_receive_closed():
+    send, receive = create_memory_object_stream()
+    with pytest.raises(BrokenResourceError):
+        async with create_task_group() as tg:
+            tg.spawn(run_sync_in_worker_thread, send.send_from_thread, 'hello')
+            while not receive.statistics().tasks_waiting_send:
+                await sleep(0.01)
+
+            await receive.aclose()
+
+    with pytest.raises(BrokenResourceError):
+        await run_sync_in_worker_thread(send.send_from_thread, 'hello')
+
+
+async def test_from_thread_statistics():
+    send, receive = create_memory_object_stream()
+    async with create_task_group() as tg:
+        tg.spawn(run_sync_in_worker_thread, send.send_from_thread, 'hello')
+        while not receive.statistics().tasks_waiting_send:
+            await sleep(0.01)
+
+        await sleep(0.1)
+        assert await receive.receive() == 'hello'
+
+    statistics = receive.statistics()
+    assert statistics.total_send_blocked_time >= 0.1
+    assert statistics.max_send_blocked_time == statistics.total_send_blocked_time
+
+    async with create_task_group() as tg:
+        tg.spawn(run_sync_in_worker_thread, receive.receive_from_thread)
+        while not receive.statistics().tasks_waiting_receive:
+            await sleep(0.01)
+
+        await sleep(0.1)
+        await send.send('hello')
+
+    assert receive.statistics().total_receive_wait_time >= 0.1
+
+
+def test_from_thread_multiple_event_loops(anyio_backend_name, anyio_backend_options):
+    async def send_item(item):
+        await run_sync_in_worker_thread(send.send_from_thread, item)
+
+    send, receive = create_memory_object_stream(2)
+    for item in ('hello', 'world'):
+        run(send_item, item, backend=anyio_backend_name, backend_options=anyio_backend_options)
+
+    assert receive.receive_many_nowait(2) == ['hello', 'world']
+
+
+def test_send_from_thread_no_event_loop():
+    send, receive = create_memory_object_stream()
+    pytest.raises(RuntimeError, send.send_from_thread, 'hello').\
+        match('This function can only be run from an AnyIO worker thread')
+
+
+async def test_batched_full_batches():
+    send, receive = create_memory_object_stream(10)
+    for i in range(5):
+        send.send_nowait(i)
+
+    await send.aclose()
+    batches = [batch async for batch in receive.batched(2, 10)]
+    assert batches == [[0, 1], [2, 3], [4]]
+
+
+async def test_batched_delay():
+    async def sender():
+        send.send_nowait(1)
+        send.send_nowait(2)
+        await sleep(0.5)
+        send.send_nowait(3)
+        await send.aclose()
+
+    send, receive = create_memory_object_stream(10)
+    async with create_task_group() as tg:
+        tg.spawn(sender)
+        with fail_after(2):
+            batches = [batch async for batch in receive.batched(10, 0.1)]
+
+    assert batches == [[1, 2], [3]]
+
+
+async def test_batched_invalid_max_items():
+    send, receive = create_memory_object_stream()
+    with pytest.raises(ValueError):
+        await receive.batched(0, 1).__anext__()
+
+
+def test_invalid_overflow_policy():
+    pytest.raises(ValueError, create_memory_object_stream, 1, overflow_policy='foo').\
+        match('overflow_policy must be one of')
+
+
+async def test_overflow_drop_newest():
+    send, receive = create_memory_object_stream(2, overflow_policy='drop_newest')
+    for i in range(4):
+        await send.send(i)
+
+    send.send_many_nowait([4, 5])
+    assert receive.receive_many_nowait(5) == [0, 1]
+    statistics = receive.statistics()
+    assert statistics.items_dropped == 4
+    assert statistics.items_sent == 2
+
+
+async def test_overflow_drop_oldest():
+    send, receive = create_memory_object_stream(2, overflow_policy='drop_oldest')
+    for i in range(4):
+        await send.send(i)
+
+    assert receive.receive_many_nowait(5) == [2, 3]
+    assert receive.statistics().items_dropped == 2
+
+
+async def test_overflow_drop_oldest_bytes():
+    send, receive = create_memory_object_stream(math.inf, max_buffer_bytes=6,
+                                                overflow_policy='drop_oldest')
+    send.send_nowait(b'aa')
+    send.send_nowait(b'bb')
+    send.send_nowait(b'ccc')
+    send.send_nowait(b'ddddd')
+    assert receive.receive_many_nowait(5) == [b'ddddd']
+    statistics = receive.statistics()
+    assert statistics.items_dropped == 3
+    assert statistics.current_buffer_bytes == 0
+
+
+async def test_overflow_no_buffer():
+    send, receive = create_memory_object_stream(0, overflow_policy='drop_oldest')
+    send.send_nowait('dropped')
+    async with create_task_group() as tg:
+        tg.spawn(receive.receive)
+        await wait_all_tasks_blocked()
+        send.send_nowait('received')
+
+    assert receive.statistics().items_dropped == 1
+    assert receive.statistics().items_received == 1
@@ -0,0 +1,177 @@
+import platform
+import sys
+
+import pytest
+
+from anyio import (
+    BrokenResourceError, BusyResourceError, ClosedResourceError, EndOfStream, create_task_group,
+    fail_after, run_process, wait_all_tasks_blocked)
+
+if sys.version_info >= (3, 8) and sys.platform != 'win32':
+    from anyio.streams.shared_memory import (
+        SharedMemoryObjectReceiveStream, SharedMemoryObjectSendStream)
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(sys.version_info < (3, 8), reason='requires Python 3.8+'),
+    pytest.mark.skipif(sys.platform == 'win32', reason='UNIX only'),
+    pytest.mark.skipif(platform.machine().lower() not in ('x86_64', 'amd64', 'i686'),
+                       reason='x86 only')
+]
+
+
+@pytest.fixture
+async def streams():
+    receive = SharedMemoryObjectReceiveStream.create(32)
+    send = SharedMemoryObjectSendStream.attach(receive.name)
+    yield send, receive
+    await send.aclose()
+    await receive.aclose()
+
+
+def test_unsupported_platform(monkeypatch):
+    monkeypatch.setattr(platform, 'machine', lambda: 'aarch64')
+    pytest.raises(NotImplementedError, SharedMemoryObjectReceiveStream.create, 64).\
+        match('require an x86 processor, not aarch64')
+    pytest.raises(NotImplementedError, SharedMemoryObjectSendStream.attach, 'foo')
+
+
+def test_invalid_buffer_size():
+    pytest.raises(ValueError, SharedMemoryObjectReceiveStream.create, 4).\
+        match('max_buffer_bytes must be greater than 4')
+
+
+async def test_send_receive(streams):
+    send, receive = streams
+    await send.send(b'hello')
+    await send.send(b'')
+    await send.send(b'world')
+    assert await receive.receive() == b'hello'
+    assert await receive.receive() == b''
+    assert await receive.receive() == b'world'
+
+
+async def test_wrap_around(streams):
+    send, receive = streams
+    for i in range(20):
+        item = bytes([i]) * (i % 10)
+        await send.send(item)
+        assert await receive.receive() == item
+
+
+async def test_item_too_large(streams):
+    send, receive = streams
+    with pytest.raises(ValueError):
+        await send.send(b'x' * 29)
+
+
+async def test_send_waits_for_room(streams):
+    send, receive = streams
+    await send.send(b'x' * 20)
+    with fail_after(5):
+        async with create_task_group() as tg:
+            tg.spawn(send.send, b'y' * 10)
+            await wait_all_tasks_blocked()
+            assert await receive.receive() == b'x' * 20
+
+    assert await receive.receive() == b'y' * 10
+
+
+async def test_receive_waits_for_item(streams):
+    send, receive = streams
+    received = []
+
+    async def receiver():
+        received.append(await receive.receive())
+
+    with fail_after(5):
+        async with create_task_group() as tg:
+            tg.spawn(receiver)
+            await wait_all_tasks_blocked()
+            await send.send(b'hello')
+
+    assert received == [b'hello']
+
+
+async def test_concurrent_receive(streams):
+    send, receive = streams
+    with pytest.raises(BusyResourceError):
+        async with create_task_group() as tg:
+            tg.spawn(receive.receive)
+            await wait_all_tasks_blocked()
+            await receive.receive()
+
+
+async def test_send_closed(streams):
+    send, receive = streams
+    await send.send(b'hello')
+    await send.aclose()
+    assert await receive.receive() == b'hello'
+    with pytest.raises(EndOfStream):
+        await receive.receive()
+
+    with pytest.raises(ClosedResourceError):
+        await send.send(b'hello')
+
+
+async def test_receive_closed(streams):
+    send, receive = streams
+    await send.send(b'x' * 20)
+    with pytest.raises(BrokenResourceError):
+        async with create_task_group() as tg:
+            tg.spawn(send.send, b'y' * 10)
+            await wait_all_tasks_blocked()
+            await receive.aclose()
+
+    with pytest.raises(ClosedResourceError):
+        await receive.receive()
+
+
+async def test_close_during_receive(streams):
+    send, receive = streams
+    with pytest.raises(ClosedResourceError), fail_after(5):
+        async with create_task_group() as tg:
+            tg.spawn(receive.receive)
+            await wait_all_tasks_blocked()
+            await receive.aclose()
+
+    with pytest.raises(BrokenResourceError):
+        await send.send(b'hello')
+
+
+async def test_close_during_send(streams):
+    send, receive = streams
+    await send.send(b'x' * 20)
+    with pytest.raises(ClosedResourceError), fail_after(5):
+        async with create_task_group() as tg:
+            tg.spawn(send.send, b'y' * 10)
+            await wait_all_tasks_blocked()
+            await send.aclose()
+
+    assert await receive.receive() == b'x' * 20
+    with pytest.raises(EndOfStream):
+        await receive.receive()
+
+
+async def test_other_process():
+    script = """\
+import sys
+
+import anyio
+from anyio.streams.shared_memory import SharedMemoryObjectSendStream
+
+
+async def main():
+    async with SharedMemoryObjectSendStream.attach(sys.argv[1]) as send:
+        for i in range(100):
+            await send.send(str(i).encode())
+
+anyio.run(main)
+"""
+    async with SharedMemoryObjectReceiveStream.create(64) as receive:
+        async with create_task_group() as tg:
+            tg.spawn(run_process, [sys.executable, '-c', script, receive.name])
+            with fail_after(10):
+                received = [item async for item in receive]
+
+    assert received == [str(i).encode() for i in range(100)]
@@ -61,6 +61,11 @@ class TestStapledByteStream:
         await stapled.send(b'today?')
         assert bytes(stapled.send_stream.buffer) == b'how are you today?'
 
+    async def test_receive_into(self, stapled):
+        buffer = bytearray(8)
+        assert await stapled.receive_into(memoryview(buffer)[3:]) == 5
+        assert buffer == b'\x00\x00\x00hello'
+
     async def test_send_eof(self, stapled):
         await stapled.send_eof()
         await stapled.send_eof()
@@ -6,10 +6,13 @@ from threading import Thread
 import pytest
 
 from anyio import (
-    BrokenResourceError, EndOfStream, connect_tcp, create_event, create_task_group,
-    create_tcp_listener)
+    BrokenResourceError, EndOfStream, connect_tcp, create_event, create_memory_object_stream,
+    create_task_group, create_tcp_listener, current_time, sleep)
 from anyio.abc import AnyByteStream, SocketAttribute, SocketStream
-from anyio.streams.tls import TLSAttribute, TLSListener, TLSStream
+from anyio.streams.stapled import StapledObjectStream
+from anyio.streams.tls import (
+    TLSAttribute, TLSListener, TLSSessionCache, TLSStream, clear_default_ssl_contexts,
+    get_default_ssl_context)
 
 pytestmark = pytest.mark.anyio
 
@@ -253,6 +256,34 @@ class TestTLSStream:
         server_thread.join()
         server_sock.close()
 
+    async def test_large_send_receive(self, server_context, client_context):
+        async def wrap_server():
+            nonlocal server
+            server = await TLSStream.wrap(StapledObjectStream(server_send, server_receive),
+                                          server_side=True, ssl_context=server_context)
+
+        client_send, server_receive = create_memory_object_stream(100)
+        server_send, client_receive = create_memory_object_stream(100)
+        server = None
+        async with create_task_group() as tg:
+            tg.spawn(wrap_server)
+            client = await TLSStream.wrap(StapledObjectStream(client_send, client_receive),
+                                          hostname='localhost', ssl_context=client_context)
+
+        data = bytes(range(256)) * 4096
+        await client.send(data)
+
+        # The encrypted records should have been passed on in batches of 64 KB
+        assert server_receive.statistics().current_buffer_used == 16
+
+        # A single receive call should decrypt all the records in the batch
+        received = await server.receive()
+        assert len(received) == 65536
+        while len(received) < len(data):
+            received += await server.receive()
+
+        assert received == data
+
 
 class TestTLSListener:
     async def test_handshake_fail(self, server_context):
@@ -281,3 +312,253 @@ class TestTLSListener:
             tg.cancel_scope.cancel()
 
         assert isinstance(exception, BrokenResourceError)
+        statistics = tls_listener.statistics()
+        assert statistics.handshakes_failed == 1
+        assert statistics.handshakes_completed == 0
+
+    @pytest.mark.parametrize('handshake_in_thread', [False, True], ids=['loop', 'thread'])
+    async def test_handshake_limit(self, server_context, client_context, handshake_in_thread,
+                                   monkeypatch):
+        async def wrap(cls, transport_stream, *, ssl_context=None, **kwargs):
+            if ssl_context is not server_context:
+                return await original_wrap(transport_stream, ssl_context=ssl_context, **kwargs)
+
+            # Hold the server side handshakes until all the clients have connected
+            nonlocal in_flight, max_in_flight
+            thread_limiters.add(kwargs['thread_limiter'])
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            try:
+                await release.wait()
+                return await original_wrap(transport_stream, ssl_context=ssl_context, **kwargs)
+            finally:
+                in_flight -= 1
+
+        async def handler(stream):
+            async with stream:
+                await stream.send(b'hello')
+
+        async def connect():
+            async with await connect_tcp('127.0.0.1', port, ssl_context=client_context,
+                                         tls_hostname='localhost') as stream:
+                responses.append(await stream.receive())
+
+        original_wrap = TLSStream.wrap
+        monkeypatch.setattr(TLSStream, 'wrap', classmethod(wrap))
+        in_flight = max_in_flight = 0
+        release = create_event()
+        responses = []
+        thread_limiters = set()
+        listener = await create_tcp_listener(local_host='127.0.0.1')
+        port = listener.extra(SocketAttribute.local_port)
+        tls_listener = TLSListener(listener, server_context, max_concurrent_handshakes=2,
+                                   handshake_in_thread=handshake_in_thread)
+        async with tls_listener, create_task_group() as tg:
+            tg.spawn(tls_listener.serve, handler)
+            async with create_task_group() as client_tg:
+                for _ in range(5):
+                    client_tg.spawn(connect)
+
+                while in_flight + tls_listener.statistics().handshakes_waiting < 5:
+                    await sleep(0.01)
+
+                assert in_flight == 2
+                assert tls_listener.statistics().handshakes_in_progress == 2
+                release.set()
+
+            tg.cancel_scope.cancel()
+
+        assert max_in_flight == 2
+        assert responses == [b'hello'] * 5
+        statistics = tls_listener.statistics()
+        assert statistics.handshakes_completed == 5
+        assert statistics.handshakes_failed == 0
+        assert statistics.handshakes_in_progress == 0
+        assert statistics.handshakes_waiting == 0
+        assert 0 < statistics.max_handshake_time <= statistics.total_handshake_time
+
+        # Threaded handshakes must not use the default thread limiter
+        limiter, = thread_limiters
+        if handshake_in_thread:
+            assert limiter is not None
+            assert limiter.total_tokens == 2
+        else:
+            assert limiter is None
+
+    async def test_handshake_timeout_includes_wait(self, server_context):
+        class CustomTLSListener(TLSListener):
+            async def handle_handshake_error(self, exc: BaseException,
+                                             stream: AnyByteStream) -> None:
+                failure_times.append(current_time())
+                await super().handle_handshake_error(exc, stream)
+
+        def handler(stream):
+            pytest.fail('This function should never be called in this scenario')
+
+        failure_times = []
+        listener = await create_tcp_listener(local_host='127.0.0.1')
+        tls_listener = CustomTLSListener(listener, server_context, handshake_timeout=0.5,
+                                         max_concurrent_handshakes=1)
+        async with tls_listener, create_task_group() as tg:
+            tg.spawn(tls_listener.serve, handler)
+            # Neither client sends anything, so the handshakes can only time out
+            with socket.create_connection(listener.extra(SocketAttribute.local_address)), \
+                    socket.create_connection(listener.extra(SocketAttribute.local_address)):
+                while len(failure_times) < 2:
+                    await sleep(0.01)
+
+            tg.cancel_scope.cancel()
+
+        # The second connection must not get a full time limit of its own after waiting for the
+        # first one
+        assert failure_times[1] - failure_times[0] < 0.3
+        statistics = tls_listener.statistics()
+        assert statistics.handshakes_failed == 2
+        assert statistics.handshakes_in_progress == 0
+        assert statistics.handshakes_waiting == 0
+
+    def test_bad_handshake_limit(self, server_context):
+        pytest.raises(ValueError, TLSListener, None, server_context, max_concurrent_handshakes=0)
+
+
+class TestDefaultSSLContext:
+    def test_cached(self):
+        context = get_default_ssl_context()
+        assert get_default_ssl_context(ssl.Purpose.SERVER_AUTH) is context
+        assert get_default_ssl_context(ssl.Purpose.CLIENT_AUTH) is not context
+        assert context.verify_mode == ssl.CERT_REQUIRED
+
+    def test_clear(self):
+        context = get_default_ssl_context()
+        clear_default_ssl_contexts()
+        assert get_default_ssl_context() is not context
+
+    async def test_wrap_uses_default_context(self, monkeypatch):
+        context = get_default_ssl_context()
+        wrap_args = []
+
+        def wrap_bio(*args, **kwargs):
+            wrap_args.append(kwargs)
+            raise RuntimeError
+
+        monkeypatch.setattr(context, 'wrap_bio', wrap_bio)
+        with pytest.raises(RuntimeError):
+            await TLSStream.wrap(None, hostname='localhost')
+
+        assert wrap_args == [{'server_side': False, 'server_hostname': 'localhost',
+                              'session': None}]
+
+
+class TestNativeTLS:
+    async def test_send_receive(self, server_context, client_context, anyio_backend_name):
+        async def handler(stream):
+            async with stream:
+                assert stream.extra(TLSAttribute.server_side) is True
+                data = b''
+                while len(data) < len(payload):
+                    data += await stream.receive()
+
+                await stream.send(data[::-1])
+
+            handler_done.set()
+
+        handler_done = create_event()
+        payload = bytes(range(256)) * 1000
+        listener = await create_tcp_listener(local_host='127.0.0.1')
+        port = listener.extra(SocketAttribute.local_port)
+        tls_listener = TLSListener(listener, server_context, standard_compatible=False,
+                                   native=True)
+        async with tls_listener, create_task_group() as tg:
+            tg.spawn(tls_listener.serve, handler)
+            async with await connect_tcp('127.0.0.1', port, ssl_context=client_context,
+                                         tls_hostname='localhost', tls_native=True,
+                                         tls_standard_compatible=False) as stream:
+                assert isinstance(stream, TLSStream)
+                is_native = type(stream) is not TLSStream
+                assert is_native == (anyio_backend_name == 'asyncio')
+                assert stream.extra(TLSAttribute.tls_version).startswith('TLSv')
+                assert stream.extra(TLSAttribute.server_side) is False
+                assert stream.extra(TLSAttribute.standard_compatible) is False
+                assert isinstance(stream.extra(TLSAttribute.ssl_object), ssl.SSLObject)
+                assert isinstance(stream.extra(TLSAttribute.peer_certificate), dict)
+                assert stream.extra(SocketAttribute.remote_port) == port
+                await stream.send(payload)
+                response = b''
+                while len(response) < len(payload):
+                    response += await stream.receive()
+
+            await handler_done.wait()
+            tg.cancel_scope.cancel()
+
+        assert response == payload[::-1]
+
+    async def test_handshake_fail(self, server_context):
+        def serve_sync():
+            conn, addr = server_sock.accept()
+            conn.close()
+
+        server_sock = server_context.wrap_socket(socket.socket(), server_side=True,
+                                                 suppress_ragged_eofs=False)
+        server_sock.settimeout(1)
+        server_sock.bind(('127.0.0.1', 0))
+        server_sock.listen()
+        server_thread = Thread(target=serve_sync)
+        server_thread.start()
+
+        # The default context does not trust the test CA
+        with pytest.raises(ssl.SSLError):
+            await connect_tcp(*server_sock.getsockname(), tls_hostname='localhost',
+                              tls_native=True, tls_standard_compatible=False)
+
+        server_thread.join()
+        server_sock.close()
+
+    async def test_requires_non_standard(self, client_context):
+        with pytest.raises(ValueError, match='standard_compatible=False'):
+            await TLSStream.wrap(None, hostname='localhost', ssl_context=client_context,
+                                 native=True)
+
+
+class TestTLSSessionCache:
+    async def test_session_resumption(self, server_context, ca):
+        async def handler(stream):
+            async with stream:
+                await stream.send(await stream.receive())
+
+        # Use a fresh client context to be sure no session has been established with it before
+        client_context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+        ca.configure_trust(client_context)
+        session_cache = TLSSessionCache()
+        listener = await create_tcp_listener(local_host='127.0.0.1')
+        port = listener.extra(SocketAttribute.local_port)
+        async with TLSListener(listener, server_context) as tls_listener, \
+                create_task_group() as tg:
+            tg.spawn(tls_listener.serve, handler)
+            reused = []
+            for _ in range(2):
+                async with await connect_tcp('127.0.0.1', port, ssl_context=client_context,
+                                             tls_hostname='localhost',
+                                             tls_session_cache=session_cache) as stream:
+                    await stream.send(b'hello')
+                    assert await stream.receive() == b'hello'
+                    reused.append(stream.extra(TLSAttribute.ssl_object).session_reused)
+
+            tg.cancel_scope.cancel()
+
+        assert reused == [False, True]
+        assert len(session_cache) == 1
+        assert session_cache.get('localhost', port, client_context) is not None
+        assert session_cache.get('localhost', port + 1, client_context) is None
+
+    def test_eviction(self):
+        session_cache = TLSSessionCache(max_size=2)
+        context = ssl.create_default_context()
+        session_cache.put('a', 1, context, 'session a')
+        session_cache.put('b', 1, context, 'session b')
+        assert session_cache.get('a', 1, context) == 'session a'
+        session_cache.put('c', 1, context, 'session c')
+        assert session_cache.get('b', 1, context) is None
+        assert session_cache.get('a', 1, context) == 'session a'
+        assert len(session_cache) == 2
+        session_cache.clear()
+        assert len(session_cache) == 0
@@ -0,0 +1,95 @@
+import pytest
+
+from anyio import (
+    BrokenResourceError, ClosedResourceError, EndOfStream, WouldBlock, create_task_group,
+    create_watch_memory_object_stream, fail_after, wait_all_tasks_blocked)
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_latest_value_only():
+    send, receive = create_watch_memory_object_stream()
+    pytest.raises(WouldBlock, receive.receive_nowait)
+    for i in range(3):
+        send.send_nowait(i)
+
+    assert send.version == 3
+    assert receive.receive_nowait() == 2
+    assert receive.version == 3
+    pytest.raises(WouldBlock, receive.receive_nowait)
+
+
+async def test_every_receiver_sees_new_value():
+    send, receive1 = create_watch_memory_object_stream()
+    receive2 = receive1.clone()
+    send.send_nowait('a')
+    assert receive1.receive_nowait() == 'a'
+    receive3 = receive1.clone()
+    pytest.raises(WouldBlock, receive3.receive_nowait)
+    assert receive2.receive_nowait() == 'a'
+    send.send_nowait('b')
+    assert [receive.receive_nowait() for receive in (receive1, receive2, receive3)] == ['b'] * 3
+
+
+async def test_receive_waits_for_new_value():
+    send, receive1 = create_watch_memory_object_stream()
+    receive2 = receive1.clone()
+    received = []
+
+    async def receiver(receive_stream):
+        received.append(await receive_stream.receive())
+
+    send.send_nowait('old')
+    receive1.receive_nowait()
+    receive2.receive_nowait()
+    with fail_after(1):
+        async with create_task_group() as tg:
+            tg.spawn(receiver, receive1)
+            tg.spawn(receiver, receive2)
+            await wait_all_tasks_blocked()
+            assert send.statistics().tasks_waiting_receive == 2
+            await send.send('new')
+
+    assert received == ['new', 'new']
+
+
+async def test_iterate():
+    async def receiver():
+        async with receive:
+            async for item in receive:
+                received.append(item)
+
+    send, receive = create_watch_memory_object_stream()
+    received = []
+    async with create_task_group() as tg:
+        tg.spawn(receiver)
+        send.send_nowait(1)
+        send.send_nowait(2)
+        await send.aclose()
+
+    assert received == [2]
+
+
+async def test_close_send_while_receiving():
+    send, receive = create_watch_memory_object_stream()
+    with pytest.raises(EndOfStream):
+        async with create_task_group() as tg:
+            tg.spawn(receive.receive)
+            await wait_all_tasks_blocked()
+            await send.aclose()
+
+
+async def test_receive_closed():
+    send, receive = create_watch_memory_object_stream()
+    await receive.aclose()
+    pytest.raises(BrokenResourceError, send.send_nowait, None)
+
+
+async def test_closed():
+    send, receive = create_watch_memory_object_stream()
+    await send.aclose()
+    await receive.aclose()
+    pytest.raises(ClosedResourceError, send.clone)
+    pytest.raises(ClosedResourceError, receive.clone)
+    pytest.raises(ClosedResourceError, send.send_nowait, None)
+    pytest.raises(ClosedResourceError, receive.receive_nowait)
@@ -0,0 +1,255 @@
+import socket
+import struct
+
+import pytest
+
+from anyio import (
+    DNSResolver, create_task_group, create_tcp_listener, create_udp_socket, getaddrinfo,
+    set_default_resolver)
+from anyio.abc import SocketAttribute
+
+pytestmark = pytest.mark.anyio
+
+RECORDS = {
+    'example.org': [(1, socket.inet_pton(socket.AF_INET, '192.0.2.1')),
+                    (28, socket.inet_pton(socket.AF_INET6, '2001:db8::1'))],
+    'v4only.example.org': [(1, socket.inet_pton(socket.AF_INET, '192.0.2.2'))],
+    'www.example.org': [(5, b'\x07example\x03org\x00')],
+    'idn.example.org': [(5, b'\x05caf\xc3\xa9\x07example\x03org\x00')],
+    'host.internal.test': [(1, socket.inet_pton(socket.AF_INET, '192.0.2.3'))],
+    'big.example.org': [(1, socket.inet_pton(socket.AF_INET, '192.0.2.4'))],
+}
+
+
+def build_response(query: bytes, *, query_id=None, truncated=False) -> bytes:
+    labels = []
+    offset = 12
+    while query[offset]:
+        labels.append(query[offset + 1:offset + 1 + query[offset]].decode())
+        offset += 1 + query[offset]
+
+    name = '.'.join(labels).lower()
+    qtype = struct.unpack_from('!H', query, offset + 1)[0]
+    question = query[12:offset + 5]
+    query_id = struct.unpack_from('!H', query)[0] if query_id is None else query_id
+    if name not in RECORDS:
+        return struct.pack('!HHHHHH', query_id, 0x8183, 1, 0, 0, 0) + question
+
+    answers = []
+    if not truncated:
+        for rtype, rdata in RECORDS[name]:
+            if rtype == 5:
+                # Answer with the CNAME record followed by the records of its target
+                answers.append(struct.pack('!HHHIH', 0xc00c, rtype, 1, 300, len(rdata)) + rdata)
+                target_pointer = 0xc000 | 12 + len(question) + 12
+                answers += [struct.pack('!HHHIH', target_pointer, rtype, 1, 300, len(rdata)) +
+                            rdata for rtype, rdata in RECORDS['example.org'] if rtype == qtype]
+            elif rtype == qtype:
+                answers.append(struct.pack('!HHHIH', 0xc00c, rtype, 1, 300, len(rdata)) + rdata)
+
+    flags = 0x8380 if truncated else 0x8180
+    return struct.pack('!HHHHHH', query_id, flags, 1, len(answers), 0, 0) + question + \
+        b''.join(answers)
+
+
+class StubDNSServer:
+    """Answers queries for the names in RECORDS over UDP and TCP on a single port."""
+
+    def __init__(self, drop: int = 0):
+        self.drop = drop
+        self.udp_queries = 0
+        self.tcp_queries = 0
+
+    async def __aenter__(self):
+        self.tcp_listener = await create_tcp_listener(local_host='127.0.0.1')
+        self.port = self.tcp_listener.extra(SocketAttribute.local_port)
+        self.udp = await create_udp_socket(local_host='127.0.0.1', local_port=self.port)
+        self.task_group = create_task_group()
+        await self.task_group.__aenter__()
+        self.task_group.spawn(self.serve_udp)
+        self.task_group.spawn(self.tcp_listener.serve, self.handle_tcp)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.task_group.cancel_scope.cancel()
+        await self.task_group.__aexit__(*exc_info)
+        await self.udp.aclose()
+        await self.tcp_listener.aclose()
+
+    async def serve_udp(self):
+        async for query, (host, port) in self.udp:
+            self.udp_queries += 1
+            if self.drop:
+                self.drop -= 1
+                continue
+
+            # A response with the wrong query ID must be ignored by the resolver
+            await self.udp.sendto(build_response(query, query_id=0), host, port)
+            await self.udp.sendto(build_response(query, truncated=b'\x03big' in query),
+                                  host, port)
+
+    async def handle_tcp(self, stream):
+        async with stream:
+            data = b''
+            while len(data) < 2 or len(data) < 2 + struct.unpack_from('!H', data)[0]:
+                data += await stream.receive()
+
+            self.tcp_queries += 1
+            response = build_response(data[2:])
+            await stream.send(struct.pack('!H', len(response)) + response)
+
+
+def sockaddrs(result):
+    return [sockaddr[:2] for *_, sockaddr in result]
+
+
+@pytest.fixture
+def resolv_conf(tmp_path):
+    path = tmp_path / 'resolv.conf'
+    path.write_text('# comment\n'
+                    'nameserver 127.0.0.1\n'
+                    'nameserver ::1\n'
+                    'search internal.test example.org\n'
+                    'options ndots:2 timeout:3 rotate\n')
+    return path
+
+
+@pytest.fixture
+def hosts_file(tmp_path):
+    path = tmp_path / 'hosts'
+    path.write_text('127.0.0.1 localhost\n'
+                    '192.0.2.10 myhost myhost.example.org  # comment\n'
+                    '2001:db8::10 myhost\n')
+    return path
+
+
+def make_resolver(server, **kwargs):
+    kwargs.setdefault('timeout', 0.5)
+    return DNSResolver(['127.0.0.1'], server.port, search=[], attempts=2, ndots=1,
+                       hosts_file=None, **kwargs)
+
+
+def test_resolv_conf(resolv_conf):
+    resolver = DNSResolver(resolv_conf=resolv_conf, hosts_file=None)
+    assert resolver.nameservers == ['127.0.0.1', '::1']
+    assert resolver.search == ['internal.test', 'example.org']
+    assert resolver.timeout == 3
+    assert resolver.attempts == 2
+    assert resolver.ndots == 2
+
+
+def test_missing_resolv_conf(tmp_path):
+    resolver = DNSResolver(resolv_conf=tmp_path / 'nonexistent', hosts_file=None)
+    assert resolver.nameservers == ['127.0.0.1']
+    assert resolver.search == []
+    assert resolver.timeout == 5
+
+
+async def test_lookup():
+    async with StubDNSServer() as server:
+        resolver = make_resolver(server)
+        result = await resolver.getaddrinfo(b'example.org', 80, type=socket.SOCK_STREAM)
+        assert [res[0] for res in result] == [socket.AF_INET6, socket.AF_INET]
+        assert sockaddrs(result) == [('2001:db8::1', 80), ('192.0.2.1', 80)]
+
+        result = await resolver.getaddrinfo(b'example.org', 80, family=socket.AF_INET,
+                                            type=socket.SOCK_STREAM)
+        assert sockaddrs(result) == [('192.0.2.1', 80)]
+
+        result = await resolver.getaddrinfo(b'v4only.example.org', 80, type=socket.SOCK_STREAM)
+        assert sockaddrs(result) == [('192.0.2.2', 80)]
+
+
+async def test_cname():
+    async with StubDNSServer() as server:
+        resolver = make_resolver(server)
+        result = await resolver.getaddrinfo(b'www.example.org', 80, family=socket.AF_INET,
+                                            type=socket.SOCK_STREAM, flags=socket.AI_CANONNAME)
+        assert result == [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP,
+                           'example.org', ('192.0.2.1', 80))]
+
+
+async def test_cname_non_ascii():
+    async with StubDNSServer() as server:
+        resolver = make_resolver(server)
+        result = await resolver.getaddrinfo(b'idn.example.org', 80, family=socket.AF_INET,
+                                            type=socket.SOCK_STREAM)
+        assert sockaddrs(result) == [('192.0.2.1', 80)]
+
+
+async def test_nonexistent_name():
+    async with StubDNSServer() as server:
+        with pytest.raises(socket.gaierror) as exc:
+            await make_resolver(server).getaddrinfo(b'nonexistent.example.org', 80)
+
+        assert exc.value.errno == socket.EAI_NONAME
+        assert server.udp_queries == 2
+
+
+async def test_search_domains():
+    async with StubDNSServer() as server:
+        resolver = make_resolver(server)
+        resolver.search = ['example.org', 'internal.test']
+        result = await resolver.getaddrinfo(b'host', 80, type=socket.SOCK_STREAM)
+        assert sockaddrs(result) == [('192.0.2.3', 80)]
+
+
+async def test_retry():
+    async with StubDNSServer(drop=1) as server:
+        result = await make_resolver(server, timeout=0.2).getaddrinfo(
+            b'v4only.example.org', 80, family=socket.AF_INET, type=socket.SOCK_STREAM)
+        assert sockaddrs(result) == [('192.0.2.2', 80)]
+        assert server.udp_queries == 2
+
+
+async def test_timeout():
+    async with StubDNSServer(drop=10) as server:
+        with pytest.raises(socket.gaierror) as exc:
+            await make_resolver(server, timeout=0.1).getaddrinfo(
+                b'example.org', 80, family=socket.AF_INET)
+
+        assert exc.value.errno == socket.EAI_AGAIN
+        assert server.udp_queries == 2
+
+
+async def test_truncated_response():
+    async with StubDNSServer() as server:
+        result = await make_resolver(server).getaddrinfo(
+            b'big.example.org', 80, family=socket.AF_INET, type=socket.SOCK_STREAM)
+        assert sockaddrs(result) == [('192.0.2.4', 80)]
+        assert server.tcp_queries == 1
+
+
+async def test_hosts_file(hosts_file):
+    resolver = DNSResolver(['127.0.0.1'], 1, hosts_file=hosts_file)
+    result = await resolver.getaddrinfo(b'MyHost', 80, type=socket.SOCK_STREAM)
+    assert sockaddrs(result) == [('192.0.2.10', 80), ('2001:db8::10', 80)]
+    result = await resolver.getaddrinfo(b'myhost', 80, family=socket.AF_INET6,
+                                        type=socket.SOCK_STREAM)
+    assert sockaddrs(result) == [('2001:db8::10', 80)]
+    result = await resolver.getaddrinfo(b'foo.localhost', 80, family=socket.AF_INET,
+                                        type=socket.SOCK_STREAM)
+    assert sockaddrs(result) == [('127.0.0.1', 80)]
+
+
+async def test_numeric_host():
+    resolver = DNSResolver(['127.0.0.1'], 1, hosts_file=None)
+    result = await resolver.getaddrinfo(b'192.0.2.1', 'http', type=socket.SOCK_STREAM)
+    assert sockaddrs(result) == [('192.0.2.1', 80)]
+    result = await resolver.getaddrinfo(None, 80, family=socket.AF_INET, type=socket.SOCK_STREAM,
+                                        flags=socket.AI_PASSIVE)
+    assert sockaddrs(result) == [('0.0.0.0', 80)]
+    with pytest.raises(socket.gaierror):
+        await resolver.getaddrinfo(b'example.org', 80, flags=socket.AI_NUMERICHOST)
+
+
+async def test_default_resolver():
+    async with StubDNSServer() as server:
+        set_default_resolver(make_resolver(server))
+        try:
+            result = await getaddrinfo('example.org', 80, family=socket.AF_INET,
+                                       type=socket.SOCK_STREAM)
+        finally:
+            set_default_resolver(None)
+
+        assert sockaddrs(result) == [('192.0.2.1', 80)]
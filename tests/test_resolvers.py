@@ -0,0 +1,113 @@
+import socket
+
+import pytest
+
+from anyio import (
+    CachingResolver, ThreadedResolver, create_event, create_task_group, current_default_resolver,
+    getaddrinfo, set_default_resolver, sleep, wait_all_tasks_blocked)
+from anyio.abc import Resolver
+
+pytestmark = pytest.mark.anyio
+
+LOCALHOST_RESULT = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', 80))]
+
+
+class FakeResolver(Resolver):
+    def __init__(self):
+        self.lookups = []
+        self.release_event = None
+
+    async def getaddrinfo(self, host, port, *, family=0, type=0, proto=0, flags=0):
+        self.lookups.append(host)
+        if self.release_event is not None:
+            await self.release_event.wait()
+
+        if host == b'nonexistent.invalid':
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+
+        return list(LOCALHOST_RESULT)
+
+
+@pytest.fixture
+def fake_resolver():
+    return FakeResolver()
+
+
+@pytest.fixture
+async def default_resolver():
+    yield
+    set_default_resolver(None)
+
+
+async def test_threaded_resolver():
+    resolver = ThreadedResolver(max_threads=1)
+    result = await resolver.getaddrinfo(b'127.0.0.1', 80, family=socket.AF_INET,
+                                        type=socket.SOCK_STREAM)
+    assert [sockaddr for *_, sockaddr in result] == [('127.0.0.1', 80)]
+
+
+class TestCachingResolver:
+    async def test_cache(self, fake_resolver):
+        resolver = CachingResolver(fake_resolver)
+        for _ in range(3):
+            assert await resolver.getaddrinfo(b'localhost', 80) == LOCALHOST_RESULT
+
+        await resolver.getaddrinfo(b'localhost', 443)
+        assert fake_resolver.lookups == [b'localhost', b'localhost']
+
+    async def test_expiry(self, fake_resolver):
+        resolver = CachingResolver(fake_resolver, ttl=0.1)
+        await resolver.getaddrinfo(b'localhost', 80)
+        await sleep(0.2)
+        await resolver.getaddrinfo(b'localhost', 80)
+        assert fake_resolver.lookups == [b'localhost', b'localhost']
+
+    async def test_negative_cache(self, fake_resolver):
+        resolver = CachingResolver(fake_resolver)
+        for _ in range(2):
+            with pytest.raises(socket.gaierror) as exc:
+                await resolver.getaddrinfo(b'nonexistent.invalid', 80)
+
+            assert exc.value.errno == socket.EAI_NONAME
+
+        assert fake_resolver.lookups == [b'nonexistent.invalid']
+
+    async def test_no_negative_cache(self, fake_resolver):
+        resolver = CachingResolver(fake_resolver, negative_ttl=0)
+        for _ in range(2):
+            with pytest.raises(socket.gaierror):
+                await resolver.getaddrinfo(b'nonexistent.invalid', 80)
+
+        assert len(fake_resolver.lookups) == 2
+
+    async def test_coalescing(self, fake_resolver):
+        async def lookup():
+            results.append(await resolver.getaddrinfo(b'localhost', 80))
+
+        results = []
+        fake_resolver.release_event = create_event()
+        resolver = CachingResolver(fake_resolver)
+        async with create_task_group() as tg:
+            for _ in range(5):
+                tg.spawn(lookup)
+
+            await wait_all_tasks_blocked()
+            fake_resolver.release_event.set()
+
+        assert results == [LOCALHOST_RESULT] * 5
+        assert fake_resolver.lookups == [b'localhost']
+
+    async def test_max_entries(self, fake_resolver):
+        resolver = CachingResolver(fake_resolver, max_entries=2)
+        for host in (b'a', b'b', b'a', b'c', b'a', b'b'):
+            await resolver.getaddrinfo(host, 80)
+
+        assert fake_resolver.lookups == [b'a', b'b', b'c', b'b']
+
+
+async def test_default_resolver(fake_resolver, default_resolver):
+    assert current_default_resolver() is None
+    set_default_resolver(fake_resolver)
+    assert current_default_resolver() is fake_resolver
+    assert await getaddrinfo('faß.de', 80) == LOCALHOST_RESULT
+    assert fake_resolver.lookups == [b'xn--fa-hia.de']
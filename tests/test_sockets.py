@@ -11,12 +11,15 @@ from threading import Event, Thread
 import pytest
 
 from anyio import (
-    BrokenResourceError, BusyResourceError, ClosedResourceError, ExceptionGroup,
-    TypedAttributeLookupError, connect_tcp, connect_unix, create_connected_udp_socket,
-    create_event, create_task_group, create_tcp_listener, create_udp_socket, create_unix_listener,
-    fail_after, getaddrinfo, getnameinfo, move_on_after, sleep, wait_all_tasks_blocked)
-from anyio.abc import SocketAttribute
+    BrokenResourceError, BusyResourceError, ClosedResourceError, ConnectionPoolStatistics,
+    EndOfStream, ExceptionGroup, TypedAttributeLookupError, connect_tcp, connect_unix,
+    create_connected_udp_socket, create_connection_pool, create_event, create_task_group,
+    create_tcp_listener, create_udp_socket, create_unix_listener, fail_after, getaddrinfo,
+    getnameinfo, move_on_after, set_default_resolver, sleep, wait_all_tasks_blocked)
+from anyio._core._eventloop import get_asynclib
+from anyio.abc import Resolver, SocketAttribute
 from anyio.streams.stapled import MultiListener
+from anyio.streams.tls import TLSListener, TLSStream
 
 pytestmark = pytest.mark.anyio
 
@@ -84,6 +87,19 @@ class TestTCPStream:
 
         assert response == b'halb'
 
+    async def test_receive_into(self, server_sock, server_addr):
+        buffer = bytearray(10)
+        received = 0
+        async with await connect_tcp(*server_addr) as stream:
+            client, _ = server_sock.accept()
+            client.sendall(b'blah')
+            client.close()
+            with pytest.raises(EndOfStream):
+                while True:
+                    received += await stream.receive_into(memoryview(buffer)[2 + received:])
+
+        assert buffer == b'\x00\x00blah\x00\x00\x00\x00'
+
     async def test_send_large_buffer(self, server_sock, server_addr):
         def serve():
             client, _ = server_sock.accept()
@@ -201,6 +217,121 @@ class TestTCPStream:
             for exc in exc.value.__cause__.exceptions:
                 assert isinstance(exc, ConnectionRefusedError)
 
+    @pytest.fixture
+    def ipv4_port(self):
+        sock = socket.socket(socket.AF_INET)
+        sock.bind(('127.0.0.1', 0))
+        sock.listen()
+        yield sock.getsockname()[1]
+        sock.close()
+
+    @pytest.fixture
+    def fake_connect(self, monkeypatch, anyio_backend_name):
+        async def connect_tcp(host, port, local_address=None):
+            attempted_hosts.append(host)
+            delay = connect_delays.get(host)
+            if delay is None:
+                raise ConnectionRefusedError(f'Connection to {host} refused')
+
+            await sleep(delay)
+            return await real_connect_tcp('127.0.0.1', port, local_address)
+
+        asynclib = get_asynclib(anyio_backend_name)
+        real_connect_tcp = asynclib.connect_tcp
+        attempted_hosts = []
+        connect_delays = {}
+        monkeypatch.setattr(asynclib, 'connect_tcp', connect_tcp)
+        return attempted_hosts, connect_delays
+
+    @pytest.fixture
+    async def fake_resolver(self):
+        class FakeResolver(Resolver):
+            async def getaddrinfo(self, host, port, *, family=0, type=0, proto=0, flags=0):
+                await sleep(delays[family])
+                return [(family, socket.SOCK_STREAM, 6, '',
+                         (address, port) + ((0, 0) if family == socket.AF_INET6 else ()))
+                        for address in addresses[family]]
+
+        addresses = {socket.AF_INET6: [], socket.AF_INET: []}
+        delays = {socket.AF_INET6: 0, socket.AF_INET: 0}
+        set_default_resolver(FakeResolver())
+        yield addresses, delays
+        set_default_resolver(None)
+
+    async def test_happy_eyeballs_interleave(self, fake_resolver, fake_connect):
+        addresses, _ = fake_resolver
+        attempted_hosts, _ = fake_connect
+        addresses[socket.AF_INET6] += ['2001:db8::1', '2001:db8::2', '2001:db8::3']
+        addresses[socket.AF_INET] += ['192.0.2.1', '192.0.2.2']
+        with pytest.raises(OSError, match='All connection attempts failed'):
+            await connect_tcp('example.org', 80)
+
+        assert attempted_hosts == ['2001:db8::1', '192.0.2.1', '2001:db8::2', '192.0.2.2',
+                                   '2001:db8::3']
+
+    async def test_happy_eyeballs_slow_resolution(self, ipv4_port, fake_resolver, fake_connect):
+        # The IPv4 connection attempt is made without waiting for the slow AAAA lookup to finish
+        addresses, delays = fake_resolver
+        attempted_hosts, connect_delays = fake_connect
+        addresses[socket.AF_INET6].append('2001:db8::1')
+        addresses[socket.AF_INET].append('192.0.2.1')
+        delays[socket.AF_INET6] = 5
+        connect_delays['192.0.2.1'] = 0
+        with fail_after(1):
+            async with await connect_tcp('example.org', ipv4_port):
+                pass
+
+        assert attempted_hosts == ['192.0.2.1']
+
+    async def test_happy_eyeballs_resolution_delay(self, ipv4_port, fake_resolver,
+                                                   fake_connect):
+        # IPv6 is still preferred if the AAAA answer arrives shortly after the A answer
+        addresses, delays = fake_resolver
+        attempted_hosts, connect_delays = fake_connect
+        addresses[socket.AF_INET6].append('2001:db8::1')
+        addresses[socket.AF_INET].append('192.0.2.1')
+        delays[socket.AF_INET6] = 0.01
+        connect_delays['2001:db8::1'] = 0
+        async with await connect_tcp('example.org', ipv4_port):
+            pass
+
+        assert attempted_hosts == ['2001:db8::1']
+
+    async def test_happy_eyeballs_delay(self, ipv4_port, fake_resolver, fake_connect):
+        addresses, _ = fake_resolver
+        attempted_hosts, connect_delays = fake_connect
+        addresses[socket.AF_INET6].append('2001:db8::1')
+        addresses[socket.AF_INET].append('192.0.2.1')
+        connect_delays.update({'2001:db8::1': 5, '192.0.2.1': 0})
+        with fail_after(1):
+            async with await connect_tcp('example.org', ipv4_port,
+                                         happy_eyeballs_delay=0.05):
+                pass
+
+        assert attempted_hosts == ['2001:db8::1', '192.0.2.1']
+
+    async def test_happy_eyeballs_adaptive_delay(self, ipv4_port, fake_resolver, fake_connect):
+        # After fast connections, the next address is tried sooner than the default 250 ms
+        addresses, _ = fake_resolver
+        attempted_hosts, connect_delays = fake_connect
+        addresses[socket.AF_INET].append('192.0.2.1')
+        connect_delays['192.0.2.1'] = 0
+        for _ in range(5):
+            async with await connect_tcp('example.org', ipv4_port):
+                pass
+
+        addresses[socket.AF_INET6].append('2001:db8::1')
+        connect_delays['2001:db8::1'] = 5
+        with fail_after(0.2):
+            async with await connect_tcp('example.org', ipv4_port):
+                pass
+
+        assert attempted_hosts[-2:] == ['2001:db8::1', '192.0.2.1']
+
+    async def test_happy_eyeballs_resolution_failure(self, fake_resolver):
+        with pytest.raises(OSError, match='No addresses found for example.org'):
+            await connect_tcp('example.org', 80)
+
     async def test_receive_timeout(self, server_sock, server_addr):
         def serve():
             conn, _ = server_sock.accept()
@@ -494,6 +625,19 @@ class TestUNIXStream:
 
         assert response == b'halb'
 
+    async def test_receive_into(self, server_sock, socket_path):
+        buffer = bytearray(10)
+        received = 0
+        async with await connect_unix(socket_path) as stream:
+            client, _ = server_sock.accept()
+            client.sendall(b'blah')
+            client.close()
+            with pytest.raises(EndOfStream):
+                while True:
+                    received += await stream.receive_into(memoryview(buffer)[2 + received:])
+
+        assert buffer == b'\x00\x00blah\x00\x00\x00\x00'
+
     async def test_send_large_buffer(self, server_sock, socket_path):
         def serve():
             client, _ = server_sock.accept()
@@ -974,6 +1118,222 @@ class TestConnectedUDPSocket:
             await udp.send(b'foo')
 
 
+class TestConnectionPool:
+    @staticmethod
+    async def echo(stream):
+        async with stream:
+            async for data in stream:
+                await stream.send(data)
+
+    @staticmethod
+    async def echo_once(stream):
+        async with stream:
+            await stream.send(await stream.receive())
+
+    async def test_reuse(self):
+        async with await create_tcp_listener(local_host='127.0.0.1') as listener, \
+                create_task_group() as tg, create_connection_pool() as pool:
+            tg.spawn(listener.serve, self.echo)
+            port = listener.extra(SocketAttribute.local_port)
+            for i in range(3):
+                async with pool.connect_tcp('127.0.0.1', port) as stream:
+                    if i == 0:
+                        first_stream = stream
+                    else:
+                        assert stream is first_stream
+
+                    await stream.send(b'hello')
+                    assert await stream.receive() == b'hello'
+                    assert pool.statistics().connections_in_use == 1
+
+            assert pool.statistics() == ConnectionPoolStatistics(0, 1, 1, 2)
+
+            # The Happy Eyeballs delay only affects how new connections are made, so it is not part
+            # of the key and the idle connection is reused
+            async with pool.connect_tcp('127.0.0.1', port, happy_eyeballs_delay=1):
+                pass
+
+            # A different local host is part of the key, so it gets a connection of its own
+            async with pool.connect_tcp('127.0.0.1', port, local_host='127.0.0.1'):
+                pass
+
+            assert pool.statistics() == ConnectionPoolStatistics(0, 2, 2, 3)
+            tg.cancel_scope.cancel()
+
+    async def test_close_on_exception(self):
+        async with await create_tcp_listener(local_host='127.0.0.1') as listener, \
+                create_task_group() as tg, create_connection_pool() as pool:
+            tg.spawn(listener.serve, self.echo)
+            port = listener.extra(SocketAttribute.local_port)
+            with pytest.raises(ZeroDivisionError):
+                async with pool.connect_tcp('127.0.0.1', port):
+                    raise ZeroDivisionError
+
+            async with pool.connect_tcp('127.0.0.1', port) as stream:
+                pool.discard(stream)
+
+            assert pool.statistics() == ConnectionPoolStatistics(0, 0, 2, 0)
+            with pytest.raises(ValueError):
+                pool.discard(stream)
+
+            tg.cancel_scope.cancel()
+
+    async def test_dead_idle_connection(self):
+        async with await create_tcp_listener(local_host='127.0.0.1') as listener, \
+                create_task_group() as tg, create_connection_pool() as pool:
+            tg.spawn(listener.serve, self.echo_once)
+            port = listener.extra(SocketAttribute.local_port)
+            async with pool.connect_tcp('127.0.0.1', port) as first_stream:
+                await first_stream.send(b'hello')
+                assert await first_stream.receive() == b'hello'
+
+            # Give the server time to close the connection
+            await sleep(0.1)
+            async with pool.connect_tcp('127.0.0.1', port) as stream:
+                assert stream is not first_stream
+                await stream.send(b'hello')
+                assert await stream.receive() == b'hello'
+
+            assert pool.statistics() == ConnectionPoolStatistics(0, 1, 2, 0)
+            tg.cancel_scope.cancel()
+
+    async def test_idle_timeout(self):
+        async with await create_tcp_listener(local_host='127.0.0.1') as listener, \
+                create_task_group() as tg, create_connection_pool(idle_timeout=0.1) as pool:
+            tg.spawn(listener.serve, self.echo)
+            port = listener.extra(SocketAttribute.local_port)
+            async with pool.connect_tcp('127.0.0.1', port) as first_stream:
+                pass
+
+            async with pool.connect_tcp('127.0.0.1', port, local_host='127.0.0.1'):
+                await sleep(0.2)
+
+            # Returning the second connection closed the expired first one
+            assert pool.statistics() == ConnectionPoolStatistics(0, 1, 2, 0)
+            with pytest.raises(ClosedResourceError):
+                await first_stream.send(b'hello')
+
+            # Getting a connection closes the expired second one
+            await sleep(0.2)
+            async with pool.connect_tcp('127.0.0.1', port):
+                assert pool.statistics() == ConnectionPoolStatistics(1, 0, 3, 0)
+
+            tg.cancel_scope.cancel()
+
+    async def test_reuse_high_fd(self):
+        # Use up the lower file descriptor numbers so that the connection gets one that is too
+        # large for select()
+        resource = pytest.importorskip('resource')
+        if resource.getrlimit(resource.RLIMIT_NOFILE)[0] < 1200:
+            pytest.skip('the open file limit is too low')
+
+        placeholders = []
+        try:
+            with open(os.devnull) as devnull:
+                while not placeholders or placeholders[-1] < 1100:
+                    placeholders.append(os.dup(devnull.fileno()))
+
+            async with await create_tcp_listener(local_host='127.0.0.1') as listener, \
+                    create_task_group() as tg, create_connection_pool() as pool:
+                tg.spawn(listener.serve, self.echo)
+                port = listener.extra(SocketAttribute.local_port)
+                for _ in range(2):
+                    async with pool.connect_tcp('127.0.0.1', port) as stream:
+                        assert stream.extra(SocketAttribute.raw_socket).fileno() >= 1024
+                        await stream.send(b'hello')
+                        assert await stream.receive() == b'hello'
+
+                assert pool.statistics() == ConnectionPoolStatistics(0, 1, 1, 1)
+                tg.cancel_scope.cancel()
+        finally:
+            for fd in placeholders:
+                os.close(fd)
+
+    async def test_max_connections_per_key(self):
+        async def use_connection():
+            async with pool.connect_tcp('127.0.0.1', port) as stream:
+                streams.append(stream)
+                await sleep(0.1)
+
+        streams = []
+        async with await create_tcp_listener(local_host='127.0.0.1') as listener, \
+                create_task_group() as tg, \
+                create_connection_pool(max_connections_per_key=2) as pool:
+            tg.spawn(listener.serve, self.echo)
+            port = listener.extra(SocketAttribute.local_port)
+            async with create_task_group() as tg2:
+                for _ in range(4):
+                    tg2.spawn(use_connection)
+
+                await wait_all_tasks_blocked()
+                assert len(streams) == 2
+
+            assert len(set(map(id, streams))) == 2
+            assert pool.statistics() == ConnectionPoolStatistics(0, 2, 2, 2)
+            tg.cancel_scope.cancel()
+
+        pytest.raises(ValueError, create_connection_pool, max_connections_per_key=0)
+
+    async def test_aclose(self):
+        async with await create_tcp_listener(local_host='127.0.0.1') as listener, \
+                create_task_group() as tg:
+            tg.spawn(listener.serve, self.echo)
+            port = listener.extra(SocketAttribute.local_port)
+            async with create_connection_pool() as pool:
+                async with pool.connect_tcp('127.0.0.1', port) as idle_stream:
+                    pass
+
+                async with pool.connect_tcp('127.0.0.1', port) as stream:
+                    await pool.aclose()
+                    await stream.send(b'hello')
+                    assert await stream.receive() == b'hello'
+
+            assert pool.statistics() == ConnectionPoolStatistics(0, 0, 1, 1)
+            with pytest.raises(ClosedResourceError):
+                await idle_stream.send(b'hello')
+
+            with pytest.raises(ClosedResourceError):
+                async with pool.connect_tcp('127.0.0.1', port):
+                    pass
+
+            tg.cancel_scope.cancel()
+
+    async def test_tls(self, server_context, client_context):
+        async with await create_tcp_listener(local_host='127.0.0.1') as listener, \
+                create_task_group() as tg, create_connection_pool() as pool:
+            port = listener.extra(SocketAttribute.local_port)
+            tls_listener = TLSListener(listener, server_context, standard_compatible=False)
+            tg.spawn(tls_listener.serve, self.echo_once)
+            for _ in range(2):
+                async with pool.connect_tcp('127.0.0.1', port, ssl_context=client_context,
+                                            tls_hostname='localhost',
+                                            tls_standard_compatible=False) as stream:
+                    assert isinstance(stream, TLSStream)
+                    await stream.send(b'hello')
+                    assert await stream.receive() == b'hello'
+
+                # Give the server time to close the connection
+                await sleep(0.1)
+
+            assert pool.statistics() == ConnectionPoolStatistics(0, 1, 2, 0)
+            tg.cancel_scope.cancel()
+
+    @pytest.mark.skipif(sys.platform == 'win32',
+                        reason='UNIX sockets are not available on Windows')
+    async def test_connect_unix(self, tmp_path_factory):
+        socket_path = tmp_path_factory.mktemp('unix').joinpath('socket')
+        async with await create_unix_listener(socket_path) as listener, \
+                create_task_group() as tg, create_connection_pool() as pool:
+            tg.spawn(listener.serve, self.echo)
+            for _ in range(2):
+                async with pool.connect_unix(socket_path) as stream:
+                    await stream.send(b'hello')
+                    assert await stream.receive() == b'hello'
+
+            assert pool.statistics() == ConnectionPoolStatistics(0, 1, 1, 1)
+            tg.cancel_scope.cancel()
+
+
 @pytest.mark.network
 async def test_getaddrinfo():
     # IDNA 2003 gets this wrong